@@ -7,304 +7,303 @@ Decides whether to reply with text or execute a tool.
 import logging
 import json
 from squadron.services.model_factory import ModelFactory
-import PIL.Image
-import yaml
 import os
 import asyncio
-# Tool Imports
-from squadron.services.event_bus import emit_tool_call, emit_tool_result, emit_error
-from squadron.skills.browser.tool import browse_website
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from squadron.services.llm.base import call_async, stream_async
+from squadron.services.event_bus import emit_tool_call, emit_tool_result, emit_error, emit_agent_token
+from squadron.services.prompt_builder import prompt_assembler
+from squadron.services.tokens import PromptBudget, Section, get_estimator, prompt_token_budget, provider_of, shorten_line, token_ledger
+from squadron.services.tool_registry import get_tool_registry
+from squadron.services.decision_parser import StreamingDecisionParser, parse_decision
+from squadron.services.image_pipeline import get_image_pipeline, is_image
+from squadron.services.timing import span
+from squadron.services.tool_index import TOOL_SELECT_THRESHOLD, get_tool_index, split_tools
+from squadron.services.mcp_manager import get_mcp_manager
+from squadron.planner.architect import read_plan
+# Note: tool modules (browser, ssh, vision, MCP, delegator...) are imported lazily
+# on first use - see _register_core_tools()
 
-from squadron.skills.ssh.tool import ssh_command
-from squadron.skills.fs_tool.tool import read_file, write_file, list_dir
-from squadron.skills.shell_tool.tool import run_command
-from squadron.memory.hippocampus import Hippocampus, remember
-from squadron.planner.architect import create_plan, read_plan, update_plan
+logger = logging.getLogger('SquadronBrain')
 
-from squadron.clients.mcp_client import MCPBridge
-# Note: dynamic import for delegator to avoid circular dependency
-# from squadron.swarm.delegator import assign_task (Done inside function/execution to be safe)
+# Upper bound on concurrently running tools per process (see SquadronBrain._execute_many)
+MAX_PARALLEL_TOOLS = int(os.getenv("SQUADRON_MAX_PARALLEL_TOOLS", "4"))
 
-logger = logging.getLogger('SquadronBrain')
+_tool_pool = None
+_tool_pool_lock = threading.Lock()
+_tool_worker = threading.local()  # .active is set while a pool thread runs a tool
 
-from squadron.engines.opencode_engine import get_engine as get_opencode_engine, OPENCODE_AVAILABLE
 
-class SquadronBrain:
-    def __init__(self):
-        # We use the smart model for routing
-        self.planner_model = ModelFactory.create("gemini-3-pro") 
-        self.tools = {}
-        self.safety_mode = True  # Default: Safety Interlocks ENGAGED
-        
-        # OpenCode Engine (Primary Brain)
-        self.opencode = get_opencode_engine() if OPENCODE_AVAILABLE else None
-        
-        # Initialize Memory
-        try:
-            self.memory = Hippocampus()
-        except Exception as e:
-            logger.warning(f"Failed to initialize Memory: {e}")
-            self.memory = None
+def _get_tool_pool() -> ThreadPoolExecutor:
+    """Lazily creates the bounded thread pool shared by all brains."""
+    global _tool_pool
+    with _tool_pool_lock:
+        if _tool_pool is None:
+            _tool_pool = ThreadPoolExecutor(
+                max_workers=max(1, MAX_PARALLEL_TOOLS),
+                thread_name_prefix="squadron-tool"
+            )
+        return _tool_pool
+
+
+def _run_on_tool_pool(fn, *args):
+    """Runs a tool on a pool thread, marking it so nested batches run inline instead of waiting on the pool."""
+    _tool_worker.active = True
+    try:
+        return fn(*args)
+    finally:
+        _tool_worker.active = False
+
+# Per-provider deadlines for context gathering before each LLM call (seconds)
+CONTEXT_TIMEOUTS = {
+    "memory": float(os.getenv("SQUADRON_CONTEXT_TIMEOUT_MEMORY", "2.0")),
+    "plan": float(os.getenv("SQUADRON_CONTEXT_TIMEOUT_PLAN", "1.0")),
+}
+
+_context_pool = None
+_context_pool_lock = threading.Lock()
+
+
+def _get_context_pool() -> ThreadPoolExecutor:
+    """Lazily creates the thread pool that gathers think() context concurrently."""
+    global _context_pool
+    with _context_pool_lock:
+        if _context_pool is None:
+            _context_pool = ThreadPoolExecutor(
+                max_workers=8,
+                thread_name_prefix="squadron-context"
+            )
+        return _context_pool
 
-    # ... (rest of init and methods) ...
+# Process-wide collaborators shared by every brain (created on first use)
+_shared = {}
+_shared_lock = threading.Lock()
 
-    def think(self, user_input: str, agent_profile=None) -> dict:
-        """
-        Decides the next action.
-        Returns a dict: {"action": "reply"|"tool", "content": str, "tool_name": str, "tool_args": dict}
-        """
-        
-        # --- 1. OPENCODE ENGINE (PRIMARY) ---
-        if self.opencode:
-            try:
-                # OpenCode handles memory/planning internally or via its own context
-                result = self.opencode.think_sync(user_input, getattr(agent_profile, 'name', 'Caleb'))
-                
-                # Transform OpenCode result to Squadron format if needed
-                # (Assuming opencode_engine returns compatible dicts or we map them here)
-                # Currently opencode_engine.py generic wrapper returns {'action': 'reply'...} 
-                # but real SDK might return tool calls.
-                return result
-            except Exception as e:
-                logger.error(f"OpenCode Brain failed: {e}. Falling back to Gemini.")
-                # Fallthrough to fallback logic
 
+def _get_shared(key: str, factory):
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = factory()
+        return _shared[key]
+
+
+def _create_memory():
+    from squadron.memory.hippocampus import memory_store
+    return memory_store
+
+
+def _create_improver():
+    from squadron.evolution.improver import Improver
+    return Improver("squadron/skills/dynamic")
 
-        # --- 2. LEGACY/FALLBACK LOGIC (Gemini/Local) ---
-        
-        # --- MEMORY RECALL ---
-        memory_context = ""
-        if self.memory:
-            try:
-                memories = self.memory.recall(user_input, n_results=3)
-                if memories:
-                    memory_context = "\n🧠 RELEVANT MEMORIES:\n"
-                    for mem in memories:
-                        memory_context += f"- {mem['content']} (Time: {mem['metadata'].get('timestamp')})\n"
-            except Exception as e:
-                logger.warning(f"Memory Recall Failed: {e}")
-        # ---------------------
-        
-        # --- PLAN CONTEXT ---
-        plan_context = ""
-        # ... rest of method ...
-        
-        # MCP Bridge
-        self.mcp_bridge = MCPBridge()
-        self.mcp_initialized = False
 
-        # Register Core Tools
-        self.register_tool(
+from squadron.engines.opencode_engine import get_engine as get_opencode_engine, OPENCODE_AVAILABLE
+
+
+def _register_core_tools(registry):
+    """
+    Registers the built-in tools once per process.
+    Module tools are given as import paths so nothing heavy loads until first call;
+    bind=True tools are SquadronBrain methods that act on the calling brain.
+    """
+    with _shared_lock:
+        if registry.is_loaded("core"):
+            return
+        
+        registry.register(
             "browse_website", 
             "browse_website(url: str): Navigates to a URL and takes a screenshot.", 
-            browse_website,
+            "squadron.skills.browser.tool:browse_website",
             hazardous=False
         )
-        self.register_tool(
+        registry.register(
             "ssh_command",
             "ssh_command(command: str): Executes a command on a remote server.",
-            ssh_command,
+            "squadron.skills.ssh.tool:ssh_command",
             hazardous=True  # SSH is powerful
         )
         
         # --- The Motor Cortex (Hands & Feet) ---
-        self.register_tool(
+        registry.register(
             "read_file",
             "read_file(path: str): Reads the content of a local file.",
-            read_file,
+            "squadron.skills.fs_tool.tool:read_file",
             hazardous=False
         )
-        self.register_tool(
+        registry.register(
             "list_dir",
             "list_dir(path: str): Lists files in a directory.",
-            list_dir,
+            "squadron.skills.fs_tool.tool:list_dir",
             hazardous=False
         )
-        self.register_tool(
+        registry.register(
             "write_file",
             "write_file(path: str, content: str): Writes content to a file (HAZARDOUS: Overwrites existing).",
-            write_file,
+            "squadron.skills.fs_tool.tool:write_file",
             hazardous=True
         )
-        self.register_tool(
+        registry.register(
             "run_command",
             "run_command(command: str, timeout: int = 30): Executes a shell command (HAZARDOUS: Can modify system).",
-            run_command,
+            "squadron.skills.shell_tool.tool:run_command",
             hazardous=True
         )
         
         # --- The Hippocampus (Memory) ---
-        self.register_tool(
+        registry.register(
             "save_memory",
             "save_memory(text: str, memory_type: str = 'general'): Saves a fact, learning, or context to long-term memory. Types: 'general', 'learning', 'task'",
-            lambda text, memory_type="general": self._save_memory(text, memory_type),
-            hazardous=False
+            SquadronBrain._save_memory,
+            hazardous=False,
+            bind=True,
+            sequential=True  # A recall later in the same batch must see it
         )
-        self.register_tool(
+        registry.register(
             "recall_memory",
             "recall_memory(query: str, n_results: int = 3): Searches memory for relevant past information.",
-            lambda query, n_results=3: self._recall_memory(query, n_results),
-            hazardous=False
+            SquadronBrain._recall_memory,
+            hazardous=False,
+            bind=True
         )
-        self.register_tool(
+        registry.register(
             "get_memory_context",
             "get_memory_context(task: str): Gets relevant context from memory for a task. Returns formatted string for inclusion in reasoning.",
-            lambda task: self._get_memory_context(task),
-            hazardous=False
+            SquadronBrain._get_memory_context,
+            hazardous=False,
+            bind=True
         )
         
         # --- The Frontal Cortex (Planner) ---
-        self.register_tool(
+        registry.register(
             "create_plan",
             "create_plan(goal: str): Creates a mission plan (squadron_plan.md) for a complex goal.",
-            create_plan,
-            hazardous=False
+            "squadron.planner.architect:create_plan",
+            hazardous=False,
+            sequential=True  # Plan writes must land before a read_plan in the same batch
         )
-        self.register_tool(
+        registry.register(
             "read_plan",
             "read_plan(): Reads the current mission plan.",
-            read_plan,
+            "squadron.planner.architect:read_plan",
             hazardous=False
         )
-        self.register_tool(
+        registry.register(
             "update_plan",
             "update_plan(content: str): Updates the mission plan (e.g. marking steps as complete).",
-            update_plan,
-            hazardous=False
+            "squadron.planner.architect:update_plan",
+            hazardous=False,
+            sequential=True
         )
         
         # --- The Hive (Swarm) ---
-        # Late import to prevent circular dependency
-        from squadron.swarm.delegator import assign_task, handoff_task
-        self.register_tool(
+        # Lazy path also avoids the brain <-> delegator circular import
+        registry.register(
             "assign_task",
             "assign_task(agent_name: str, task: str, context: dict = None): Delegates a task to a specialist (Marcus=PM, Caleb=Dev, Sentinel=Sec).",
-            assign_task,
-            hazardous=False # Delegation itself is safe, the delegatee has their own safety checks
+            "squadron.swarm.delegator:assign_task",
+            hazardous=False, # Delegation itself is safe, the delegatee has their own safety checks
+            sequential=True  # The delegate runs its own tools and may chdir into a worktree
         )
-        self.register_tool(
+        registry.register(
             "handoff_task",
             "handoff_task(from_agent: str, to_agent: str, task: str, notes: str = None): Transfer work between agents with context.",
-            handoff_task,
-            hazardous=False
+            "squadron.swarm.delegator:handoff_task",
+            hazardous=False,
+            sequential=True
         )
         
         # --- Agent Communication Tools ---
-        self.register_tool(
+        registry.register(
             "reply_to_ticket",
             "reply_to_ticket(ticket_id: str, message: str, tag_agent: str = None): Reply to a Jira/Linear ticket with your response. Optionally @tag another agent.",
-            self._reply_to_ticket,
-            hazardous=False
+            SquadronBrain._reply_to_ticket,
+            hazardous=False,
+            bind=True
         )
-        self.register_tool(
+        registry.register(
             "tag_agent",
             "tag_agent(agent_name: str, task: str, ticket_id: str = None): Tag another agent for help or handoff. They will be automatically woken up.",
-            self._tag_agent,
-            hazardous=False
+            SquadronBrain._tag_agent,
+            hazardous=False,
+            bind=True
         )
-
-
-
-
+        
         # --- Level 6: Evolution ---
-        from squadron.evolution.improver import Improver
-        self.improver = Improver("squadron/skills/dynamic")
-        self.register_tool(
+        registry.register(
             "refresh_skills",
             "refresh_skills(): Scans 'squadron/skills/dynamic' for new tools and loads them.",
-            lambda: self._refresh_skills_impl(),
-            hazardous=False
+            SquadronBrain._refresh_skills_impl,
+            hazardous=False,
+            bind=True
         )
         
         # --- Level 8: Vision ---
-        import PIL.Image
-        from squadron.skills.vision_tool import capture_screen, click_at, type_text, get_screen_size
-        self.register_tool("capture_screen", "capture_screen(): Captures screenshot.", capture_screen, hazardous=False)
-        self.register_tool("click_at", "click_at(x: int, y: int): Clicks mouse.", click_at, hazardous=False)
-        self.register_tool("type_text", "type_text(text: str): Types keys.", type_text, hazardous=False)
-        self.register_tool("get_screen_size", "get_screen_size(): Returns WxH.", get_screen_size, hazardous=False)
-
-        self.last_files = [] # Stores file paths from last tool run
+        registry.register("capture_screen", "capture_screen(): Captures screenshot.", "squadron.skills.vision_tool.tool:capture_screen", hazardous=False)
+        registry.register("click_at", "click_at(x: int, y: int): Clicks mouse.", "squadron.skills.vision_tool.tool:click_at", hazardous=False, sequential=True)
+        registry.register("type_text", "type_text(text: str): Types keys.", "squadron.skills.vision_tool.tool:type_text", hazardous=False, sequential=True)
+        registry.register("get_screen_size", "get_screen_size(): Returns WxH.", "squadron.skills.vision_tool.tool:get_screen_size", hazardous=False)
+        
+        registry.mark_loaded("core")
 
-    def initialize_mcp(self):
-        """Loads MCP servers from config and registers tools."""
-        if self.mcp_initialized:
-            return
-            
-        config_path = os.path.join(os.path.dirname(__file__), "mcp_servers.yaml")
-        if not os.path.exists(config_path):
-            return
 
+class SquadronBrain:
+    def __init__(self):
+        # We use the smart model for routing
+        self.planner_model = ModelFactory.create("gemini-3-pro") 
+        self.safety_mode = True  # Default: Safety Interlocks ENGAGED
+        self.current_agent = None  # Set by AgentNode; used for memory namespaces and ticket replies
+        self.last_files = [] # Stores file paths from last tool run
+        self.last_prompt = None  # PromptParts of the latest think() call
+        
+        # Shared across all brains in the process
+        self.tools = get_tool_registry()
+        _register_core_tools(self.tools)
+        self.prompt_assembler = prompt_assembler
+        
+        # OpenCode Engine (Primary Brain)
+        self.opencode = get_opencode_engine() if OPENCODE_AVAILABLE else None
+        
+        # Initialize Memory
         try:
-            with open(config_path, "r") as f:
-                config = yaml.safe_load(f)
-            
-            servers = config.get("servers") or {}
-            
-            # Handle Event Loop (Main Thread vs Executor Thread)
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            for name, srv_config in servers.items():
-                if not srv_config: continue
-                # List tools (JIT connection)
-                # If loop is running (Main Thread), we can't use run_until_complete
-                if loop.is_running():
-                     # This is tricky. For now, skip if we are in main loop active 
-                     # (Should verify_mcp.py/main.py call this separately?)
-                     logger.warning("Cannot init MCP context inside active loop without async.")
-                     continue
-                
-                tools = loop.run_until_complete(self.mcp_bridge.list_tools(name, srv_config))
-                
-                for tool in tools:
-                    # Create a callable wrapper for the tool
-                    wrapper = self._make_tool_wrapper(tool_name=tool["tool_name"])  
-                    
-                    self.tools[tool["tool_name"]] = {
-                        "func": wrapper,
-                        "description": f"[{name}] {tool.get('description', '')}"
-                    }
-            
-            self.mcp_initialized = True
-            logger.info(f"✅ MCP Bridge Initialized. Total tools: {len(self.tools)}")
-            
+            self.memory = _get_shared("memory", _create_memory)
         except Exception as e:
-            logger.error(f"Failed to init MCP: {e}")
+            logger.warning(f"Failed to initialize Memory: {e}")
+            self.memory = None
 
-    def _make_tool_wrapper(self, tool_name):
-        """Creates a synchronous wrapper for an async MCP tool call."""
-        def wrapper(**kwargs):
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+        # Start MCP discovery in the background (once per process)
+        get_mcp_manager().warm_up()
 
-            # If loop running, we might be in trouble if we block.
-            # But the executor thread usually has no loop running.
-            
-            # Call tool
-            result = loop.run_until_complete(self.mcp_bridge.call_tool(tool_name, kwargs))
-            
-            # Format output
-            text_content = []
-            if hasattr(result, 'content'):
-                for content in result.content:
-                    if hasattr(content, 'text'):
-                        text_content.append(content.text)
-                    elif hasattr(content, 'type') and content.type == 'text':
-                            text_content.append(content.text)
-                    else:
-                            text_content.append(str(content))
-            else:
-                text_content.append(str(result))
-            
-            return "\n".join(text_content)
-        return wrapper
+        # Embed tool descriptions ahead of the first think() (MCP warm-up re-syncs new tools)
+        if len(self.tools) > TOOL_SELECT_THRESHOLD:
+            get_tool_index().warm_up(self.tools, self._tools_version)
+
+    @property
+    def _tools_version(self) -> int:
+        return self.tools.version
+
+    @property
+    def improver(self):
+        return _get_shared("improver", _create_improver)
+
+    @property
+    def mcp_bridge(self):
+        return get_mcp_manager().bridge
+
+    @property
+    def mcp_initialized(self) -> bool:
+        """True once every MCP server is registered or backing off after a failure."""
+        return get_mcp_manager().ready
+
+    def initialize_mcp(self):
+        """
+        Discovers MCP servers and registers their tools, blocking until done.
+        think() doesn't need this: discovery runs as a background warm-up
+        (see services/mcp_manager.py).
+        """
+        get_mcp_manager().load()
 
     def _refresh_skills_impl(self):
         new_skills = self.improver.discover_skills()
@@ -421,7 +420,7 @@ class SquadronBrain:
         if not self.memory:
             return "❌ Memory system not available"
         
-        agent = getattr(self, 'current_agent', 'shared')
+        agent = self.current_agent or 'shared'
         mem_id = self.memory.remember(text, agent=agent, memory_type=memory_type)
         return f"✅ Saved to memory ({memory_type}): {text[:50]}..."
     
@@ -430,7 +429,7 @@ class SquadronBrain:
         if not self.memory:
             return "❌ Memory system not available"
         
-        agent = getattr(self, 'current_agent', None)
+        agent = self.current_agent
         memories = self.memory.recall(query, agent=agent, n_results=n_results)
         
         if not memories:
@@ -449,16 +448,14 @@ class SquadronBrain:
         if not self.memory:
             return ""
         
-        agent = getattr(self, 'current_agent', None)
+        agent = self.current_agent
         return self.memory.get_context_for_task(task, agent=agent)
 
 
-    def register_tool(self, name, description, func, hazardous=False):
-        self.tools[name] = {
-            "description": description,
-            "func": func,
-            "hazardous": hazardous
-        }
+    def register_tool(self, name, description, func, hazardous=False, sequential=False):
+        """Registers a tool in the shared registry (visible to every brain)."""
+        # Bumps the registry version, which invalidates the cached prompt prefix
+        self.tools.register(name, description, func, hazardous=hazardous, sequential=sequential)
 
     def toggle_safety(self, enabled: bool):
         """Toggle the safety interlocks on or off."""
@@ -507,111 +504,249 @@ class SquadronBrain:
         Decides the next action.
         Returns a dict: {"action": "reply"|"tool", "content": str, "tool_name": str, "tool_args": dict}
         """
+        try:
+            prompt, agent_name = self._prepare_prompt(user_input, agent_profile)
+            # We force JSON format for the tool decision
+            parser = StreamingDecisionParser()
+            with span("llm_call"):
+                response = self._generate(prompt, agent_name, max_tokens=4096, temperature=0.3, parser=parser)
+            self._record_tokens(prompt, response, agent_name)
+            return self._parse_decision(response, parser)
+        except Exception as e:
+            logger.error(f"Brain freeze: {e}")
+
+            return {"action": "reply", "content": f"I'm having trouble thinking clearly right now. Error: {e}"}
+
+    async def athink(self, user_input: str, agent_profile=None) -> dict:
+        """
+        Async think(): context gathering runs in a worker thread and the LLM call
+        uses the provider's async client, so the event loop is never blocked.
+        """
+        try:
+            prompt, agent_name = await asyncio.to_thread(self._prepare_prompt, user_input, agent_profile)
+            parser = StreamingDecisionParser()
+            with span("llm_call"):
+                response = await self._agenerate(prompt, agent_name, max_tokens=4096, temperature=0.3, parser=parser)
+            self._record_tokens(prompt, response, agent_name)
+            return self._parse_decision(response, parser)
+        except Exception as e:
+            logger.error(f"Brain freeze: {e}")
+
+            return {"action": "reply", "content": f"I'm having trouble thinking clearly right now. Error: {e}"}
+
+    def _prepare_prompt(self, user_input: str, agent_profile=None):
+        """
+        Gathers memory, plan and image context and builds the prompt.
+        Returns (prompt, agent_name); prompt is a str or a multimodal parts list.
+        """
+        # MCP discovery runs in the background; this only (re)starts it when servers are due
+        if not self.mcp_initialized:
+            get_mcp_manager().warm_up()
+
+        with span("context_gather"):
+            context = self._gather_context({
+                "memory": lambda: self._recall_memories(user_input),
+                "plan": self._plan_context,
+            })
+
+        with span("prompt_build"):
+            prompt = self._build_prompt(user_input, agent_profile, context["memory"], context["plan"])
+
+        agent_name = getattr(agent_profile, "name", None) or self.current_agent or "autonomous"
+        return prompt, agent_name
+
+    def _gather_context(self, providers: dict) -> dict:
+        """
+        Runs the context providers concurrently, each against its own deadline
+        (CONTEXT_TIMEOUTS). A provider that fails or misses its deadline
+        contributes "" instead of holding up the turn; it keeps running in the
+        background.
+        """
+        pool = _get_context_pool()
+        start = time.monotonic()
+        futures = {
+            name: pool.submit(contextvars.copy_context().run, provider)
+            for name, provider in providers.items()
+        }
+        
+        context = {}
+        for name, future in futures.items():
+            remaining = start + CONTEXT_TIMEOUTS.get(name, 5.0) - time.monotonic()
+            try:
+                context[name] = future.result(timeout=max(0.0, remaining)) or ""
+            except FuturesTimeoutError:
+                logger.warning(f"Context provider '{name}' missed its {CONTEXT_TIMEOUTS.get(name, 5.0)}s deadline, continuing without it")
+                context[name] = ""
+            except Exception as e:
+                logger.warning(f"Context provider '{name}' failed: {e}")
+                context[name] = ""
+        return context
+
+    def _recall_memories(self, user_input: str) -> list:
         # --- MEMORY RECALL ---
-        memory_context = ""
         if self.memory:
             try:
-                memories = self.memory.recall(user_input, n_results=3)
-                if memories:
-                    memory_context = "\n🧠 RELEVANT MEMORIES:\n"
-                    for mem in memories:
-                        memory_context += f"- {mem['content']} (Time: {mem['metadata'].get('timestamp')})\n"
+                with span("memory_recall"):
+                    return self.memory.recall(user_input, n_results=3) or []
             except Exception as e:
                 logger.warning(f"Memory Recall Failed: {e}")
-        # ---------------------
-        
+        return []
+
+    def _plan_context(self) -> str:
         # --- PLAN CONTEXT ---
-        plan_context = ""
         try:
-            plan_data = read_plan()
+            with span("read_plan"):
+                plan_data = read_plan()
             if plan_data.get("exists"):
-                plan_context = f"\n🗺️ CURRENT MISSION PLAN:\n{plan_data['text']}\n"
+                return plan_data['text']
         except Exception as e:
             logger.warning(f"Plan Read Failed: {e}")
-        # --------------------
-
-        # Ensure MCP tools are loaded
-        if not self.mcp_initialized:
-             try:
-                self.initialize_mcp()
-             except Exception as e:
-                logger.warning(f"MCP Init deferred/failed: {e}")
+        return ""
+
+    def _build_prompt(self, user_input: str, agent_profile, memories: list, plan_text: str):
+        """Assembles the (possibly multimodal) prompt from the gathered context."""
+        # Large registries (MCP) only list pinned core tools + the top-k matches for this input
+        prefix_tools, extra_tools = split_tools(self.tools, user_input, version=self._tools_version)
+        system_prompt = agent_profile.system_prompt if agent_profile else None
+
+        memory_section = Section(
+            "memory",
+            [f"- {mem['content']} (Time: {mem['metadata'].get('timestamp')})\n" for mem in memories or []],
+            priority=0,
+            header="\n🧠 RELEVANT MEMORIES:\n",
+            # Oldest memories go first
+            drop_order=sorted(range(len(memories or [])), key=lambda i: str(memories[i]['metadata'].get('timestamp') or ""))
+        )
+        plan_section = Section(
+            "plan",
+            (plan_text or "").splitlines(keepends=True),
+            priority=1,
+            header="\n🗺️ CURRENT MISSION PLAN:\n",
+            truncated_note="\n[...plan truncated to fit the prompt budget]\n"
+        )
+        tool_section = Section(
+            "tools",
+            [f"- {name}: {info['description']}\n" for name, info in (extra_tools or {}).items()],
+            priority=2,
+            keys=list(extra_tools or {}),
+            shorten=shorten_line
+        )
 
-        # Construct a prompt that explains available tools
-        tool_desc = "\n".join([f"- {name}: {info['description']}" for name, info in self.tools.items()])
-        
-        # Default Profile if None
-        system_prompt = agent_profile.system_prompt if agent_profile else "You are a helpful AI assistant. Use tools if needed."
-        
-        system_instructions = f"""
-{system_prompt}
+        def kept_tools() -> dict:
+            describe = shorten_line if tool_section.shortened else (lambda text: text)
+            return {
+                name: {**extra_tools[name], "description": describe(extra_tools[name]['description'])}
+                for name in tool_section.kept_keys()
+            }
+
+        # Static prefix (profile + tools) is cached; only this turn's context is rebuilt
+        def build():
+            return self.prompt_assembler.build(
+                user_input,
+                prefix_tools,
+                self._tools_version,
+                system_prompt=system_prompt,
+                memory_context=memory_section.render(),
+                plan_context=plan_section.render(),
+                extra_tools=kept_tools()
+            )
 
-{memory_context}
+        prompt = build()
+        budget = PromptBudget(prompt_token_budget(), get_estimator(provider_of(self.planner_model)))
+        if budget.estimator.count(prompt.text) > budget.max_tokens > 0:
+            # Over budget: trim this turn's context, never the cached prefix or the user input
+            budget.fit([prompt.prefix, user_input], [memory_section, plan_section, tool_section])
+            prompt = build()
+        self.last_prompt = prompt
+        
+        # --- MULTIMODAL PROMPT CONSTRUCTION ---
+        prompt_parts = [prompt.text]
+        
+        # If we have recent images from tool execution, show them to the brain
+        # (downsampled and re-encoded first, see services/image_pipeline.py)
+        if self.last_files:
+            for fpath in self.last_files:
+                if is_image(fpath):
+                    try:
+                        logger.info(f"👁️ Looking at image: {fpath}")
+                        img = get_image_pipeline().load(fpath)
+                        prompt_parts.append(img)
+                        prompt_parts.append(f"\n[Image: {fpath}]")
+                    except Exception as img_err:
+                        logger.error(f"Failed to load image {fpath}: {img_err}")
+            
+            # Clear after seeing them once? Or keep for conversation?
+            # For now, clear to prevent token bloat
+            self.last_files = [] 
+        # ------------------------------------
 
-{plan_context}
+        return prompt_parts if len(prompt_parts) > 1 else prompt_parts[0]
 
-You have access to the following tools:
-{tool_desc}
+    def _record_tokens(self, prompt, response, agent_name: str):
+        """Adds this call's estimated input/output tokens to the ledger (GET /metrics/tokens)."""
+        estimator = get_estimator(provider_of(self.planner_model))
+        token_ledger.record(estimator.count(prompt), estimator.count(response or ""), provider=estimator.provider, agent=agent_name)
 
-INSTRUCTIONS:
-- If the user asks for something that requires a tool, output JSON: {{"action": "tool", "tool_name": "...", "args": {{...}}}}
-- If the user just wants to chat, output JSON: {{"action": "reply", "content": "..."}}
-- If you learn a new important fact, use 'save_memory'.
-- If the user gives a complex goal, use 'create_plan'.
-- **SELF-EVOLUTION**: To build a NEW tool, write a Python file to `squadron/skills/dynamic/NAME.py` containing a function `def NAME(...)`. Then call `refresh_skills`.
-- Be concise.
-"""
+    def _parse_decision(self, response, parser: StreamingDecisionParser = None) -> dict:
+        """
+        Returns the decision found while streaming, or parses (and if needed
+        repairs) the full response, falling back to a plain reply.
+        """
+        # Log raw response for debugging
+        logger.info(f"🧠 Raw LLM Response: {str(response)[:500]}")
         
-        try:
-            # --- MULTIMODAL PROMPT CONSTRUCTION ---
-            prompt_parts = [f"{system_instructions}\nUSER: {user_input}\nRESPONSE (JSON):"]
-            
-            # If we have recent images from tool execution, show them to the brain
-            if hasattr(self, 'last_files') and self.last_files:
-                for fpath in self.last_files:
-                    if fpath.endswith('.png') or fpath.endswith('.jpg'):
-                        try:
-                            logger.info(f"👁️ Looking at image: {fpath}")
-                            img = PIL.Image.open(fpath)
-                            prompt_parts.append(img)
-                            prompt_parts.append(f"\n[Image: {fpath}]")
-                        except Exception as img_err:
-                            logger.error(f"Failed to load image {fpath}: {img_err}")
-                
-                # Clear after seeing them once? Or keep for conversation?
-                # For now, clear to prevent token bloat
-                self.last_files = [] 
-            # ------------------------------------
+        with span("json_parse"):
+            decision = parser.decision if parser and parser.complete else parse_decision(response)
+        if isinstance(decision, dict):
+            logger.info(f"🧠 Parsed Decision: action={decision.get('action')}, tool={decision.get('tool_name', decision.get('tool', 'N/A'))}")
+        return decision
 
-            # We force JSON format for the tool decision
-            response = self.planner_model.generate(
-                prompt=prompt_parts if len(prompt_parts) > 1 else prompt_parts[0],
-                max_tokens=4096,
-                temperature=0.3
-            )
-            
-            # Log raw response for debugging
-            logger.info(f"🧠 Raw LLM Response: {str(response)[:500]}")
-            
-            # Simple clean up of code blocks
-            clean_json = str(response).strip().replace("```json", "").replace("```", "")
-            try:
-                decision = json.loads(clean_json)
-                logger.info(f"🧠 Parsed Decision: action={decision.get('action')}, tool={decision.get('tool_name', decision.get('tool', 'N/A'))}")
-                return decision
-            except json.JSONDecodeError:
-                logger.warning(f"LLM did not return JSON. Raw: {response}")
-                # Fallback: Treat entire response as a reply
-                return {"action": "reply", "content": str(response)}
-            
-        except Exception as e:
-            logger.error(f"Brain freeze: {e}")
+    def _generate(self, prompt, agent_name: str, max_tokens: int, temperature: float, parser=None) -> str:
+        """
+        Calls the planner model, streaming token deltas to the event bus
+        as `agent_token` events when the provider supports it.
+        With a parser, reading stops as soon as the decision object is complete,
+        so tool dispatch doesn't wait for any trailing text.
+        """
+        if getattr(self.planner_model, "supports_streaming", False) is not True:
+            return self.planner_model.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
 
-            return {"action": "reply", "content": f"I'm having trouble thinking clearly right now. Error: {e}"}
+        chunks = []
+        stream = self.planner_model.generate_stream(prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            for delta in stream:
+                chunks.append(delta)
+                emit_agent_token(agent_name, delta)
+                if parser is not None and parser.feed(delta) is not None:
+                    break
+        finally:
+            # Abandon the provider stream once the decision is in
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        return "".join(chunks)
+
+    async def _agenerate(self, prompt, agent_name: str, max_tokens: int, temperature: float, parser=None) -> str:
+        """Async variant of _generate()."""
+        if getattr(self.planner_model, "supports_streaming", False) is not True:
+            return await call_async(self.planner_model, prompt, max_tokens=max_tokens, temperature=temperature)
+
+        chunks = []
+        stream = stream_async(self.planner_model, prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            async for delta in stream:
+                chunks.append(delta)
+                emit_agent_token(agent_name, delta)
+                if parser is not None and parser.feed(delta) is not None:
+                    break
+        finally:
+            await stream.aclose()
+        return "".join(chunks)
 
     def execute(self, decision: dict) -> dict:
         """
-        Executes the tool and returns a dict: {"text": str, "files": [str]}
+        Executes the tool(s) and returns a dict: {"text": str, "files": [str]}
+        Multi-tool decisions also return "results": one dict per call, in order.
         """
         action = decision.get("action", "").lower()
         
@@ -620,77 +755,22 @@ INSTRUCTIONS:
             content = decision.get("content", decision.get("text", decision.get("response", "No response")))
             return {"text": str(content), "files": []}
         
+        # Handle multi-tool action
+        calls = self._extract_tool_calls(decision)
+        if calls is not None:
+            return self._execute_many(calls, parallel=decision.get("parallel", True))
+        
         # Handle tool action
-        elif action == "tool":
+        if action == "tool":
             tool_name = decision.get("tool_name", decision.get("tool", decision.get("name")))
-            tool_info = self.tools.get(tool_name)
             args = decision.get("args", decision.get("arguments", decision.get("parameters", {})))
-            
-            if not tool_info:
-                return {"text": f"Error: Tool '{tool_name}' not found.", "files": []}
-            
-            # --- SAFETY CHECK ---
-            if not self.check_safety(tool_name, args):
-                return {"text": "⛔ Action denied by safety interlock.", "files": []}
-            # --------------------
-
-            try:
-                logger.info(f"🔧 Executing {tool_name} with {args}")
-                
-                agent_name = 'autonomous'
-                emit_tool_call(agent_name, tool_name, args)
-                
-                result = tool_info["func"](**args)
-                
-                # Handle structured tool output (dict) vs legacy simple string
-                if isinstance(result, dict) and "text" in result:
-                    # Capture files for next turn
-                    if "files" in result:
-                        self.last_files = result["files"]
-                    
-                    emit_tool_result(agent_name, tool_name, result["text"])
-                    return result
-                else:
-                    text_result = f"Tool Output: {result}"
-                    emit_tool_result(agent_name, tool_name, text_result)
-                    return {"text": text_result, "files": []}
-                    
-            except Exception as e:
-                agent_name = 'autonomous'
-                emit_error(agent_name, str(e))
-                return {"text": f"Tool Error: {e}", "files": []}
-
+            return self._run_tool(tool_name, args)
         
         # Check if the action name is actually a tool name (Gemini sometimes returns this)
         elif action in self.tools:
-            tool_info = self.tools[action]
             args = decision.get("args", decision.get("arguments", decision.get("parameters", {})))
-            
-            # --- SAFETY CHECK ---
-            if not self.check_safety(action, args):
-                return {"text": "⛔ Action denied by safety interlock.", "files": []}
-            
-            try:
-                logger.info(f"🔧 Executing {action} with {args} (action-as-tool fallback)")
-                agent_name = 'autonomous'
-                emit_tool_call(agent_name, action, args)
-                
-                result = tool_info["func"](**args)
-                
-                if isinstance(result, dict) and "text" in result:
-                    if "files" in result:
-                        self.last_files = result["files"]
-                    emit_tool_result(agent_name, action, result["text"])
-                    return result
-                else:
-                    text_result = f"Tool Output: {result}"
-                    emit_tool_result(agent_name, action, text_result)
-                    return {"text": text_result, "files": []}
-                    
-            except Exception as e:
-                agent_name = 'autonomous'
-                emit_error(agent_name, str(e))
-                return {"text": f"Tool Error: {e}", "files": []}
+            logger.info(f"🔧 {action} requested as action (action-as-tool fallback)")
+            return self._run_tool(action, args)
 
         
         # Fallback: Try to extract any text-like content from the decision
@@ -704,5 +784,151 @@ INSTRUCTIONS:
         logger.warning(f"Unknown action '{action}', using fallback: {fallback_content[:100]}")
         return {"text": str(fallback_content), "files": []}
 
-# Singleton instance
-brain = SquadronBrain()
+    async def aexecute(self, decision: dict) -> dict:
+        """
+        Async execute(). Tools are synchronous, so they run in a worker thread
+        (multi-tool batches still fan out on the shared tool pool from there).
+        """
+        if decision.get("action", "").lower() == "reply":
+            return self.execute(decision)
+        return await asyncio.to_thread(self.execute, decision)
+
+    def _extract_tool_calls(self, decision: dict):
+        """
+        Returns [(tool_name, args), ...] for multi-tool decisions, or None.
+        Accepts {"action": "tools", "calls": [...]} and a "tool_calls" list on either action.
+        """
+        calls = decision.get("calls", decision.get("tool_calls"))
+        if decision.get("action", "").lower() not in ("tool", "tools") or not isinstance(calls, list):
+            return None
+        
+        parsed = []
+        for call in calls:
+            if not isinstance(call, dict):
+                continue
+            tool_name = call.get("tool_name", call.get("tool", call.get("name")))
+            args = call.get("args", call.get("arguments", call.get("parameters", {})))
+            parsed.append((tool_name, args or {}))
+        return parsed
+
+    def _run_tool(self, tool_name: str, args: dict) -> dict:
+        """Safety-checks and runs a single tool, capturing its files for the next turn."""
+        if tool_name not in self.tools:
+            return {"text": f"Error: Tool '{tool_name}' not found.", "files": []}
+        
+        # --- SAFETY CHECK ---
+        with span("safety_check", tool=tool_name):
+            approved = self.check_safety(tool_name, args)
+        if not approved:
+            return {"text": "⛔ Action denied by safety interlock.", "files": []}
+        # --------------------
+        
+        result = self._invoke_tool(tool_name, args)
+        if result.get("files"):
+            self.last_files = list(result["files"])
+        return result
+
+    def _invoke_tool(self, tool_name: str, args: dict) -> dict:
+        """
+        Calls the tool function and normalizes its output.
+        Does not touch brain state, so it is safe to run on worker threads.
+        """
+        tool_info = self.tools[tool_name]
+        agent_name = 'autonomous'
+        try:
+            logger.info(f"🔧 Executing {tool_name} with {args}")
+            emit_tool_call(agent_name, tool_name, args)
+            
+            func = tool_info["func"]
+            with span("tool_execution", tool=tool_name):
+                if tool_info.get("bind"):
+                    result = func(self, **(args or {}))
+                else:
+                    result = func(**(args or {}))
+            
+            # Handle structured tool output (dict) vs legacy simple string
+            if isinstance(result, dict) and "text" in result:
+                emit_tool_result(agent_name, tool_name, result["text"])
+                return result
+            else:
+                text_result = f"Tool Output: {result}"
+                emit_tool_result(agent_name, tool_name, text_result)
+                return {"text": text_result, "files": []}
+                
+        except Exception as e:
+            emit_error(agent_name, str(e))
+            return {"text": f"Tool Error: {e}", "files": []}
+
+    def _execute_many(self, calls: list, parallel: bool = True) -> dict:
+        """
+        Runs several tool calls and combines their results in call order.
+        
+        Consecutive non-hazardous calls are dispatched together on the shared tool pool.
+        Hazardous and sequential tools (state writes like plans and memories, delegation,
+        mouse/keyboard input) act as barriers:
+        everything before them finishes first, and they run alone (after any safety
+        check), so ordering like write-then-read is preserved.
+        """
+        results = [None] * len(calls)
+        batch = []
+        
+        for i, (tool_name, args) in enumerate(calls):
+            tool_info = self.tools.get(tool_name)
+            if parallel and tool_info and not tool_info.get("hazardous", False) and not tool_info.get("sequential", False):
+                batch.append(i)
+                continue
+            self._run_batch(calls, batch, results)
+            batch = []
+            results[i] = self._run_tool(tool_name, args)
+        self._run_batch(calls, batch, results)
+        
+        files = []
+        sections = []
+        for i, ((tool_name, _), result) in enumerate(zip(calls, results), 1):
+            files.extend(result.get("files") or [])
+            sections.append(f"[{i}] {tool_name}:\n{result.get('text', '')}")
+        if files:
+            self.last_files = files
+        
+        return {"text": "\n\n".join(sections), "files": files, "results": results}
+
+    def _run_batch(self, calls: list, batch: list, results: list):
+        """
+        Runs a batch of independent, non-hazardous calls concurrently.
+        A batch started from inside a pool thread (a tool that runs another brain's
+        decision) runs inline: waiting on the bounded pool from one of its own
+        workers could deadlock once every worker is doing the same.
+        """
+        if not batch:
+            return
+        if len(batch) == 1 or getattr(_tool_worker, "active", False):
+            for i in batch:
+                results[i] = self._invoke_tool(*calls[i])
+            return
+        
+        pool = _get_tool_pool()
+        # copy_context() so timing spans keep their agent/mission tags on pool threads
+        futures = {
+            i: pool.submit(contextvars.copy_context().run, _run_on_tool_pool, self._invoke_tool, *calls[i])
+            for i in batch
+        }
+        for i, future in futures.items():
+            results[i] = future.result()
+
+# Singleton instance (created on first access, so importing this module stays cheap)
+_brain = None
+
+
+def get_brain() -> SquadronBrain:
+    """Get or create the global brain instance."""
+    global _brain
+    if _brain is None:
+        _brain = SquadronBrain()
+    return _brain
+
+
+def __getattr__(name):
+    # Keeps `from squadron.brain import brain` working
+    if name == "brain":
+        return get_brain()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,111 +2,329 @@ import asyncio
 import os
 import shutil
 import logging
+import time
+from concurrent.futures import Future
 from typing import Dict, Any, List, Optional
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import CONNECTION_CLOSED
 
-# We need a robust way to manage multiple server connections
-# Each server runs as a separate subprocess
+from squadron.services.runtime import get_runtime
+
+# Each server runs as a separate subprocess with one long-lived ClientSession.
+# Sessions live on the shared runtime loop; sync callers submit to it.
 
 logger = logging.getLogger("MCPClient")
 
+# Raised when writing to a server whose process has already gone away (request never sent)
+_DISCONNECTED = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, ConnectionError)
+
+
+def _connection_closed(error: Exception) -> bool:
+    """True if the server went away while a request was in flight."""
+    return getattr(getattr(error, "error", None), "code", None) == CONNECTION_CLOSED
+
+
+def _server_params(config: Dict[str, Any]) -> StdioServerParameters:
+    return StdioServerParameters(
+        command=config.get("command"),
+        args=config.get("args", []),
+        env={**os.environ, **(config.get("env") or {})}
+    )
+
+
+class ServerSession:
+    """
+    One MCP server process and its ClientSession.
+    stdio_client/ClientSession must be entered and exited by the same task, so a
+    dedicated owner task holds them open until close(). Calls from other tasks are
+    multiplexed over the session by request id.
+    """
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.config = config
+        self.session: Optional[ClientSession] = None
+        self.started = time.monotonic()
+        self.last_used = self.started
+        self.calls = 0
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float):
+        """Spawns the server and completes the handshake. Raises on failure or timeout."""
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.name}")
+        ready = asyncio.create_task(self._ready.wait())
+        try:
+            await asyncio.wait({ready, self._task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # e.g. a discovery timeout; don't leave the process running
+            ready.cancel()
+            self._abort()
+            raise
+        if not self._ready.is_set():
+            ready.cancel()
+            self._abort()
+            raise self._error or TimeoutError(f"MCP server '{self.name}' did not start within {timeout}s")
+
+    async def _run(self):
+        try:
+            async with stdio_client(_server_params(self.config)) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            logger.error(f"MCP session '{self.name}' ended: {e}")
+        finally:
+            self.session = None
+
+    async def list_tools(self):
+        self.last_used = time.monotonic()
+        return await self.session.list_tools()
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        self.last_used = time.monotonic()
+        self.calls += 1
+        return await self.session.call_tool(tool_name, arguments=arguments)
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    def _abort(self):
+        """Tears down a session that never became ready, without waiting for the process."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def close(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+
+
 class MCPBridge:
     """
     Bridge between Squadron Brain and MCP Servers.
+    Keeps one session per server on the shared runtime loop: sessions start on
+    first use, restart if the process dies, are pinged every `health_interval`
+    seconds, and shut down after `idle_timeout` seconds without calls.
     """
-    def __init__(self):
-        self.sessions: Dict[str, ClientSession] = {}
+    def __init__(
+        self,
+        idle_timeout: float = None,
+        health_interval: float = None,
+        start_timeout: float = None,
+        call_timeout: float = None,
+        discovery_timeout: float = None
+    ):
+        self.sessions: Dict[str, ServerSession] = {}
         self.tools_registry: Dict[str, Any] = {} # tool_name -> {server_name, tool_def}
+        self.idle_timeout = idle_timeout or float(os.getenv("SQUADRON_MCP_IDLE_TIMEOUT", "600"))
+        self.health_interval = health_interval or float(os.getenv("SQUADRON_MCP_HEALTH_INTERVAL", "60"))
+        self.start_timeout = start_timeout or float(os.getenv("SQUADRON_MCP_START_TIMEOUT", "60"))
+        self.call_timeout = call_timeout or float(os.getenv("SQUADRON_MCP_CALL_TIMEOUT", "120"))
+        self.discovery_timeout = discovery_timeout or float(os.getenv("SQUADRON_MCP_DISCOVERY_TIMEOUT", "30"))
+        self._server_locks: Dict[str, asyncio.Lock] = {}
+        self._janitor: Optional[asyncio.Task] = None
 
-    async def connect_server(self, name: str, config: Dict[str, Any]):
+    # --- Runtime loop ---
+
+    def _on_loop(self) -> bool:
+        return get_runtime().in_runtime()
+
+    def submit(self, coro) -> Future:
+        """Schedules `coro` on the runtime loop from any thread."""
+        return get_runtime().submit(coro)
+
+    async def _hop(self, coro):
+        """Awaits `coro` on the runtime loop when called from some other loop."""
+        if self._on_loop():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    # --- Sessions ---
+
+    async def connect_server(self, name: str, config: Dict[str, Any]) -> ServerSession:
         """
-        Connect to an MCP server using stdio.
+        Returns the live session for `name`, starting (or restarting) it if needed.
         Config example: {'command': 'npx', 'args': ['-y', '@modelcontextprotocol/server-filesystem']}
         """
-        command = config.get("command")
-        args = config.get("args", [])
-        env = config.get("env", None)
+        if not self._on_loop():
+            return await self._hop(self.connect_server(name, config))
+
+        lock = self._server_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            session = self.sessions.get(name)
+            if session is not None and session.alive:
+                return session
+            if session is not None:
+                logger.warning(f"🔁 Restarting MCP server '{name}'")
+                await session.close()
+                self.sessions.pop(name, None)
+
+            command = config.get("command")
+            if not shutil.which(command or ""):
+                raise FileNotFoundError(f"Command not found: {command}")
 
-        if not shutil.which(command):
-            logger.error(f"Command not found: {command}")
+            session = ServerSession(name, config)
+            await session.start(self.start_timeout)
+            self.sessions[name] = session
+            if self._janitor is None or self._janitor.done():
+                self._janitor = asyncio.create_task(self._janitor_loop())
+            logger.info(f"🔌 MCP session open: {name}")
+            return session
+
+    async def _janitor_loop(self):
+        """Closes idle sessions and drops unhealthy ones (they restart on next use)."""
+        while self.sessions:
+            await asyncio.sleep(self.health_interval)
+            now = time.monotonic()
+            for name, session in list(self.sessions.items()):
+                if now - session.last_used > self.idle_timeout:
+                    logger.info(f"💤 Closing idle MCP session: {name}")
+                elif session.alive and await session.ping(timeout=min(10.0, self.health_interval)):
+                    continue
+                else:
+                    logger.warning(f"MCP session '{name}' failed its health check")
+                if self.sessions.get(name) is session:
+                    self.sessions.pop(name)
+                await session.close()
+
+    async def close_server(self, name: str):
+        session = self.sessions.pop(name, None)
+        if session is not None:
+            await self._hop(session.close())
+
+    def shutdown(self, timeout: float = 10.0):
+        """Closes every session (the runtime also cancels them when it stops at exit)."""
+        if not self.sessions:
             return
 
-        server_params = StdioServerParameters(
-            command=command,
-            args=args,
-            env={**os.environ, **(env or {})}
-        )
+        async def close_all():
+            if self._janitor is not None:
+                self._janitor.cancel()
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+            await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
 
         try:
-            # We need to maintain the connection context.
-            # In a real app, we'd manage the context manager lifecycle properly.
-            # For this MVP, we might need a dedicated Task or running loop.
-            # However, mcp.client.stdio_client is an async context manager.
-            # We will store the context manager to keep it alive? No, we need to enter it.
-            
-            # TODO: Refactor for long-lived connections.
-            # For now, we will perform "Just-In-Time" connections for tool listing and execution
-            # OR we spawn a background task to hold the connection.
-            # Let's try JIT for simplicity first, but that's slow.
-            # Let's try to hold them.
-            pass
-
+            self.submit(close_all()).result(timeout)
         except Exception as e:
-            logger.error(f"Failed to connect to {name}: {e}")
+            logger.warning(f"MCP shutdown did not finish cleanly: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            name: {
+                "alive": session.alive,
+                "calls": session.calls,
+                "idle_s": round(now - session.last_used, 1),
+                "uptime_s": round(now - session.started, 1)
+            }
+            for name, session in list(self.sessions.items())
+        }
+
+    # --- Tools ---
 
     async def list_tools(self, name: str, config: Dict[str, Any]) -> List[Dict]:
         """
-        Connects briefly to list tools.
+        Lists a server's tools over its session (which stays open for later calls).
+        Returns JSON-serializable tool dicts; raises if the server can't be reached.
         """
-        tools = []
-        command = config.get("command")
-        args = config.get("args", [])
-        env = config.get("env", None)
-        
-        server_params = StdioServerParameters(command=command, args=args, env={**os.environ, **(env or {})})
+        if not self._on_loop():
+            return await self._hop(self.list_tools(name, config))
 
+        tools = []
         try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    result = await session.list_tools()
-                    for tool in result.tools:
-                        # Prefix tool name to avoid collisions: "filesystem_read_file"
-                        tool_name = f"{name}_{tool.name}" 
-                        self.tools_registry[tool_name] = {
-                            "server_name": name,
-                            "original_name": tool.name,
-                            "config": config,
-                            "description": tool.description,
-                            "inputSchema": tool.inputSchema
-                        }
-                        tools.append(self.tools_registry[tool_name])
-                    logger.info(f"Loaded {len(result.tools)} tools from {name}")
+            session = await self.connect_server(name, config)
+            result = await session.list_tools()
+            for tool in result.tools:
+                tools.append({
+                    # Prefix tool name to avoid collisions: "filesystem_read_file"
+                    "tool_name": f"{name}_{tool.name}",
+                    "original_name": tool.name,
+                    "description": tool.description,
+                    # mcp 2.x renamed inputSchema to input_schema
+                    "inputSchema": getattr(tool, "input_schema", None) or getattr(tool, "inputSchema", None)
+                })
+            logger.info(f"Loaded {len(result.tools)} tools from {name}")
         except Exception as e:
             logger.error(f"Error listing tools from {name}: {e}")
-        
+            raise
+
+        self.register_server_tools(name, config, tools)
         return tools
 
+    def discover(self, servers: Dict[str, Dict[str, Any]], timeout: float = None) -> Dict[str, Future]:
+        """
+        Starts tool discovery for every server at once and returns one future per
+        server, so callers can register each result as soon as it arrives.
+        A server that takes longer than `timeout` fails with TimeoutError.
+        """
+        timeout = timeout or self.discovery_timeout
+        return {name: self.submit(self._discover_one(name, config, timeout)) for name, config in servers.items()}
+
+    async def _discover_one(self, name: str, config: Dict[str, Any], timeout: float) -> List[Dict]:
+        try:
+            return await asyncio.wait_for(self.list_tools(name, config), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"MCP server '{name}' did not list its tools within {timeout:.0f}s")
+
+    def register_server_tools(self, name: str, config: Dict[str, Any], tools: List[Dict]):
+        """Records how to call a server's tools (also used for tool lists loaded from cache)."""
+        for tool in tools:
+            self.tools_registry[tool["tool_name"]] = {
+                "server_name": name,
+                "config": config,
+                **tool
+            }
+
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
-        Executes a tool by reconnecting to the server.
+        Executes a tool over the server's persistent session.
+        A dead server is restarted on the next call; a call that failed before
+        reaching the server is retried once on the new session.
         """
+        if not self._on_loop():
+            return await self._hop(self.call_tool(tool_name, arguments))
+
         tool_info = self.tools_registry.get(tool_name)
         if not tool_info:
             raise ValueError(f"Tool {tool_name} not found")
 
-        config = tool_info["config"]
-        original_name = tool_info["original_name"]
-        
-        server_params = StdioServerParameters(
-            command=config.get("command"),
-            args=config.get("args", []),
-            env={**os.environ, **(config.get("env") or {})}
-        )
-
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(original_name, arguments=arguments)
-                return result
+        server = tool_info["server_name"]
+        for attempt in (1, 2):
+            session = await self.connect_server(server, tool_info["config"])
+            try:
+                return await session.call_tool(tool_info["original_name"], arguments)
+            except Exception as e:
+                unsent = isinstance(e, _DISCONNECTED)
+                if not (unsent or _connection_closed(e) or not session.alive):
+                    raise  # A tool/protocol error; the session is fine
+                if self.sessions.get(server) is session:
+                    self.sessions.pop(server)
+                await session.close()
+                # Only a request that never reached the server is safe to resend
+                if not unsent or attempt == 2:
+                    raise
+                logger.warning(f"MCP server '{server}' had exited; retrying {tool_name} on a new session")
+
+    def call_tool_sync(self, tool_name: str, arguments: Dict[str, Any], timeout: float = None) -> Any:
+        """Blocking call_tool for worker threads."""
+        return self.submit(self.call_tool(tool_name, arguments)).result(timeout or self.call_timeout)
@@ -12,13 +12,22 @@ OpenCode provides:
 - MCP integration
 """
 
+import asyncio
 import logging
-import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 
 logger = logging.getLogger('OpenCodeEngine')
 
+# Idle seconds before a pooled session is dropped, and the most kept at once
+SESSION_TTL = float(os.getenv("SQUADRON_OPENCODE_SESSION_TTL", "1800"))
+MAX_SESSIONS = int(os.getenv("SQUADRON_OPENCODE_MAX_SESSIONS", "16"))
+
 # Try to import OpenCode SDK
 try:
     from opencode_sdk import OpencodeClient
@@ -37,6 +46,86 @@ class AgentProfile:
     personality: str = "professional"
 
 
+@dataclass
+class PooledSession:
+    """An OpenCode session owned by one agent (optionally for one mission)."""
+    session_id: str
+    agent: str
+    mission: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    primed: bool = False  # System prompt already sent
+    messages: int = 0
+
+
+class SessionPool:
+    """
+    Sessions keyed by (agent, mission), so agents don't share conversation context.
+    Idle sessions expire after `ttl` seconds; past `max_sessions` the least
+    recently used one is evicted. Expired sessions are kept aside until
+    take_expired() so the engine can close them on the server.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[tuple[str, Optional[str]], PooledSession]" = OrderedDict()
+        self._expired: List[PooledSession] = []
+        self._lock = threading.Lock()
+
+    def get(self, agent: str, mission: Optional[str] = None) -> Optional[PooledSession]:
+        """The live session for (agent, mission), refreshed as most recently used."""
+        key = (agent, mission)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return None
+            if time.time() - session.last_used > self.ttl:
+                del self._sessions[key]
+                self._expired.append(session)
+                logger.info(f"⌛ Session {session.session_id} for {agent} expired")
+                return None
+            session.last_used = time.time()
+            self._sessions.move_to_end(key)
+            return session
+
+    def put(self, session: PooledSession) -> List[PooledSession]:
+        """Adds a session; returns any evicted to stay under the cap."""
+        evicted = []
+        with self._lock:
+            self._sessions[(session.agent, session.mission)] = session
+            self._sessions.move_to_end((session.agent, session.mission))
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1])
+        return evicted
+
+    def take_expired(self) -> List[PooledSession]:
+        """Sessions that expired since the last call."""
+        with self._lock:
+            expired, self._expired = self._expired, []
+        return expired
+
+    def discard(self, agent: str, mission: Optional[str] = None) -> Optional[PooledSession]:
+        with self._lock:
+            return self._sessions.pop((agent, mission), None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "agent": s.agent,
+                    "mission": s.mission,
+                    "session_id": s.session_id,
+                    "messages": s.messages,
+                    "idle_s": round(time.time() - s.last_used, 1)
+                }
+                for s in self._sessions.values()
+            ]
+
+
 class OpenCodeEngine:
     """
     The new brain for Squadron, powered by OpenCode.
@@ -54,7 +143,9 @@ class OpenCodeEngine:
         """
         self.base_url = base_url
         self.client: Optional[OpencodeClient] = None
-        self.current_session: Optional[str] = None
+        self.sessions = SessionPool()
+        self._creating: Dict[tuple, Future] = {}  # (agent, mission) -> session being created
+        self._creating_lock = threading.Lock()
         self.agent_profiles: Dict[str, AgentProfile] = {}
         
         # Define our agents
@@ -108,16 +199,74 @@ When given a task, you focus on implementation and code quality.""",
             return "mock-session"
         
         try:
-            profile = self.agent_profiles.get(agent_name, self.agent_profiles["Caleb"])
             session = await self.client.create_session()
-            self.current_session = session.get("id", session.get("session_id"))
-            logger.info(f"📝 Created session {self.current_session} for {agent_name}")
-            return self.current_session
+            session_id = session.get("id", session.get("session_id"))
+            logger.info(f"📝 Created session {session_id} for {agent_name}")
+            return session_id
         except Exception as e:
             logger.error(f"Failed to create session: {e}")
             return "error-session"
     
-    async def think(self, user_input: str, agent_name: str = "Caleb") -> Dict[str, Any]:
+    async def acquire_session(self, agent_name: str, mission_id: Optional[str] = None) -> Optional[PooledSession]:
+        """
+        The pooled session for this agent (and mission), creating one if needed.
+        Concurrent first calls for the same key share one creation (from any loop).
+        Returns None if a session can't be created.
+        """
+        key = (agent_name, mission_id)
+        with self._creating_lock:
+            session = self.sessions.get(agent_name, mission_id)
+            if session is not None:
+                return session
+            pending = self._creating.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._creating[key] = Future()
+        if not owner:
+            return await asyncio.wrap_future(pending)
+        
+        try:
+            session_id = await self.create_session(agent_name)
+            session = None
+            retired = self.sessions.take_expired()
+            if session_id != "error-session":
+                session = PooledSession(session_id=session_id, agent=agent_name, mission=mission_id)
+                retired += self.sessions.put(session)
+            pending.set_result(session)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._creating_lock:
+                self._creating.pop(key, None)
+        
+        for old in retired:
+            await self.close_session(old)
+        return session
+    
+    async def close_session(self, session: PooledSession):
+        """Deletes an evicted or expired session on the OpenCode server."""
+        logger.info(f"♻️ Closing session {session.session_id} ({session.agent})")
+        delete = getattr(self.client, "delete_session", None)
+        if delete is None:
+            return
+        try:
+            await delete(session_id=session.session_id)
+        except Exception as e:
+            logger.warning(f"Failed to close session {session.session_id}: {e}")
+    
+    def _format_message(self, session: PooledSession, profile: AgentProfile, user_input: str) -> str:
+        """The agent's system prompt goes out once, with the first message of a session."""
+        if session.primed:
+            return f"Task: {user_input}"
+        return f"""[Agent: {profile.name}]
+{profile.system_prompt}
+
+Task: {user_input}
+
+Please analyze this task and take appropriate action."""
+    
+    async def think(self, user_input: str, agent_name: str = "Caleb", mission_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a task using OpenCode.
         
@@ -126,6 +275,7 @@ When given a task, you focus on implementation and code quality.""",
         Args:
             user_input: The task to process
             agent_name: Which agent should handle this
+            mission_id: Optional mission to scope the agent's session to
             
         Returns:
             Dict with action details
@@ -142,24 +292,23 @@ When given a task, you focus on implementation and code quality.""",
             }
         
         try:
-            # Ensure we have a session
-            if not self.current_session:
-                await self.create_session(agent_name)
-            
-            # Format the message with agent context
-            full_message = f"""[Agent: {agent_name}]
-{profile.system_prompt}
-
-Task: {user_input}
-
-Please analyze this task and take appropriate action."""
+            session = await self.acquire_session(agent_name, mission_id)
+            if session is None:
+                raise RuntimeError(f"No OpenCode session available for {agent_name}")
             
             # Send to OpenCode
             logger.info(f"🧠 [{agent_name}] Thinking about: {user_input[:50]}...")
-            response = await self.client.send_message(
-                session_id=self.current_session,
-                message=full_message
-            )
+            try:
+                response = await self.client.send_message(
+                    session_id=session.session_id,
+                    message=self._format_message(session, profile, user_input)
+                )
+            except Exception:
+                # The session may be gone server-side; start fresh next time
+                self.sessions.discard(agent_name, mission_id)
+                raise
+            session.primed = True
+            session.messages += 1
             
             # Parse response
             result = {
@@ -180,25 +329,14 @@ Please analyze this task and take appropriate action."""
                 "agent": agent_name
             }
     
-    def think_sync(self, user_input: str, agent_name: str = "Caleb") -> Dict[str, Any]:
+    def think_sync(self, user_input: str, agent_name: str = "Caleb", mission_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Synchronous version of think() for compatibility with existing code.
         """
-        import asyncio
+        from squadron.services.runtime import run_sync
         
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If we're already in an async context, create a new task
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as pool:
-                    future = pool.submit(
-                        asyncio.run,
-                        self.think(user_input, agent_name)
-                    )
-                    return future.result()
-            else:
-                return loop.run_until_complete(self.think(user_input, agent_name))
+            return run_sync(self.think(user_input, agent_name, mission_id))
         except Exception as e:
             logger.error(f"Sync think error: {e}")
             return {
@@ -221,7 +359,8 @@ Please analyze this task and take appropriate action."""
             "name": profile.name,
             "status": "idle",
             "specialties": profile.specialties,
-            "personality": profile.personality
+            "personality": profile.personality,
+            "sessions": sum(1 for s in self.sessions.get_stats() if s["agent"] == agent_name)
         }
 
 
@@ -72,7 +72,7 @@ def start_listening():
                 decision = brain.think(text, agent)
                 
                 # 2. Act
-                if decision["action"] == "tool":
+                if decision["action"] in ("tool", "tools"):
                     # Notify we are working...
                     say(f"🛠️ {agent_name} is working on that...", username=agent_name, icon_url=avatar_url)
                     result_dict = brain.execute(decision)
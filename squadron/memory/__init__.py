@@ -6,6 +6,7 @@ from squadron.memory.hippocampus import (
     Hippocampus,
     memory_store,
     remember,
+    remember_many,
     recall,
     get_context_for_task
 )
@@ -14,6 +15,7 @@ __all__ = [
     "Hippocampus",
     "memory_store",
     "remember",
+    "remember_many",
     "recall",
     "get_context_for_task"
 ]
@@ -8,16 +8,39 @@ Features:
 - Semantic search with context
 - Memory summaries and consolidation
 - Ticket/task memory associations
+- Batched writes (remember_many) for bulk imports
+- Without ChromaDB: append-only JSONL log (see memory_log.py) and BM25
+  keyword recall (see keyword_index.py)
 """
 import os
 import uuid
+import heapq
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Optional
+
+from squadron.services.embeddings import get_chroma_embedder, get_embedding_cache
+from squadron.memory.keyword_index import KeywordIndex
+from squadron.memory.memory_log import MemoryLog, add_entry
 
 logger = logging.getLogger('Hippocampus')
 
+_recall_pool = None
+_recall_pool_lock = threading.Lock()
+
+
+def _get_recall_pool() -> ThreadPoolExecutor:
+    """Lazily creates the thread pool that queries agent collections concurrently."""
+    global _recall_pool
+    with _recall_pool_lock:
+        if _recall_pool is None:
+            _recall_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="squadron-recall")
+        return _recall_pool
+
 
 class Hippocampus:
     """
@@ -41,8 +64,15 @@ class Hippocampus:
         except ImportError:
             logger.warning("ChromaDB not available, using JSON fallback")
             self._chromadb_available = False
-            self._json_path = os.path.join(persist_dir, "memories.json")
+            self._json_path = os.path.join(persist_dir, "memories.json")  # Legacy format, migrated on load
+            self._json_lock = threading.RLock()
+            self._log = MemoryLog(os.path.join(persist_dir, "memories.jsonl"))
             self._memories = self._load_json_memories()
+            self._maybe_compact(self._memories)
+            self._index = KeywordIndex()
+            for agent, memories in self._memories.items():
+                for memory in memories.values():
+                    self._index_memory(agent, memory)
         
         # Initialize collections per agent
         self.collections = {}
@@ -60,22 +90,37 @@ class Hippocampus:
         else:
             for agent in agents:
                 if agent not in self._memories:
-                    self._memories[agent] = []
+                    self._memories[agent] = {}
     
     def _load_json_memories(self) -> dict:
-        """Load memories from JSON fallback."""
-        if os.path.exists(self._json_path):
+        """Replay the JSONL log ({agent: {id: memory}}), migrating a legacy memories.json first."""
+        if os.path.exists(self._json_path) and not os.path.exists(self._log.path):
             try:
                 with open(self._json_path, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
+                    legacy = json.load(f)
+                self._log.rewrite({agent: {m["id"]: m for m in mems} for agent, mems in legacy.items()})
+                os.replace(self._json_path, self._json_path + ".migrated")
+                logger.info(f"📜 Migrated {self._json_path} to {self._log.path}")
+            except Exception as e:
+                logger.warning(f"Could not migrate {self._json_path}: {e}")
+        return self._log.load()
+    
+    def _index_memory(self, agent: str, memory: dict):
+        self._index.add(memory["id"], memory["text"], agent, memory["metadata"].get("memory_type"))
     
-    def _save_json_memories(self):
-        """Save memories to JSON fallback."""
-        with open(self._json_path, 'w') as f:
-            json.dump(self._memories, f, indent=2)
+    def _log_append(self, entries: list):
+        """Append to the JSON fallback log, compacting in the background once it is mostly dead lines."""
+        self._log.append(entries)
+        self._maybe_compact(self._memories)
+    
+    def _maybe_compact(self, memories: dict):
+        if self._log.needs_compaction(sum(len(m) for m in memories.values())):
+            self._log.compact_in_background(self._snapshot)
+    
+    def _snapshot(self):
+        """Copy of the live memories plus the log size it corresponds to."""
+        with self._json_lock:
+            return {agent: dict(mems) for agent, mems in self._memories.items()}, self._log.size
     
     def remember(
         self, 
@@ -96,41 +141,80 @@ class Hippocampus:
         Returns:
             Memory ID
         """
-        if metadata is None:
-            metadata = {}
+        return self.remember_many([
+            {"text": text, "agent": agent, "metadata": metadata, "memory_type": memory_type}
+        ])[0]
+    
+    def remember_many(self, items: List[Dict]) -> List[Optional[str]]:
+        """
+        Store many memories in one batch.
+        
+        Memories are grouped per agent collection: each collection gets a single
+        `add` (so ChromaDB embeds the group in one batch), and the JSON fallback
+        is flushed to disk once for the whole batch.
+        
+        Args:
+            items: Dicts with the remember() arguments: "text", and optionally
+                "agent", "metadata", "memory_type"
         
-        metadata["timestamp"] = datetime.now().isoformat()
-        metadata["memory_type"] = memory_type
-        metadata["agent"] = agent
+        Returns:
+            Memory IDs in the order of `items` (None where storing failed)
+        """
+        timestamp = datetime.now().isoformat()
+        groups: Dict[str, List[int]] = {}
+        records = []
+        for item in items:
+            agent = item.get("agent") or "shared"
+            metadata = dict(item.get("metadata") or {})
+            metadata["timestamp"] = timestamp
+            metadata["memory_type"] = item.get("memory_type") or "general"
+            metadata["agent"] = agent
+            records.append({"id": str(uuid.uuid4()), "text": item["text"], "metadata": metadata})
+            
+            target = agent if not self._chromadb_available or agent in self.collections else "shared"
+            groups.setdefault(target, []).append(len(records) - 1)
         
-        mem_id = str(uuid.uuid4())
+        ids: List[Optional[str]] = [record["id"] for record in records]
         
         if self._chromadb_available:
-            collection = self.collections.get(agent) or self.collections["shared"]
-            try:
-                collection.add(
-                    documents=[text],
-                    metadatas=[metadata],
-                    ids=[mem_id]
-                )
-                logger.info(f"💾 [{agent}] Stored: '{text[:50]}...' ({mem_id})")
-                return mem_id
-            except Exception as e:
-                logger.error(f"Memory store failed: {e}")
-                return None
+            batch_size = self._max_batch_size()
+            for target, indexes in groups.items():
+                collection = self.collections[target]
+                for start in range(0, len(indexes), batch_size):
+                    chunk = indexes[start:start + batch_size]
+                    try:
+                        collection.add(
+                            documents=[records[i]["text"] for i in chunk],
+                            metadatas=[records[i]["metadata"] for i in chunk],
+                            ids=[records[i]["id"] for i in chunk]
+                        )
+                    except Exception as e:
+                        logger.error(f"Memory store failed: {e}")
+                        for i in chunk:
+                            ids[i] = None
         else:
             # JSON fallback
-            if agent not in self._memories:
-                self._memories[agent] = []
-            
-            self._memories[agent].append({
-                "id": mem_id,
-                "text": text,
-                "metadata": metadata
-            })
-            self._save_json_memories()
-            logger.info(f"💾 [{agent}] Stored: '{text[:50]}...'")
-            return mem_id
+            with self._json_lock:
+                for target, indexes in groups.items():
+                    memories = self._memories.setdefault(target, {})
+                    for i in indexes:
+                        memories[records[i]["id"]] = records[i]
+                        self._index_memory(target, records[i])
+                self._log_append([add_entry(target, records[i]) for target, indexes in groups.items() for i in indexes])
+        
+        if len(records) == 1 and ids[0]:
+            logger.info(f"💾 [{records[0]['metadata']['agent']}] Stored: '{records[0]['text'][:50]}...' ({ids[0]})")
+        elif records:
+            stored = sum(1 for mem_id in ids if mem_id)
+            logger.info(f"💾 Stored {stored}/{len(records)} memories across {len(groups)} collection(s)")
+        return ids
+    
+    def _max_batch_size(self) -> int:
+        """Largest add() the ChromaDB client accepts at once."""
+        try:
+            return max(1, int(self.client.get_max_batch_size()))
+        except Exception:
+            return 5000
     
     def recall(
         self, 
@@ -159,73 +243,96 @@ class Hippocampus:
             return self._recall_json(query, agent, n_results, memory_type, include_shared)
     
     def _recall_chromadb(self, query, agent, n_results, memory_type, include_shared):
-        """ChromaDB-based recall."""
-        all_results = []
-        
+        """
+        ChromaDB-based recall. The query is embedded once and every collection is
+        queried concurrently with that embedding; each returns results ranked by
+        distance, so they are heap-merged.
+        """
         # Build list of collections to search
-        collections_to_search = []
+        names = []
         if agent and agent in self.collections:
-            collections_to_search.append(self.collections[agent])
+            names.append(agent)
         if include_shared and "shared" in self.collections:
-            collections_to_search.append(self.collections["shared"])
+            names.append("shared")
         if not agent:
-            collections_to_search = list(self.collections.values())
+            names = list(self.collections)
+        collections_to_search = [self.collections[name] for name in dict.fromkeys(names)]
+        if not collections_to_search:
+            return []
         
         where_filter = None
         if memory_type:
             where_filter = {"memory_type": memory_type}
         
-        for collection in collections_to_search:
+        query_args = {"query_texts": [query]}
+        embedding = self._embed_query(query)
+        if embedding is not None:
+            query_args = {"query_embeddings": [embedding]}
+        
+        def search(collection) -> List[Dict]:
             try:
                 results = collection.query(
-                    query_texts=[query],
                     n_results=n_results,
-                    where=where_filter
+                    where=where_filter,
+                    **query_args
                 )
-                
-                if results["documents"]:
-                    for i, doc in enumerate(results["documents"][0]):
-                        meta = results["metadatas"][0][i] if results["metadatas"] else {}
-                        distance = results["distances"][0][i] if "distances" in results else 0
-                        all_results.append({
-                            "content": doc,
-                            "metadata": meta,
-                            "relevance": 1 - distance  # Convert distance to relevance
-                        })
             except Exception as e:
                 logger.error(f"Recall error: {e}")
+                return []
+            
+            found = []
+            if results["documents"]:
+                for i, doc in enumerate(results["documents"][0]):
+                    meta = results["metadatas"][0][i] if results["metadatas"] else {}
+                    distance = results["distances"][0][i] if results.get("distances") else 0
+                    found.append({
+                        "content": doc,
+                        "metadata": meta,
+                        "relevance": 1 - distance  # Convert distance to relevance
+                    })
+            return found
+        
+        if len(collections_to_search) == 1:
+            ranked = [search(collections_to_search[0])]
+        else:
+            ranked = list(_get_recall_pool().map(search, collections_to_search))
         
-        # Sort by relevance and limit
-        all_results.sort(key=lambda x: x.get("relevance", 0), reverse=True)
-        return all_results[:n_results]
+        # Each list is already best-first; merge and keep the top n_results
+        merged = heapq.merge(*ranked, key=lambda x: -x.get("relevance", 0))
+        return list(islice(merged, n_results))
+    
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        """
+        Query embedding from the model the collections use, or None to let ChromaDB embed it.
+        Served from the process-wide embedding cache: the same text is often recalled
+        several times in one turn (think(), _get_memory_context, get_context_for_task).
+        """
+        try:
+            return get_embedding_cache().embed(get_chroma_embedder(), [query])[0]
+        except Exception as e:
+            logger.warning(f"Query embedding failed, falling back to per-collection embedding: {e}")
+            return None
     
     def _recall_json(self, query, agent, n_results, memory_type, include_shared):
-        """JSON fallback recall (simple keyword matching)."""
-        all_results = []
-        query_lower = query.lower()
-        
+        """JSON fallback recall (BM25 keyword ranking over the inverted index)."""
         agents_to_search = []
         if agent:
             agents_to_search.append(agent)
         if include_shared:
             agents_to_search.append("shared")
         if not agent:
-            agents_to_search = list(self._memories.keys())
+            agents_to_search = None  # Every agent
         
-        for agent_name in agents_to_search:
-            for memory in self._memories.get(agent_name, []):
-                # Simple keyword matching
-                text = memory["text"].lower()
-                if query_lower in text or any(word in text for word in query_lower.split()):
-                    if memory_type and memory["metadata"].get("memory_type") != memory_type:
-                        continue
-                    all_results.append({
-                        "content": memory["text"],
-                        "metadata": memory["metadata"],
-                        "relevance": 0.5  # Placeholder
-                    })
-        
-        return all_results[:n_results]
+        results = []
+        with self._json_lock:
+            for score, mem_id, owner in self._index.search(query, agents=agents_to_search, memory_type=memory_type, k=n_results):
+                memory = self._memories[owner][mem_id]
+                results.append({
+                    "content": memory["text"],
+                    "metadata": memory["metadata"],
+                    "relevance": round(score / (1 + score), 4)  # BM25 score squashed into 0..1
+                })
+        return results
     
     def remember_conversation(
         self, 
@@ -235,6 +342,19 @@ class Hippocampus:
         ticket_id: str = None
     ):
         """Store a conversation turn."""
+        return self.remember_many([self._conversation_item(agent, user_message, agent_response, ticket_id)])[0]
+    
+    def remember_conversations(self, turns: List[Dict]) -> List[Optional[str]]:
+        """
+        Store many conversation turns in one batch.
+        Each turn is a dict with the remember_conversation() arguments.
+        """
+        return self.remember_many([
+            self._conversation_item(t["agent"], t["user_message"], t["agent_response"], t.get("ticket_id"))
+            for t in turns
+        ])
+    
+    def _conversation_item(self, agent: str, user_message: str, agent_response: str, ticket_id: str = None) -> Dict:
         text = f"User: {user_message}\n{agent}: {agent_response}"
         
         metadata = {
@@ -244,17 +364,30 @@ class Hippocampus:
         if ticket_id:
             metadata["ticket_id"] = ticket_id
         
-        return self.remember(text, agent=agent, metadata=metadata, memory_type="conversation")
+        return {"text": text, "agent": agent, "metadata": metadata, "memory_type": "conversation"}
     
     def remember_task(self, agent: str, task: str, result: str, ticket_id: str = None):
         """Store a completed task."""
+        return self.remember_many([self._task_item(agent, task, result, ticket_id)])[0]
+    
+    def remember_tasks(self, tasks: List[Dict]) -> List[Optional[str]]:
+        """
+        Store many completed tasks in one batch (e.g. importing past tickets).
+        Each task is a dict with the remember_task() arguments.
+        """
+        return self.remember_many([
+            self._task_item(t["agent"], t["task"], t["result"], t.get("ticket_id"))
+            for t in tasks
+        ])
+    
+    def _task_item(self, agent: str, task: str, result: str, ticket_id: str = None) -> Dict:
         text = f"Task: {task}\nResult: {result}"
         
         metadata = {"task": task[:200], "result": result[:500]}
         if ticket_id:
             metadata["ticket_id"] = ticket_id
         
-        return self.remember(text, agent=agent, metadata=metadata, memory_type="task")
+        return {"text": text, "agent": agent, "metadata": metadata, "memory_type": "task"}
     
     def remember_learning(self, agent: str, learning: str, context: str = None):
         """Store something the agent learned."""
@@ -290,7 +423,7 @@ class Hippocampus:
                 count = collection.count()
                 return {"agent": agent, "memory_count": count}
         else:
-            count = len(self._memories.get(agent, []))
+            count = len(self._memories.get(agent, {}))
             return {"agent": agent, "memory_count": count}
         
         return {"agent": agent, "memory_count": 0}
@@ -302,9 +435,10 @@ class Hippocampus:
             if collection:
                 collection.delete(ids=[mem_id])
         else:
-            if agent in self._memories:
-                self._memories[agent] = [m for m in self._memories[agent] if m["id"] != mem_id]
-                self._save_json_memories()
+            with self._json_lock:
+                if self._memories.get(agent, {}).pop(mem_id, None) is not None:
+                    self._index.remove(mem_id)
+                    self._log_append([{"op": "del", "agent": agent, "id": mem_id}])
     
     def clear_agent_memory(self, agent: str):
         """Clear all memories for an agent (use with caution!)."""
@@ -316,9 +450,11 @@ class Hippocampus:
                     name=f"squadron_{agent.lower()}_memory"
                 )
         else:
-            if agent in self._memories:
-                self._memories[agent] = []
-                self._save_json_memories()
+            with self._json_lock:
+                if agent in self._memories:
+                    self._memories[agent] = {}
+                    self._index.remove_agent(agent)
+                    self._log_append([{"op": "clear", "agent": agent}])
 
 
 # Singleton instance
@@ -328,6 +464,9 @@ memory_store = Hippocampus()
 def remember(text: str, agent: str = "shared", **kwargs) -> str:
     return memory_store.remember(text, agent=agent, **kwargs)
 
+def remember_many(items: List[Dict]) -> List[Optional[str]]:
+    return memory_store.remember_many(items)
+
 def recall(query: str, agent: str = None, **kwargs) -> List[Dict]:
     return memory_store.recall(query, agent=agent, **kwargs)
 
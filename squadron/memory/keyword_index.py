@@ -0,0 +1,122 @@
+"""
+Keyword Index 🔎
+In-memory inverted index with BM25 ranking for the Hippocampus JSON fallback.
+
+Postings are kept per agent (term -> {memory id: term frequency}), plus a set of
+memory ids per memory_type, and are updated incrementally on add/remove. A query
+only touches the postings of its own terms, so recall cost depends on how many
+memories share those terms rather than on the total number of memories. The
+top k are picked with a heap.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Too common to rank on; their postings would cover most memories
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its "
+    "me my of on or so that the this to was we were what when where which who why will "
+    "with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class KeywordIndex:
+    """BM25 over memories, partitioned by agent."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, Dict[str, int]]] = {}  # agent -> term -> {id: tf}
+        self._by_type: Dict[str, Set[str]] = {}                    # memory_type -> ids
+        self._df: Counter = Counter()                              # term -> memories containing it
+        self._docs: Dict[str, Tuple[str, str, int, Tuple[str, ...]]] = {}  # id -> (agent, type, length, terms)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, mem_id: str, text: str, agent: str, memory_type: str = None):
+        if mem_id in self._docs:
+            self.remove(mem_id)
+        counts = Counter(tokenize(text))
+        postings = self._postings.setdefault(agent, {})
+        for term, tf in counts.items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = {}
+            posting[mem_id] = tf
+        self._df.update(counts.keys())
+        if memory_type:
+            self._by_type.setdefault(memory_type, set()).add(mem_id)
+        length = sum(counts.values())
+        self._docs[mem_id] = (agent, memory_type, length, tuple(counts))
+        self._total_length += length
+
+    def remove(self, mem_id: str):
+        doc = self._docs.pop(mem_id, None)
+        if doc is None:
+            return
+        agent, memory_type, length, terms = doc
+        postings = self._postings.get(agent, {})
+        for term in terms:
+            posting = postings.get(term)
+            if posting is not None:
+                posting.pop(mem_id, None)
+                if not posting:
+                    del postings[term]
+            self._df[term] -= 1
+            if self._df[term] <= 0:
+                del self._df[term]
+        if memory_type in self._by_type:
+            self._by_type[memory_type].discard(mem_id)
+        self._total_length -= length
+
+    def remove_agent(self, agent: str):
+        for mem_id in [i for i, doc in self._docs.items() if doc[0] == agent]:
+            self.remove(mem_id)
+
+    def search(
+        self,
+        query: str,
+        agents: Optional[Iterable[str]] = None,
+        memory_type: str = None,
+        k: int = 5
+    ) -> List[Tuple[float, str, str]]:
+        """Top `k` (score, memory id, agent), best first. `agents=None` searches every agent."""
+        terms = set(tokenize(query))
+        if not terms or not self._docs:
+            return []
+        allowed = self._by_type.get(memory_type, set()) if memory_type else None
+        n = len(self._docs)
+        avg_length = self._total_length / n or 1.0
+
+        scores: Dict[str, float] = {}
+        owners: Dict[str, str] = {}
+        for agent in (list(self._postings) if agents is None else dict.fromkeys(agents)):
+            postings = self._postings.get(agent)
+            if not postings:
+                continue
+            for term in terms:
+                posting = postings.get(term)
+                if not posting:
+                    continue
+                df = self._df[term]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for mem_id, tf in posting.items():
+                    if allowed is not None and mem_id not in allowed:
+                        continue
+                    length = self._docs[mem_id][2]
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                    scores[mem_id] = scores.get(mem_id, 0.0) + idf * norm
+                    owners[mem_id] = agent
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, mem_id, owners[mem_id]) for mem_id, score in top]
@@ -0,0 +1,187 @@
+"""
+Memory Log 📜
+Append-only JSONL storage for the Hippocampus JSON fallback.
+
+Every write is one appended line, so remember()/forget() cost O(1) instead of
+rewriting every memory:
+    {"op": "add", "agent": "Marcus", "id": "...", "text": "...", "metadata": {...}}
+    {"op": "del", "agent": "Marcus", "id": "..."}      (tombstone for forget)
+    {"op": "clear", "agent": "Marcus"}
+
+Loading streams the log and replays it. A torn last line (crash mid-write) is
+dropped and truncated away; other unreadable lines are skipped. Once dead lines
+(tombstones and the adds they cancel) outnumber live memories, the log is
+compacted in a background thread: live memories are written to a temp file,
+anything appended meanwhile is copied over, and the temp file atomically
+replaces the log.
+
+Environment:
+    SQUADRON_MEMORY_FSYNC          fsync after every append (default 0)
+    SQUADRON_MEMORY_COMPACT_MIN    Dead lines before compaction is considered (default 1000)
+"""
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, Tuple
+
+logger = logging.getLogger('MemoryLog')
+
+
+def _apply(memories: Dict[str, Dict[str, dict]], entry: dict):
+    """Replays one log entry onto {agent: {id: memory}}."""
+    op = entry.get("op")
+    agent = entry.get("agent") or "shared"
+    if op == "add":
+        memories.setdefault(agent, {})[entry["id"]] = {
+            "id": entry["id"],
+            "text": entry["text"],
+            "metadata": entry.get("metadata") or {}
+        }
+    elif op == "del":
+        memories.get(agent, {}).pop(entry.get("id"), None)
+    elif op == "clear":
+        memories[agent] = {}
+
+
+def add_entry(agent: str, memory: dict) -> dict:
+    return {"op": "add", "agent": agent, **memory}
+
+
+def _encode(entries: Iterable[dict]) -> bytes:
+    return "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+
+
+class MemoryLog:
+    """One append-only JSONL file of memory operations."""
+
+    def __init__(self, path: str, fsync: bool = None, compact_min: int = None):
+        self.path = path
+        self.fsync = fsync if fsync is not None else os.getenv("SQUADRON_MEMORY_FSYNC", "0") == "1"
+        self.compact_min = compact_min if compact_min is not None else int(os.getenv("SQUADRON_MEMORY_COMPACT_MIN", "1000"))
+        self.lines = 0  # Entries in the file
+        self.size = 0   # Bytes in the file
+        self.compactions = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._compacting = False
+
+    def load(self) -> Dict[str, Dict[str, dict]]:
+        """Replays the log into {agent: {id: memory}} (insertion ordered)."""
+        memories: Dict[str, Dict[str, dict]] = {}
+        if not os.path.exists(self.path):
+            return memories
+
+        offset = 0
+        skipped = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    logger.warning(f"Dropping torn last line of {self.path} ({len(raw)} bytes)")
+                    break
+                offset += len(raw)
+                self.lines += 1
+                try:
+                    _apply(memories, json.loads(raw))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    skipped += 1
+
+        if offset < os.path.getsize(self.path):
+            # Later appends must start on a clean line
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        if skipped:
+            logger.warning(f"Skipped {skipped} unreadable line(s) in {self.path}")
+        self.size = offset
+        return memories
+
+    def _handle(self):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def append(self, entries: list):
+        """Appends entries as one write (a whole batch lands together)."""
+        if not entries:
+            return
+        data = _encode(entries)
+        with self._lock:
+            f = self._handle()
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self.lines += len(entries)
+            self.size += len(data)
+
+    def rewrite(self, memories: Dict[str, Dict[str, dict]]):
+        """Replaces the whole log with one add per memory (used for migration)."""
+        with self._lock:
+            self._close()
+            tmp = self.path + ".tmp"
+            lines, size = self._write_snapshot(tmp, memories)
+            os.replace(tmp, self.path)
+            self.lines, self.size = lines, size
+
+    def needs_compaction(self, live: int) -> bool:
+        return not self._compacting and self.lines - live >= max(self.compact_min, live)
+
+    def compact_in_background(self, snapshot: Callable[[], Tuple[Dict[str, Dict[str, dict]], int]]):
+        """
+        Compacts on a daemon thread. `snapshot()` must return (memories copy, log
+        size) taken atomically with respect to the caller's writes.
+        """
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact, args=(snapshot,), daemon=True, name="squadron-memory-compact").start()
+
+    def _compact(self, snapshot):
+        tmp = self.path + ".compact"
+        try:
+            memories, offset = snapshot()
+            lines, size = self._write_snapshot(tmp, memories)
+            with self._lock:
+                # Carry over whatever was appended while the snapshot was written
+                self._handle().flush()
+                with open(self.path, "rb") as src, open(tmp, "ab") as dst:
+                    src.seek(offset)
+                    tail = src.read()
+                    dst.write(tail)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                self._close()
+                os.replace(tmp, self.path)
+                before = self.lines
+                self.lines = lines + tail.count(b"\n")
+                self.size = size + len(tail)
+                self.compactions += 1
+            logger.info(f"📜 Compacted {self.path}: {before} -> {self.lines} lines")
+        except Exception as e:
+            logger.error(f"Memory log compaction failed: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        finally:
+            self._compacting = False
+
+    def _write_snapshot(self, path: str, memories: Dict[str, Dict[str, dict]]) -> Tuple[int, int]:
+        lines = size = 0
+        with open(path, "wb") as f:
+            for agent, entries in memories.items():
+                data = _encode(add_entry(agent, memory) for memory in entries.values())
+                f.write(data)
+                lines += len(entries)
+                size += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return lines, size
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self._close()
@@ -17,7 +17,7 @@ sys.path.append(os.path.dirname(current_dir)) # Add parent for 'squadron' packag
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from rich.console import Console
 import yaml
 
@@ -272,10 +272,10 @@ async def send_command(request: Request):
         # Route or assign
         if target_agent and target_agent in overseer.agents:
             agent = overseer.agents[target_agent]
-            result = agent.process_task(command)
+            result = await agent.aprocess_task(command)
             response_text = f"[{target_agent}]: {result['text']}"
         else:
-            response_text = overseer.route(command, use_llm=True)
+            response_text = await overseer.aroute(command, use_llm=True)
         
         return {
             "success": True,
@@ -323,7 +323,8 @@ async def trigger_wake(request: Request):
             return {"error": "No summary provided", "success": False}
         
         from squadron.services.wake_protocol import trigger_wake
-        result = trigger_wake(summary, source_type, ticket_id)
+        # The protocol is synchronous end to end; keep it off the event loop
+        result = await asyncio.to_thread(trigger_wake, summary, source_type, ticket_id)
         
         return result
     
@@ -341,12 +342,14 @@ def get_memory_stats():
     try:
         from squadron.memory import memory_store
         
+        from squadron.services.embeddings import get_embedding_cache
+        
         stats = []
         for agent in ["Marcus", "Caleb", "Sentinel", "shared"]:
             summary = memory_store.get_agent_summary(agent)
             stats.append(summary)
         
-        return {"agents": stats}
+        return {"agents": stats, "embedding_cache": get_embedding_cache().get_stats()}
     except Exception as e:
         return {"error": str(e), "agents": []}
 
@@ -361,6 +364,8 @@ async def save_memory(request: Request):
         text = body.get("text", "")
         agent = body.get("agent", "shared")
         memory_type = body.get("type", "general")
+        if not isinstance(text, str) or not text.strip():
+            return JSONResponse(status_code=400, content={"error": "Memory text is required", "success": False})
         
         mem_id = memory_store.remember(text, agent=agent, memory_type=memory_type)
         return {"success": True, "memory_id": mem_id}
@@ -368,6 +373,40 @@ async def save_memory(request: Request):
         return {"error": str(e), "success": False}
 
 
+@app.post("/memory/save/bulk")
+async def save_memories_bulk(request: Request):
+    """
+    Save many memories in one batch.
+    Body: {"memories": [{"text": ..., "agent": ..., "type": ..., "metadata": {...}}, ...]}
+    """
+    try:
+        from squadron.memory import memory_store
+        
+        body = await request.json()
+        items = [
+            {
+                "text": m.get("text", ""),
+                "agent": m.get("agent", "shared"),
+                "memory_type": m.get("type", "general"),
+                "metadata": m.get("metadata")
+            }
+            for m in body.get("memories", [])
+        ]
+        if not items:
+            return JSONResponse(status_code=400, content={"error": "No memories to save", "success": False})
+        blank = [i for i, item in enumerate(items) if not isinstance(item["text"], str) or not item["text"].strip()]
+        if blank:
+            return JSONResponse(status_code=400, content={
+                "error": f"Memory text is required (memories {blank})", "success": False
+            })
+        
+        # Embedding and writing the batch blocks, so keep it off the event loop
+        mem_ids = await asyncio.to_thread(memory_store.remember_many, items)
+        return {"success": all(mem_ids), "memory_ids": mem_ids, "count": sum(1 for m in mem_ids if m)}
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+
 @app.post("/memory/recall")
 async def recall_memory(request: Request):
     """Search memory for relevant information."""
@@ -675,6 +714,41 @@ def get_system_status():
         return {"status": "error", "error": str(e)}
 
 
+# =============================================================================
+# METRICS API ⏱️
+# =============================================================================
+
+@app.get("/metrics/timing")
+def get_timing_metrics(phase: str = None, agent: str = None):
+    """
+    Per-phase latency histograms for the brain loop
+    (memory_recall, read_plan, mcp_init, prompt_build, llm_call, json_parse,
+    safety_check, tool_execution). Filter with ?phase= and/or ?agent=.
+    """
+    try:
+        from squadron.services.timing import timing_recorder
+        
+        return {"phases": timing_recorder.get_stats(phase=phase, agent=agent)}
+    
+    except Exception as e:
+        return {"phases": {}, "error": str(e)}
+
+
+@app.get("/metrics/tokens")
+def get_token_metrics(agent: str = None, mission: str = None):
+    """
+    Estimated input/output tokens of brain LLM calls, totalled overall,
+    per agent and per mission. Filter with ?agent= and/or ?mission=.
+    """
+    try:
+        from squadron.services.tokens import token_ledger
+
+        return token_ledger.get_stats(agent=agent, mission=mission)
+
+    except Exception as e:
+        return {"total": {}, "error": str(e)}
+
+
 def start_server(host: str = "127.0.0.1", port: int = 8000):
     """Launch the Uvicorn server."""
     console.print(f"[bold green]Squadron Control Plane online at http://{host}:{port}[/bold green]")
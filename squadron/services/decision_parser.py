@@ -0,0 +1,191 @@
+"""
+Decision Parser 🧩
+Incremental parser for the JSON decision the brain asks the model for.
+
+The streaming parser watches deltas as they arrive and hands back the decision
+object ({"action": ..., "tool_name": ..., "args": ...}) the moment its closing brace
+is seen, so think() can stop reading and execute() can start on the tool while the
+model would still be emitting trailing text.
+
+Malformed output gets cheap local repair (code fences, trailing commas, single or
+smart quotes, unquoted keys, Python literals, unclosed strings/brackets) before
+falling back to treating the whole response as a plain reply.
+"""
+import json
+import logging
+import re
+from typing import Optional
+
+logger = logging.getLogger('DecisionParser')
+
+_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_WORD_RE = re.compile(r"[A-Za-z_]+")
+_COLON_RE = re.compile(r"\s*:")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_QUOTES = {'"': '"', "'": "'", "“": "”", "”": "”"}  # Opening quote -> closing quote
+
+
+def _strip_dangling(out: list):
+    """Drops a trailing comma and completes a dangling `"key":` before a closer."""
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+    elif out and out[-1] == ":":
+        out.append("null")
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix-up of the first JSON object in `text`.
+    Only rewrites syntax outside of strings, so valid content is left alone.
+    """
+    text = _FENCE_RE.sub("", text)
+    start = text.find("{")
+    if start == -1:
+        return text
+
+    out = []
+    stack = []
+    closing_quote = None  # Set while inside a string
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if closing_quote:
+            if ch == "\\" and i + 1 < len(text):
+                nxt = text[i + 1]
+                # \' is not a JSON escape
+                out.append("'" if nxt == "'" else ch + nxt)
+                i += 2
+                continue
+            if ch == closing_quote:
+                out.append('"')
+                closing_quote = None
+            elif ch == '"':
+                out.append('\\"')  # Bare double quote inside a single-quoted string
+            else:
+                out.append(ch)
+        elif ch in _QUOTES:
+            closing_quote = _QUOTES[ch]
+            out.append('"')
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            _strip_dangling(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                break  # End of the top-level object; ignore trailing text
+        elif ch.isalpha():
+            word = _WORD_RE.match(text, i).group()
+            i += len(word)
+            if _COLON_RE.match(text, i):
+                out.append(f'"{word}"')  # Unquoted key
+            else:
+                out.append(_PY_LITERALS.get(word, word))
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if closing_quote:
+        out.append('"')
+    while stack:
+        _strip_dangling(out)
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _load_object(text: str, require_action: bool = True) -> Optional[dict]:
+    """Parses `text` as a JSON object, repairing it if needed. None if that fails."""
+    for candidate in (text, None):
+        try:
+            value = json.loads(candidate if candidate is not None else repair_json(text), strict=False)
+        except (json.JSONDecodeError, ValueError):
+            continue
+        if isinstance(value, dict) and (not require_action or "action" in value):
+            if candidate is None:
+                logger.info("🩹 Repaired malformed decision JSON")
+            return value
+    return None
+
+
+class StreamingDecisionParser:
+    """
+    Feed it streamed deltas; feed() returns the decision as soon as the first
+    top-level object containing an "action" key closes.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.decision: Optional[dict] = None
+        self._pos = 0
+        self._depth = 0
+        self._start = -1
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self.decision is not None
+
+    def feed(self, chunk: str) -> Optional[dict]:
+        if self.decision is not None:
+            return self.decision
+        self.buffer += chunk
+        buf = self.buffer
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                # Quotes in prose around the object don't matter
+                self._in_string = self._depth > 0
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = self._pos - 1
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    decision = _load_object(buf[self._start:self._pos])
+                    if decision is not None:
+                        self.decision = decision
+                        return decision
+        return None
+
+    def finish(self) -> dict:
+        """The decision from the complete response (with repair and reply fallback)."""
+        if self.decision is None:
+            self.decision = parse_decision(self.buffer)
+        return self.decision
+
+
+def parse_decision(text: str) -> dict:
+    """
+    Parses a complete model response into a decision dict.
+    Falls back to {"action": "reply", "content": text} when nothing can be recovered.
+    """
+    clean = _FENCE_RE.sub("", str(text)).strip()
+    try:
+        value = json.loads(clean, strict=False)
+        if isinstance(value, dict):
+            return value
+    except (json.JSONDecodeError, ValueError):
+        pass
+
+    # An embedded object (prose before/after it), then a repaired one
+    scanner = StreamingDecisionParser()
+    decision = scanner.feed(clean) or _load_object(clean)
+    if decision is not None:
+        return decision
+
+    logger.warning(f"LLM did not return JSON. Raw: {text}")
+    return {"action": "reply", "content": str(text)}
@@ -0,0 +1,227 @@
+"""
+Embeddings 🧮
+Text embedding backends shared by the tool index and memory search.
+
+Uses Chroma's default ONNX model (all-MiniLM-L6-v2) when it is available, and falls
+back to a dependency-free feature-hashing embedder otherwise (offline machines,
+ChromaDB not installed). Every embedder has a `model_id` so callers can key caches
+on it and never mix vectors from different models.
+
+EmbeddingCache is a process-wide LRU of (model_id, text) -> vector, bounded by
+bytes, for texts that get embedded over and over (memory recall queries).
+
+Environment:
+    SQUADRON_EMBEDDER=auto|chroma|hash   Backend to use (default auto)
+    SQUADRON_EMBEDDING_CACHE_MB          Embedding cache size (default 64, 0 = off)
+"""
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import List, Sequence
+
+logger = logging.getLogger('Embeddings')
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Bag-of-words + character trigram feature hashing.
+    Deterministic across processes, no model download; good enough for
+    matching short texts like tool descriptions.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.model_id = f"hashing-v1-{dim}"
+
+    def _features(self, text: str):
+        for word in _TOKEN_RE.findall(text.lower()):
+            yield word, 1.0
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], 0.5
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            # The top bit picks the sign so colliding features tend to cancel out
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        return normalize(vector)
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
+
+
+class ChromaEmbedder:
+    """Chroma's default embedding function (ONNX all-MiniLM-L6-v2)."""
+
+    model_id = "chroma-default:all-MiniLM-L6-v2"
+
+    def __init__(self):
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        self._ef = DefaultEmbeddingFunction()
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return [normalize([float(x) for x in vector]) for vector in self._ef(list(texts))]
+
+
+def normalize(vector: List[float]) -> List[float]:
+    """Scales a vector to unit length (zero vectors are returned unchanged)."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return vector
+    return [x / norm for x in vector]
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity of two unit vectors."""
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _create_embedder():
+    backend = os.getenv("SQUADRON_EMBEDDER", "auto").lower()
+    if backend == "hash":
+        return HashingEmbedder()
+    try:
+        embedder = get_chroma_embedder()
+        embedder.embed(["warmup"])  # Triggers the one-time model download/load
+        logger.info(f"🧮 Using embedder {embedder.model_id}")
+        return embedder
+    except Exception as e:
+        if backend == "chroma":
+            raise
+        logger.warning(f"Chroma embedder unavailable ({e}), using hashing embedder")
+        return HashingEmbedder()
+
+
+# Global singleton
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Get or create the process-wide embedder."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = _create_embedder()
+    return _embedder
+
+
+_chroma_embedder = None
+_chroma_embedder_lock = threading.Lock()
+
+
+def get_chroma_embedder() -> ChromaEmbedder:
+    """
+    Get or create the process-wide ChromaEmbedder. This is the model ChromaDB
+    collections embed documents with, so memory queries must use it regardless
+    of SQUADRON_EMBEDDER.
+    """
+    global _chroma_embedder
+    if _chroma_embedder is None:
+        with _chroma_embedder_lock:
+            if _chroma_embedder is None:
+                _chroma_embedder = ChromaEmbedder()
+    return _chroma_embedder
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU of embeddings keyed by (model_id, text), bounded by the
+    approximate bytes held. Vectors are stored as float32 arrays.
+    """
+
+    ENTRY_OVERHEAD = 120  # Key tuple, dict slot and array header, roughly
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, embedder, texts: Sequence[str]) -> List[List[float]]:
+        """embedder.embed(texts), serving repeated texts from the cache (misses are embedded in one batch)."""
+        model_id = embedder.model_id
+        vectors = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                entry = self._entries.get((model_id, text))
+                if entry is None:
+                    missing.setdefault(text, []).append(i)
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end((model_id, text))
+                    vectors[i] = entry.tolist()
+                    self.hits += 1
+
+        if missing:
+            fresh = embedder.embed(list(missing))
+            for (text, indexes), vector in zip(missing.items(), fresh):
+                # Hand back the stored float32 values so hits and misses agree
+                stored = self._put((model_id, text), vector).tolist()
+                for i in indexes:
+                    vectors[i] = list(stored)
+        return vectors
+
+    def _put(self, key, vector) -> array:
+        stored = array("f", vector)
+        size = stored.itemsize * len(stored) + len(key[1]) + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return stored
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.itemsize * len(old) + len(key[1]) + self.ENTRY_OVERHEAD
+            self._entries[key] = stored
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                (_, text), evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.itemsize * len(evicted) + len(text) + self.ENTRY_OVERHEAD
+        return stored
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+# Global singleton
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                max_mb = float(os.getenv("SQUADRON_EMBEDDING_CACHE_MB", "64"))
+                _embedding_cache = EmbeddingCache(int(max_mb * 1024 * 1024))
+    return _embedding_cache
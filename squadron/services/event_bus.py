@@ -19,11 +19,11 @@ class EventBus:
     """
     
     def __init__(self, max_history: int = 100):
-        self._subscribers: list[asyncio.Queue] = []
+        self._subscribers: list[tuple] = []  # (queue, owning event loop)
         self._history: deque = deque(maxlen=max_history)
         self._lock = asyncio.Lock()
     
-    def publish(self, event: dict):
+    def publish(self, event: dict, record: bool = True):
         """
         Publish an event to all subscribers.
         Thread-safe, can be called from sync code.
@@ -35,23 +35,43 @@ class EventBus:
             "timestamp": str (ISO format),
             "data": dict
         }
+        
+        record=False skips the replay history (for high-volume events like tokens).
         """
         # Add timestamp if not present
         if "timestamp" not in event:
             event["timestamp"] = datetime.now().isoformat()
         
         # Store in history
-        self._history.append(event)
+        if record:
+            self._history.append(event)
         
         logger.debug(f"📡 Publishing: {event['type']} - {event.get('agent', 'system')}")
         
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        
         # Push to all subscribers (non-blocking)
-        for queue in self._subscribers:
+        for queue, loop in list(self._subscribers):
+            if loop is current_loop:
+                self._deliver(queue, event)
+                continue
+            # Published from a worker thread (e.g. an agent running via asyncio.to_thread):
+            # asyncio queues are not thread-safe, so hand off to the subscriber's loop
             try:
-                queue.put_nowait(event)
-            except asyncio.QueueFull:
-                # Skip if queue is full (slow consumer)
-                logger.warning("Subscriber queue full, dropping event")
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                pass  # Subscriber's loop already closed
+    
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Skip if queue is full (slow consumer)
+            logger.warning("Subscriber queue full, dropping event")
     
     async def subscribe(self) -> AsyncGenerator[dict, None]:
         """
@@ -63,9 +83,10 @@ class EventBus:
                 yield f"data: {json.dumps(event)}\\n\\n"
         """
         queue = asyncio.Queue(maxsize=50)
+        subscriber = (queue, asyncio.get_running_loop())
         
         async with self._lock:
-            self._subscribers.append(queue)
+            self._subscribers.append(subscriber)
         
         try:
             # First, yield any recent history
@@ -78,7 +99,7 @@ class EventBus:
                 yield event
         finally:
             async with self._lock:
-                self._subscribers.remove(queue)
+                self._subscribers.remove(subscriber)
     
     def get_history(self, limit: int = 50) -> list:
         """Get recent events for initial dashboard load."""
@@ -121,6 +142,22 @@ def emit_agent_thought(agent: str, thought: str):
         "data": {"thought": thought[:500]}
     })
 
+def emit_agent_token(agent: str, token: str):
+    """Emit each streamed token delta from the LLM (not kept in history)."""
+    event_bus.publish({
+        "type": "agent_token",
+        "agent": agent,
+        "data": {"token": token}
+    }, record=False)
+
+def emit_timing(phase: str, duration_ms: float, tags: dict):
+    """Emit a latency span from the brain loop (not kept in history)."""
+    event_bus.publish({
+        "type": "timing",
+        "agent": tags.get("agent") or "system",
+        "data": {"phase": phase, "duration_ms": round(duration_ms, 2), **tags}
+    }, record=False)
+
 def emit_tool_result(agent: str, tool_name: str, result: str, success: bool = True):
 
     """Emit after a tool finishes executing."""
@@ -151,3 +188,12 @@ def emit_error(agent: str, error: str):
         "agent": agent,
         "data": {"error": str(error)[:300]}
     })
+
+
+def emit_llm_cache(stats: dict):
+    """Emit LLM response cache hit/miss counters after each lookup (not kept in history)."""
+    event_bus.publish({
+        "type": "llm_cache",
+        "agent": "system",
+        "data": stats
+    }, record=False)
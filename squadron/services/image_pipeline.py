@@ -0,0 +1,122 @@
+"""
+Image Pipeline 🖼️
+Shrinks screenshots before they are sent to a vision model.
+
+capture_screen and browse_website produce multi-megapixel PNGs. Models downscale them
+server-side anyway, so shipping the full image only costs upload time and latency.
+Images are downsampled to a max edge, re-encoded to a compact format, and cached by
+content hash so the same screenshot is never processed twice.
+
+Environment:
+    SQUADRON_IMAGE_MAX_EDGE     Longest side in pixels after resizing (default 1568)
+    SQUADRON_IMAGE_FORMAT       JPEG | WEBP | PNG (default JPEG)
+    SQUADRON_IMAGE_QUALITY      Encoder quality for lossy formats (default 80)
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger('ImagePipeline')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+def is_image(path: str) -> bool:
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+class ImagePipeline:
+    """
+    Thread-safe preprocessor with an LRU of encoded results keyed by
+    (content hash, max edge, format, quality).
+    """
+
+    def __init__(self, max_edge: int = 1568, fmt: str = "JPEG", quality: int = 80, max_entries: int = 32):
+        self.max_edge = max_edge
+        self.format = fmt.upper()
+        self.quality = quality
+        self.max_entries = max_entries
+        self._cache: OrderedDict = OrderedDict()  # key -> encoded bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def process_bytes(self, data: bytes) -> bytes:
+        """Returns the downsampled, re-encoded image for `data`."""
+        key = (hashlib.sha256(data).hexdigest(), self.max_edge, self.format, self.quality)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached
+
+        encoded = self._encode(data)
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_in"] += len(data)
+            self.stats["bytes_out"] += len(encoded)
+            self._cache[key] = encoded
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return encoded
+
+    def _encode(self, data: bytes) -> bytes:
+        import PIL.Image
+
+        img = PIL.Image.open(io.BytesIO(data))
+        img.load()
+        resized = max(img.size) > self.max_edge
+        if resized:
+            img.thumbnail((self.max_edge, self.max_edge), PIL.Image.LANCZOS)
+
+        save_args = {"optimize": True}
+        if self.format in ("JPEG", "WEBP"):
+            save_args["quality"] = self.quality
+        if self.format == "JPEG" and img.mode != "RGB":
+            # JPEG has no alpha channel
+            img = img.convert("RGB")
+
+        out = io.BytesIO()
+        img.save(out, format=self.format, **save_args)
+        encoded = out.getvalue()
+        # Re-encoding an already small, compact image can grow it; keep the original then
+        if not resized and len(encoded) >= len(data):
+            return data
+        return encoded
+
+    def load(self, path: str):
+        """Reads `path` and returns a preprocessed PIL image for the model prompt."""
+        import PIL.Image
+
+        with open(path, "rb") as f:
+            data = f.read()
+        return PIL.Image.open(io.BytesIO(self.process_bytes(data)))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._cache)
+        return stats
+
+
+# Global singleton, configured from the environment on first use
+_pipeline: Optional[ImagePipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """Get or create the process-wide image pipeline."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ImagePipeline(
+                max_edge=int(os.getenv("SQUADRON_IMAGE_MAX_EDGE", "1568")),
+                fmt=os.getenv("SQUADRON_IMAGE_FORMAT", "JPEG"),
+                quality=int(os.getenv("SQUADRON_IMAGE_QUALITY", "80"))
+            )
+        return _pipeline
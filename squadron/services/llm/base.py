@@ -0,0 +1,66 @@
+"""
+Shared helpers for LLM providers.
+"""
+import asyncio
+import inspect
+import json
+import threading
+import weakref
+
+
+class ErrorReply(str):
+    """
+    A provider's fallback JSON reply for a failed call.
+    Behaves like the plain string providers have always returned, but lets
+    wrappers (cache, router) tell a failure apart from a real completion.
+    """
+
+
+class LoopLocal:
+    """
+    One value per event loop, created on first use from that loop.
+
+    SDK async clients keep an httpx connection pool bound to the loop they first ran
+    on. A pooled provider is driven from several loops (the API server's, the shared
+    runtime loop behind the sync router, asyncio.run in CLIs), so each loop gets its
+    own client. Entries go away with their loop.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._values: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            value = self._values.get(loop)
+            if value is None:
+                value = self._values[loop] = self.factory()
+            return value
+
+
+def error_reply(content: str) -> ErrorReply:
+    """Builds the standard {"action": "reply"} error payload."""
+    return ErrorReply(json.dumps({"action": "reply", "content": content}))
+
+
+async def call_async(provider, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+    """
+    Awaits provider.agenerate() when the provider has a native async client,
+    otherwise runs its blocking generate() in a worker thread.
+    """
+    method = getattr(provider, "agenerate", None)
+    if inspect.iscoroutinefunction(method):
+        return await method(prompt, max_tokens=max_tokens, temperature=temperature)
+    return await asyncio.to_thread(provider.generate, prompt, max_tokens=max_tokens, temperature=temperature)
+
+
+async def stream_async(provider, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+    """Yields deltas from provider.agenerate_stream(), or the whole completion as one chunk."""
+    method = getattr(provider, "agenerate_stream", None)
+    if inspect.isasyncgenfunction(method):
+        async for delta in method(prompt, max_tokens=max_tokens, temperature=temperature):
+            yield delta
+        return
+    yield await call_async(provider, prompt, max_tokens=max_tokens, temperature=temperature)
@@ -0,0 +1,344 @@
+"""
+LLM Response Cache 🗄️
+Two-tier (in-memory LRU + on-disk SQLite) cache in front of every provider.
+
+Only near-deterministic calls are cached (temperature <= SQUADRON_LLM_CACHE_MAX_TEMP),
+e.g. Overseer routing at 0.1. Lookups try an exact key first, then a key built from the
+normalized prompt, so prompts that differ only in whitespace, case or timestamps
+(memory context is full of those) still hit. Ids are deliberately left alone: two
+prompts about different tickets or missions must never share an answer. Timestamps are
+the one semantic risk; a prompt that asks about a specific time can be answered from a
+call made at another time, so keep such calls above SQUADRON_LLM_CACHE_MAX_TEMP.
+
+Environment:
+    SQUADRON_LLM_CACHE=0               Disable the cache
+    SQUADRON_LLM_CACHE_PATH            SQLite file (default .squadron/cache/llm_cache.sqlite3)
+    SQUADRON_LLM_CACHE_TTL             Seconds an entry stays valid (default 86400)
+    SQUADRON_LLM_CACHE_MAX_TEMP        Highest temperature that is cached (default 0.2)
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from squadron.services.llm.base import ErrorReply, call_async, stream_async
+
+logger = logging.getLogger('LLMCache')
+
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:?\d{2}|Z)?")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Canonical form of a prompt: timestamps masked, whitespace collapsed, casefolded (ids kept)."""
+    text = _TIMESTAMP_RE.sub("<ts>", prompt)
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+def make_key(model: str, prompt: str, temperature: float, max_tokens: int, normalized: bool = False) -> str:
+    """Cache key for a call. Normalized keys are namespaced so they never collide with exact ones."""
+    if normalized:
+        prompt = normalize_prompt(prompt)
+    raw = "\x00".join(["n" if normalized else "e", model, f"{temperature:.3f}", str(max_tokens), prompt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU with an optional SQLite tier underneath.
+    Memory is checked first; disk hits are promoted into memory.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 512,
+        max_disk_entries: int = 20000,
+        ttl: float = 86400
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory: OrderedDict = OrderedDict()  # key -> (created, response)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        self._writes = 0
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opens the SQLite tier on first use. Caller holds the lock."""
+        if self._db is not None or self._db_failed or not self.path:
+            return self._db
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache disk tier unavailable ({e}), using memory only")
+            self._db = None
+            self._db_failed = True
+        return self._db
+
+    def get(self, *keys: str) -> Optional[str]:
+        """
+        Returns the first live entry among `keys` (tried in order), or None.
+        Counts as a single hit or miss however many keys are tried.
+        """
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                response = self._get_one(key, now)
+                if response is not None:
+                    self.stats["hits"] += 1
+                    return response
+            self.stats["misses"] += 1
+            return None
+
+    def _get_one(self, key: str, now: float) -> Optional[str]:
+        """Single-key lookup, memory first then disk. Caller holds the lock."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            created, response = entry
+            if now - created <= self.ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return response
+            del self._memory[key]
+
+        db = self._connect()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        if row and now - row[1] <= self.ttl:
+            self._remember(key, row[1], row[0])
+            self.stats["disk_hits"] += 1
+            return row[0]
+        return None
+
+    def set(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                    (key, response, now)
+                )
+                self._writes += 1
+                # Prune occasionally rather than on every write
+                if self._writes % 100 == 0:
+                    self._prune(db, now)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, created: float, response: str):
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune(self, db: sqlite3.Connection, now: float):
+        """Drops expired rows, then the oldest rows beyond max_disk_entries."""
+        db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._memory)
+        stats["hit_rate"] = round(self.hit_rate(), 3)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+                db.commit()
+
+
+class CachedProvider:
+    """
+    Wraps any provider exposing generate(prompt, max_tokens, temperature).
+    Everything else is delegated to the wrapped provider.
+    """
+
+    def __init__(self, provider, cache: ResponseCache, max_temperature: float = 0.2):
+        self.provider = provider
+        self.cache = cache
+        self.max_temperature = max_temperature
+        self.model_id = f"{type(provider).__name__}:{getattr(provider, 'model_name', '')}"
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def _cache_text(self, prompt, temperature) -> Optional[str]:
+        """The text to key on, or None if this call should bypass the cache."""
+        if temperature is None or temperature > self.max_temperature:
+            return None
+        if isinstance(prompt, str):
+            return prompt
+        # Text-only part lists are fine; images and message dicts are not cached
+        if isinstance(prompt, list) and all(isinstance(p, str) for p in prompt):
+            return "\n".join(prompt)
+        return None
+
+    def _lookup(self, text: str, max_tokens: int, temperature: float):
+        """Returns (cached response or None, exact key, normalized key)."""
+        exact = make_key(self.model_id, text, temperature, max_tokens)
+        normalized = make_key(self.model_id, text, temperature, max_tokens, normalized=True)
+        response = self.cache.get(exact, normalized)
+        _publish_stats(self.cache, hit=response is not None)
+        return response, exact, normalized
+
+    def _store(self, exact: str, normalized: str, response):
+        if not response or isinstance(response, ErrorReply):
+            return
+        self.cache.set(exact, str(response))
+        self.cache.set(normalized, str(response))
+
+    def generate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        text = self._cache_text(prompt, temperature)
+        if text is None:
+            return self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+
+        cached, exact, normalized = self._lookup(text, max_tokens, temperature)
+        if cached is not None:
+            logger.debug(f"🗄️ LLM cache hit ({self.model_id})")
+            return cached
+
+        response = self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+        self._store(exact, normalized, response)
+        return response
+
+    def generate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        """Streams from the provider; cache hits are yielded as a single chunk."""
+        text = self._cache_text(prompt, temperature)
+        if text is not None:
+            cached, exact, normalized = self._lookup(text, max_tokens, temperature)
+            if cached is not None:
+                yield cached
+                return
+
+        if getattr(self.provider, "supports_streaming", False) is not True:
+            response = self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+            if text is not None:
+                self._store(exact, normalized, response)
+            yield response
+            return
+
+        chunks = []
+        failed = False
+        for delta in self.provider.generate_stream(prompt, max_tokens=max_tokens, temperature=temperature):
+            failed = failed or isinstance(delta, ErrorReply)
+            chunks.append(delta)
+            yield delta
+        # Only complete, successful streams are stored (an abandoned generator never gets here)
+        if text is not None and not failed:
+            self._store(exact, normalized, "".join(chunks))
+
+    async def agenerate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        """Async variant of generate()."""
+        text = self._cache_text(prompt, temperature)
+        if text is None:
+            return await call_async(self.provider, prompt, max_tokens=max_tokens, temperature=temperature)
+
+        cached, exact, normalized = self._lookup(text, max_tokens, temperature)
+        if cached is not None:
+            logger.debug(f"🗄️ LLM cache hit ({self.model_id})")
+            return cached
+
+        response = await call_async(self.provider, prompt, max_tokens=max_tokens, temperature=temperature)
+        self._store(exact, normalized, response)
+        return response
+
+    async def agenerate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        """Async variant of generate_stream()."""
+        text = self._cache_text(prompt, temperature)
+        if text is not None:
+            cached, exact, normalized = self._lookup(text, max_tokens, temperature)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        failed = False
+        async for delta in stream_async(self.provider, prompt, max_tokens=max_tokens, temperature=temperature):
+            failed = failed or isinstance(delta, ErrorReply)
+            chunks.append(delta)
+            yield delta
+        if text is not None and not failed:
+            self._store(exact, normalized, "".join(chunks))
+
+
+def _publish_stats(cache: ResponseCache, hit: bool):
+    from squadron.services.event_bus import emit_llm_cache
+    stats = cache.get_stats()
+    stats["result"] = "hit" if hit else "miss"
+    emit_llm_cache(stats)
+
+
+# Global singleton, configured from the environment on first use
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("SQUADRON_LLM_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                path=os.getenv(
+                    "SQUADRON_LLM_CACHE_PATH",
+                    os.path.join(os.getcwd(), ".squadron", "cache", "llm_cache.sqlite3")
+                ),
+                ttl=float(os.getenv("SQUADRON_LLM_CACHE_TTL", "86400"))
+            )
+        return _cache
+
+
+def with_cache(provider):
+    """Wraps a provider in the shared response cache (no-op when disabled)."""
+    if not cache_enabled():
+        return provider
+    return CachedProvider(
+        provider,
+        get_response_cache(),
+        max_temperature=float(os.getenv("SQUADRON_LLM_CACHE_MAX_TEMP", "0.2"))
+    )
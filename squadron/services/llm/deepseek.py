@@ -1,11 +1,13 @@
-import os
 import logging
-import json
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from squadron.services.llm.base import LoopLocal, error_reply
+from squadron.services.llm.ratelimit import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger('DeepSeekProvider')
 
 class DeepSeekProvider:
+    supports_streaming = True  # Exposes generate_stream()
+
     def __init__(self, api_key: str, model_name: str = "deepseek-reasoner", **kwargs):
         self.base_url = "https://api.deepseek.com/v3.2_speciale_expires_on_20251215"
         self.api_key = api_key
@@ -14,29 +16,39 @@ class DeepSeekProvider:
         
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            max_retries=0  # Retries are handled by self.limiter
         )
+        self.limiter = get_rate_limiter("deepseek")
+        self._async_clients = LoopLocal(lambda: AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0))  # One per event loop
         logger.info(f"🚀 DeepSeek Provider Initialized ({self.model_name}) @ {self.base_url}")
 
+    @staticmethod
+    def _build_messages(prompt) -> list:
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        elif isinstance(prompt, list):
+            text_content = ""
+            for part in prompt:
+                if isinstance(part, str):
+                    text_content += part + "\n"
+            return [{"role": "user", "content": text_content}]
+        else:
+            return [{"role": "user", "content": str(prompt)}]
+
     def generate(self, prompt, max_tokens: int = 4000, temperature: float = 0.7) -> str:
         try:
-            if isinstance(prompt, str):
-                messages = [{"role": "user", "content": prompt}]
-            elif isinstance(prompt, list):
-                text_content = ""
-                for part in prompt:
-                    if isinstance(part, str):
-                        text_content += part + "\n"
-                messages = [{"role": "user", "content": text_content}]
-            else:
-                messages = [{"role": "user", "content": str(prompt)}]
-
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                stream=False
+            messages = self._build_messages(prompt)
+
+            response = self.limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=False
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "deepseek")
             )
 
             # DEBUG: Print the raw response
@@ -53,13 +65,100 @@ class DeepSeekProvider:
 
             if not content:
                 logger.warning("DeepSeek returned empty content!")
-                return json.dumps({"action": "reply", "content": "The oracle (DeepSeek) remained silent."})
+                return error_reply("The oracle (DeepSeek) remained silent.")
+
+            return content
+
+        except Exception as e:
+            logger.error(f"DeepSeek API Error: {e}")
+            return error_reply(f"I encountered an error connecting to my brain (DeepSeek): {str(e)}")
+
+    def generate_stream(self, prompt, max_tokens: int = 4000, temperature: float = 0.7):
+        """
+        Streams the completion, yielding content deltas as they arrive.
+        Reasoning deltas (reasoning_content) are not forwarded.
+        """
+        emitted = False
+        try:
+            stream = self.limiter.stream(
+                lambda: self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=self._build_messages(prompt),
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "deepseek")
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
+
+            if not emitted:
+                logger.warning("DeepSeek returned empty content!")
+                yield error_reply("The oracle (DeepSeek) remained silent.")
+
+        except Exception as e:
+            logger.error(f"DeepSeek API Error: {e}")
+            if not emitted:
+                yield error_reply(f"I encountered an error connecting to my brain (DeepSeek): {str(e)}")
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        return self._async_clients.get()
+
+    async def agenerate(self, prompt, max_tokens: int = 4000, temperature: float = 0.7) -> str:
+        """Async variant of generate() on AsyncOpenAI."""
+        try:
+            response = await self.limiter.acall(
+                lambda: self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=self._build_messages(prompt),
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=False
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "deepseek")
+            )
+
+            content = response.choices[0].message.content
+            if not content:
+                logger.warning("DeepSeek returned empty content!")
+                return error_reply("The oracle (DeepSeek) remained silent.")
 
             return content
 
         except Exception as e:
             logger.error(f"DeepSeek API Error: {e}")
-            return json.dumps({
-                "action": "reply",
-                "content": f"I encountered an error connecting to my brain (DeepSeek): {str(e)}"
-            })
+            return error_reply(f"I encountered an error connecting to my brain (DeepSeek): {str(e)}")
+
+    async def agenerate_stream(self, prompt, max_tokens: int = 4000, temperature: float = 0.7):
+        """Async variant of generate_stream()."""
+        emitted = False
+        try:
+            stream = self.limiter.astream(
+                lambda: self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=self._build_messages(prompt),
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "deepseek")
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
+
+            if not emitted:
+                logger.warning("DeepSeek returned empty content!")
+                yield error_reply("The oracle (DeepSeek) remained silent.")
+
+        except Exception as e:
+            logger.error(f"DeepSeek API Error: {e}")
+            if not emitted:
+                yield error_reply(f"I encountered an error connecting to my brain (DeepSeek): {str(e)}")
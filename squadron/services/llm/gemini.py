@@ -1,70 +1,149 @@
 
-import os
 import logging
-import json
 from google import genai
 from google.genai import types
+from squadron.services.llm.base import LoopLocal, error_reply
+from squadron.services.llm.ratelimit import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger('GeminiProvider')
 
 class GeminiProvider:
+    supports_streaming = True  # Exposes generate_stream()
+
     def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash-exp"):
         self.client = genai.Client(api_key=api_key)
+        self._async_clients = LoopLocal(lambda: genai.Client(api_key=api_key).aio)  # One per event loop
         self.model_name = model_name
+        self.limiter = get_rate_limiter("gemini")
         logger.info(f"✨ Gemini Provider Initialized ({self.model_name}) [Google Gen AI SDK v1.0]")
 
+    def _build_config(self, max_tokens: int, temperature: float) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            max_output_tokens=max_tokens,
+            temperature=temperature,
+            # Disable safety for agentic freedom (User requested)
+            safety_settings=[
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+                    threshold=types.HarmBlockThreshold.BLOCK_NONE
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+                    threshold=types.HarmBlockThreshold.BLOCK_NONE
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+                    threshold=types.HarmBlockThreshold.BLOCK_NONE
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+                    threshold=types.HarmBlockThreshold.BLOCK_NONE
+                ),
+            ]
+        )
+
     def generate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
         """
         Generates content using Gemini 2.0 via new SDK.
         """
         try:
-            # Prepare content
-            # The new SDK handles strings and lists gracefully
-            contents = prompt
-            if isinstance(prompt, list):
-                # Ensure parts are correctly formatted formatted if mixed
-                contents = prompt 
-
-            # Configure generation
-            config = types.GenerateContentConfig(
-                max_output_tokens=max_tokens,
-                temperature=temperature,
-                # Disable safety for agentic freedom (User requested)
-                safety_settings=[
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                        threshold=types.HarmBlockThreshold.BLOCK_NONE
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                        threshold=types.HarmBlockThreshold.BLOCK_NONE
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                        threshold=types.HarmBlockThreshold.BLOCK_NONE
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                        threshold=types.HarmBlockThreshold.BLOCK_NONE
-                    ),
-                ]
+            # The new SDK handles strings and mixed text/image lists gracefully
+            response = self.limiter.call(
+                lambda: self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=self._build_config(max_tokens, temperature)
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "gemini")
             )
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=contents,
-                config=config
+            if response.text:
+                return response.text
+            else:
+                logger.warning("Gemini returned empty text.")
+                return error_reply("Empty response from Gemini.")
+
+        except Exception as e:
+            logger.error(f"Gemini API Error: {e}")
+            return error_reply(f"Gemini Error: {str(e)}")
+
+    def generate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        """
+        Streams the completion, yielding text deltas as they arrive.
+        Failures before the first token yield a single error reply instead.
+        """
+        emitted = False
+        try:
+            for chunk in self.limiter.stream(
+                lambda: self.client.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=self._build_config(max_tokens, temperature)
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "gemini")
+            ):
+                if chunk.text:
+                    emitted = True
+                    yield chunk.text
+
+            if not emitted:
+                logger.warning("Gemini returned empty text.")
+                yield error_reply("Empty response from Gemini.")
+
+        except Exception as e:
+            logger.error(f"Gemini API Error: {e}")
+            if not emitted:
+                yield error_reply(f"Gemini Error: {str(e)}")
+
+    @property
+    def async_client(self):
+        """The SDK's asyncio client for the running loop."""
+        return self._async_clients.get()
+
+    async def agenerate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        """Async variant of generate() on the SDK's native asyncio client."""
+        try:
+            response = await self.limiter.acall(
+                lambda: self.async_client.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=self._build_config(max_tokens, temperature)
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "gemini")
             )
 
             if response.text:
                 return response.text
             else:
                 logger.warning("Gemini returned empty text.")
-                return json.dumps({"action": "reply", "content": "Empty response from Gemini."})
+                return error_reply("Empty response from Gemini.")
+
+        except Exception as e:
+            logger.error(f"Gemini API Error: {e}")
+            return error_reply(f"Gemini Error: {str(e)}")
+
+    async def agenerate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        """Async variant of generate_stream()."""
+        emitted = False
+        try:
+            stream = self.limiter.astream(
+                lambda: self.async_client.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=self._build_config(max_tokens, temperature)
+                ),
+                tokens=estimate_tokens(prompt, max_tokens, "gemini")
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    emitted = True
+                    yield chunk.text
+
+            if not emitted:
+                logger.warning("Gemini returned empty text.")
+                yield error_reply("Empty response from Gemini.")
 
         except Exception as e:
             logger.error(f"Gemini API Error: {e}")
-            return json.dumps({
-                "action": "reply",
-                "content": f"Gemini Error: {str(e)}"
-            })
+            if not emitted:
+                yield error_reply(f"Gemini Error: {str(e)}")
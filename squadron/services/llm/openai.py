@@ -2,22 +2,28 @@
 OpenAI Provider 🤖
 Interface for OpenAI's LLM services.
 """
-import os
 import openai
 import logging
-import json
+from squadron.services.llm.base import LoopLocal, error_reply
+from squadron.services.llm.ratelimit import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger('OpenAIProvider')
 
 class OpenAIProvider:
+    supports_streaming = True  # Exposes generate_stream()
+
     def __init__(self, api_key: str, model_name: str = "gpt-4-turbo"):
         openai.api_key = api_key
+        openai.max_retries = 0  # Retries are handled by self.limiter
+        self.api_key = api_key
         self.model_name = model_name
+        self.limiter = get_rate_limiter("openai")
+        self._async_clients = LoopLocal(lambda: openai.AsyncOpenAI(api_key=api_key, max_retries=0))  # One per event loop
         logger.info(f"✨ OpenAI Provider Initialized ({self.model_name})")
 
-    def generate(self, prompt, max_tokens: int = 4269, temperature: float = 0.7) -> str:
+    def _build_request(self, prompt, max_tokens: int, temperature: float) -> dict:
         """
-        Generates content using OpenAI's API.
+        Builds chat.completions arguments.
         Prompt can be str, list of strings (joined), or list of message dictionaries.
         """
         if isinstance(prompt, str):
@@ -25,7 +31,7 @@ class OpenAIProvider:
         elif isinstance(prompt, list):
             # Check if it's a list of strings (legacy/gemini style) or message dicts
             if prompt and isinstance(prompt[0], str):
-                joined_prompt = "\n".join(prompt)
+                joined_prompt = "\n".join(p for p in prompt if isinstance(p, str))
                 messages = [{"role": "user", "content": joined_prompt}]
             else:
                 # Assume it's already in OpenAI message format
@@ -33,52 +39,127 @@ class OpenAIProvider:
         else:
             raise ValueError("Prompt must be a string or a list.")
 
+        # Build API arguments
+        api_args = {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+        # Conditionally add response_format if prompt indicates JSON expectation
+        # Check the actual system message for the JSON instruction
+        json_expected = False
+        if isinstance(messages, list) and len(messages) > 0:
+            # Assuming the last message (user input) will contain the "RESPONSE (JSON):" instruction
+            last_message_content = messages[-1].get("content", "").lower() if isinstance(messages[-1], dict) else str(messages[-1]).lower()
+            if "json" in last_message_content and "response (json):" in last_message_content:
+                json_expected = True
+        elif isinstance(messages, str):
+            if "json" in messages.lower() and "response (json):" in messages.lower():
+                json_expected = True
+
+        if json_expected:
+            api_args["response_format"] = {"type": "json_object"}
+            logger.debug("OpenAI: Using JSON response_format.")
+        return api_args
+
+    def generate(self, prompt, max_tokens: int = 4269, temperature: float = 0.7) -> str:
+        """
+        Generates content using OpenAI's API.
+        Prompt can be str, list of strings (joined), or list of message dictionaries.
+        """
+        api_args = self._build_request(prompt, max_tokens, temperature)
+
         try:
-            # Build API arguments
-            api_args = {
-                "model": self.model_name,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            }
-
-            # Conditionally add response_format if prompt indicates JSON expectation
-            # Check the actual system message for the JSON instruction
-            json_expected = False
-            if isinstance(messages, list) and len(messages) > 0:
-                # Assuming the last message (user input) will contain the "RESPONSE (JSON):" instruction
-                last_message_content = messages[-1].get("content", "").lower() if isinstance(messages[-1], dict) else str(messages[-1]).lower()
-                if "json" in last_message_content and "response (json):" in last_message_content:
-                    json_expected = True
-            elif isinstance(messages, str):
-                if "json" in messages.lower() and "response (json):" in messages.lower():
-                    json_expected = True
-
-            if json_expected:
-                api_args["response_format"] = {"type": "json_object"}
-                logger.debug("OpenAI: Using JSON response_format.")
-            
-            response = openai.chat.completions.create(**api_args)
+            response = self.limiter.call(
+                lambda: openai.chat.completions.create(**api_args),
+                tokens=estimate_tokens(prompt, max_tokens, "openai")
+            )
             
             # OpenAI's API might return multiple choices, take the first one
             if response.choices and response.choices[0].message:
                 return response.choices[0].message.content
             else:
                 logger.warning("OpenAI returned no content.")
-                return json.dumps({
-                    "action": "reply",
-                    "content": "OpenAI returned no content."
-                })
+                return error_reply("OpenAI returned no content.")
         except openai.APIError as e:
             logger.error(f"OpenAI API Error: {e}")
-            return json.dumps({
-                "action": "reply",
-                "content": f"I encountered an OpenAI API error: {str(e)}"
-            })
+            return error_reply(f"I encountered an OpenAI API error: {str(e)}")
         except Exception as e:
             logger.error(f"OpenAI General Error: {e}")
-            return json.dumps({
-                "action": "reply",
-                "content": f"I encountered a general OpenAI error: {str(e)}"
-            })
+            return error_reply(f"I encountered a general OpenAI error: {str(e)}")
 
+    def generate_stream(self, prompt, max_tokens: int = 4269, temperature: float = 0.7):
+        """
+        Streams the completion, yielding text deltas as they arrive.
+        Failures before the first token yield a single error reply instead.
+        """
+        api_args = self._build_request(prompt, max_tokens, temperature)
+        emitted = False
+        try:
+            for chunk in self.limiter.stream(
+                lambda: openai.chat.completions.create(**api_args, stream=True),
+                tokens=estimate_tokens(prompt, max_tokens, "openai")
+            ):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
+
+            if not emitted:
+                logger.warning("OpenAI returned no content.")
+                yield error_reply("OpenAI returned no content.")
+        except Exception as e:
+            logger.error(f"OpenAI Stream Error: {e}")
+            if not emitted:
+                yield error_reply(f"I encountered an OpenAI API error: {str(e)}")
+
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        return self._async_clients.get()
+
+    async def agenerate(self, prompt, max_tokens: int = 4269, temperature: float = 0.7) -> str:
+        """Async variant of generate() on openai.AsyncOpenAI."""
+        api_args = self._build_request(prompt, max_tokens, temperature)
+
+        try:
+            response = await self.limiter.acall(
+                lambda: self.async_client.chat.completions.create(**api_args),
+                tokens=estimate_tokens(prompt, max_tokens, "openai")
+            )
+
+            if response.choices and response.choices[0].message:
+                return response.choices[0].message.content
+            else:
+                logger.warning("OpenAI returned no content.")
+                return error_reply("OpenAI returned no content.")
+        except openai.APIError as e:
+            logger.error(f"OpenAI API Error: {e}")
+            return error_reply(f"I encountered an OpenAI API error: {str(e)}")
+        except Exception as e:
+            logger.error(f"OpenAI General Error: {e}")
+            return error_reply(f"I encountered a general OpenAI error: {str(e)}")
+
+    async def agenerate_stream(self, prompt, max_tokens: int = 4269, temperature: float = 0.7):
+        """Async variant of generate_stream()."""
+        api_args = self._build_request(prompt, max_tokens, temperature)
+        emitted = False
+        try:
+            stream = self.limiter.astream(
+                lambda: self.async_client.chat.completions.create(**api_args, stream=True),
+                tokens=estimate_tokens(prompt, max_tokens, "openai")
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
+
+            if not emitted:
+                logger.warning("OpenAI returned no content.")
+                yield error_reply("OpenAI returned no content.")
+        except Exception as e:
+            logger.error(f"OpenAI Stream Error: {e}")
+            if not emitted:
+                yield error_reply(f"I encountered an OpenAI API error: {str(e)}")
@@ -2,67 +2,147 @@
 OpenRouter Provider 🌐
 Interface for OpenRouter's unified LLM API.
 """
-import os
 import openai
 import logging
-import json
+from squadron.services.llm.base import LoopLocal, error_reply
+from squadron.services.llm.ratelimit import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger('OpenRouterProvider')
 
 class OpenRouterProvider:
+    supports_streaming = True  # Exposes generate_stream()
+
     def __init__(self, api_key: str, model_name: str = "openai/gpt-4o"):
-        self.client = openai.OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-            default_headers={
+        client_args = {
+            "base_url": "https://openrouter.ai/api/v1",
+            "api_key": api_key,
+            "max_retries": 0,  # Retries are handled by self.limiter
+            "default_headers": {
                 "HTTP-Referer": "https://squadron.dev",  # Optional: For rankings
                 "X-Title": "Squadron Desktop"           # Optional: For rankings
             }
-        )
+        }
+        self.client = openai.OpenAI(**client_args)
+        self._async_clients = LoopLocal(lambda: openai.AsyncOpenAI(**client_args))  # One per event loop
         self.model_name = model_name
+        self.limiter = get_rate_limiter("openrouter")
         logger.info(f"✨ OpenRouter Provider Initialized ({self.model_name})")
 
-    def generate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
-        """
-        Generates content using OpenRouter API.
-        """
+    def _build_request(self, prompt, max_tokens: int, temperature: float) -> dict:
+        """Builds chat.completions arguments from a str, list of strings, or message list."""
         messages = []
         if isinstance(prompt, str):
             messages = [{"role": "user", "content": prompt}]
         elif isinstance(prompt, list):
             if prompt and isinstance(prompt[0], str):
-                joined_prompt = "\n".join(prompt)
+                joined_prompt = "\n".join(p for p in prompt if isinstance(p, str))
                 messages = [{"role": "user", "content": joined_prompt}]
             else:
                 messages = prompt
         else:
             raise ValueError("Prompt must be a string or a list.")
 
+        # Check if JSON mode requested
+        response_format = None
+        last_msg = messages[-1].get("content", "").lower() if messages and isinstance(messages[-1], dict) else str(messages).lower()
+        
+        if "response (json):" in last_msg:
+            response_format = {"type": "json_object"}
+
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_format": response_format
+        }
+
+    def generate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        """
+        Generates content using OpenRouter API.
+        """
+        api_args = self._build_request(prompt, max_tokens, temperature)
+
         try:
-            # Check if JSON mode requested
-            response_format = None
-            json_expected = False
-            last_msg = messages[-1].get("content", "").lower() if messages and isinstance(messages[-1], dict) else str(messages).lower()
-            
-            if "response (json):" in last_msg:
-                response_format = {"type": "json_object"}
-
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                response_format=response_format
+            response = self.limiter.call(
+                lambda: self.client.chat.completions.create(**api_args),
+                tokens=estimate_tokens(prompt, max_tokens, "openrouter")
             )
             
             if response.choices:
                 return response.choices[0].message.content
             else:
-                return json.dumps({"action": "reply", "content": "OpenRouter returned empty response"})
+                return error_reply("OpenRouter returned empty response")
+
+        except Exception as e:
+            logger.error(f"OpenRouter Error: {e}")
+            return error_reply(f"OpenRouter Error: {str(e)}")
+
+    def generate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        """
+        Streams the completion, yielding text deltas as they arrive.
+        Failures before the first token yield a single error reply instead.
+        """
+        api_args = self._build_request(prompt, max_tokens, temperature)
+        emitted = False
+        try:
+            for chunk in self.limiter.stream(
+                lambda: self.client.chat.completions.create(**api_args, stream=True),
+                tokens=estimate_tokens(prompt, max_tokens, "openrouter")
+            ):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
+
+            if not emitted:
+                yield error_reply("OpenRouter returned empty response")
+        except Exception as e:
+            logger.error(f"OpenRouter Stream Error: {e}")
+            if not emitted:
+                yield error_reply(f"OpenRouter Error: {str(e)}")
+
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        return self._async_clients.get()
+
+    async def agenerate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        """Async variant of generate() on openai.AsyncOpenAI."""
+        api_args = self._build_request(prompt, max_tokens, temperature)
+
+        try:
+            response = await self.limiter.acall(
+                lambda: self.async_client.chat.completions.create(**api_args),
+                tokens=estimate_tokens(prompt, max_tokens, "openrouter")
+            )
+
+            if response.choices:
+                return response.choices[0].message.content
+            else:
+                return error_reply("OpenRouter returned empty response")
 
         except Exception as e:
             logger.error(f"OpenRouter Error: {e}")
-            return json.dumps({
-                "action": "reply",
-                "content": f"OpenRouter Error: {str(e)}"
-            })
+            return error_reply(f"OpenRouter Error: {str(e)}")
+
+    async def agenerate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        """Async variant of generate_stream()."""
+        api_args = self._build_request(prompt, max_tokens, temperature)
+        emitted = False
+        try:
+            stream = self.limiter.astream(
+                lambda: self.async_client.chat.completions.create(**api_args, stream=True),
+                tokens=estimate_tokens(prompt, max_tokens, "openrouter")
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
+
+            if not emitted:
+                yield error_reply("OpenRouter returned empty response")
+        except Exception as e:
+            logger.error(f"OpenRouter Stream Error: {e}")
+            if not emitted:
+                yield error_reply(f"OpenRouter Error: {str(e)}")
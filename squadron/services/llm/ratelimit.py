@@ -0,0 +1,266 @@
+"""
+LLM Rate Limiting ⏳
+Client-side throttling and retries shared by every provider.
+
+Each provider name gets one RateLimiter for the whole process:
+- Token buckets for requests and tokens per minute make parallel agents queue
+  smoothly instead of tripping the provider's own limits.
+- 429s and transient 5xx/connection errors are retried with jittered exponential
+  backoff, honoring Retry-After (or Gemini's retryDelay) when the provider sends one.
+  A Retry-After also pauses every other caller of that provider.
+- At most `max_queue` callers may wait at once (on the buckets or a retry backoff);
+  beyond that a call fails fast with RateLimitQueueFull rather than piling up.
+
+Providers still turn the final failure into an error reply, but only after retrying.
+
+Environment (per provider, e.g. SQUADRON_RATE_GEMINI_RPM):
+    SQUADRON_RATE_<PROVIDER>_RPM    Requests per minute (default 0 = unlimited)
+    SQUADRON_RATE_<PROVIDER>_TPM    Tokens per minute (default 0 = unlimited)
+    SQUADRON_RATE_MAX_QUEUE         Callers allowed to wait per provider (default 64)
+    SQUADRON_RATE_MAX_RETRIES       Retries after the first attempt (default 4)
+    SQUADRON_RATE_BACKOFF_BASE      First backoff delay, seconds (default 1)
+    SQUADRON_RATE_BACKOFF_MAX       Longest backoff delay, seconds (default 60)
+"""
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from squadron.services.tokens import get_estimator
+
+logger = logging.getLogger('RateLimit')
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_RETRY_DELAY_RE = re.compile(r"retryDelay'?\"?\s*:\s*'?\"?(\d+(?:\.\d+)?)s")
+
+
+class RateLimitQueueFull(Exception):
+    """Too many callers are already waiting on this provider."""
+
+
+def status_code(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK error (openai: status_code, google-genai: code)."""
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # Connection resets and timeouts carry no status
+    name = type(error).__name__
+    return any(word in name for word in ("Timeout", "Connection", "RateLimit", "ResourceExhausted"))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, if it said."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers:
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass  # HTTP-date form; fall back to backoff
+    match = _RETRY_DELAY_RE.search(str(getattr(error, "details", None) or error))
+    return float(match.group(1)) if match else None
+
+
+def estimate_tokens(prompt, max_tokens: int = 0, provider: str = "default") -> int:
+    """Request size for the TPM bucket: estimated prompt tokens plus the output allowance."""
+    return get_estimator(provider).count(prompt) + (max_tokens or 0)
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units per minute up to a minute's worth. reserve() debits
+    immediately (the balance may go negative) and returns how long the caller must
+    wait, so waiters are served in order without polling.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)  # A single oversized request still gets through
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+
+class RateLimiter:
+    """Throttling plus retry for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_queue: int = 64,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0
+    ):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._paused_until = 0.0  # Set from Retry-After; applies to every caller
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "throttled_s": 0.0, "rejected": 0}
+
+    def _enter(self):
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise RateLimitQueueFull(f"{self._waiting} calls already waiting on {self.name}")
+            self._waiting += 1
+
+    def _leave(self):
+        with self._lock:
+            self._waiting -= 1
+
+    def _reserve(self, tokens: int) -> float:
+        """Seconds to wait before this request may be sent."""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens), self._paused_until - time.monotonic())
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["throttled_s"] += max(0.0, wait)
+        return max(0.0, wait)
+
+    def _backoff(self, error: Exception, attempt: int) -> Optional[float]:
+        """Delay before retry number `attempt`, or None to give up."""
+        if attempt > self.max_retries or not is_retryable(error):
+            return None
+        hinted = retry_after(error)
+        if hinted is not None:
+            delay = min(hinted, self.backoff_max)
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        else:
+            # Full jitter keeps parallel agents from retrying in lockstep
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        with self._lock:
+            self.stats["retries"] += 1
+        logger.warning(f"⏳ {self.name}: {type(error).__name__} ({status_code(error)}); retry {attempt} in {delay:.1f}s")
+        return delay
+
+    def call(self, fn, tokens: int = 0):
+        """Calls fn() once the buckets allow it, retrying transient failures."""
+        attempt, delay = 0, 0.0
+        while True:
+            self._enter()  # Counted while backing off as well as while throttled
+            try:
+                if delay:
+                    time.sleep(delay)
+                time.sleep(self._reserve(tokens))
+            finally:
+                self._leave()
+            try:
+                return fn()
+            except Exception as e:
+                attempt += 1
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+
+    async def acall(self, fn, tokens: int = 0):
+        """Async call(): `fn` returns an awaitable."""
+        attempt, delay = 0, 0.0
+        while True:
+            self._enter()
+            try:
+                if delay:
+                    await asyncio.sleep(delay)
+                await asyncio.sleep(self._reserve(tokens))
+            finally:
+                self._leave()
+            try:
+                return await fn()
+            except Exception as e:
+                attempt += 1
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+
+    def stream(self, fn, tokens: int = 0):
+        """
+        Yields from the iterable fn() returns. Failures are retried only until the
+        first item has been yielded (some SDKs raise 429s on the first read).
+        """
+        def first():
+            iterator = iter(fn())
+            try:
+                return iterator, [next(iterator)]
+            except StopIteration:
+                return iterator, []
+
+        iterator, head = self.call(first, tokens)
+        yield from head
+        yield from iterator
+
+    async def astream(self, fn, tokens: int = 0):
+        """Async stream(): `fn` returns an awaitable resolving to an async iterable."""
+        async def first():
+            iterator = (await fn()).__aiter__()
+            try:
+                return iterator, [await iterator.__anext__()]
+            except StopAsyncIteration:
+                return iterator, []
+
+        iterator, head = await self.acall(first, tokens)
+        for item in head:
+            yield item
+        async for item in iterator:
+            yield item
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self.stats, "throttled_s": round(self.stats["throttled_s"], 2), "waiting": self._waiting}
+
+
+# Global registry: one limiter per provider name
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Get or create the process-wide limiter for `provider`."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            prefix = f"SQUADRON_RATE_{provider.upper()}"
+            limiter = _limiters[provider] = RateLimiter(
+                provider,
+                rpm=float(os.getenv(f"{prefix}_RPM", "0")),
+                tpm=float(os.getenv(f"{prefix}_TPM", "0")),
+                max_queue=int(os.getenv("SQUADRON_RATE_MAX_QUEUE", "64")),
+                max_retries=int(os.getenv("SQUADRON_RATE_MAX_RETRIES", "4")),
+                backoff_base=float(os.getenv("SQUADRON_RATE_BACKOFF_BASE", "1")),
+                backoff_max=float(os.getenv("SQUADRON_RATE_BACKOFF_MAX", "60"))
+            )
+        return limiter
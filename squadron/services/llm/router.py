@@ -0,0 +1,343 @@
+"""
+LLM Router 🔀
+Hedged requests and latency-based failover across providers.
+
+RoutingProvider wraps several providers (Gemini, OpenRouter, OpenAI, DeepSeek) behind
+the usual generate()/generate_stream() interface:
+- Each call goes to the currently preferred provider.
+- If it hasn't answered within its rolling p95 latency, a hedge request goes to the
+  next provider; the first valid answer wins and the other request is cancelled.
+  Only providers with a native async client are hedged: a blocking generate() runs
+  in a worker thread that cancellation cannot stop, so the losing request would keep
+  running (and billing) in the background.
+- An error reply or exception fails over to the next provider immediately.
+- Per-provider latency and error rates continuously reorder the preference.
+
+For streams, "answered" means the first chunk arrived, so the hedge races on
+time-to-first-token and the winner streams the rest.
+
+Environment:
+    SQUADRON_LLM_ROUTER            Providers to route across, e.g. "gemini,openrouter" (off when unset)
+    SQUADRON_LLM_ROUTER_MODELS     Per-provider models, e.g. "openrouter=openai/gpt-4o,deepseek=deepseek-chat"
+    SQUADRON_LLM_HEDGE_QUANTILE    Latency quantile that triggers a hedge (default 0.95)
+    SQUADRON_LLM_HEDGE_MIN_MS      Shortest hedge delay (default 500)
+    SQUADRON_LLM_HEDGE_DEFAULT_MS  Hedge delay until a provider has enough samples (default 8000)
+"""
+import asyncio
+import inspect
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from squadron.services.llm.base import ErrorReply, call_async, error_reply, stream_async
+
+logger = logging.getLogger('LLMRouter')
+
+# Provider name -> (API key env var, default model)
+PROVIDERS = {
+    "gemini": ("GEMINI_API_KEY", "gemini-2.0-flash-exp"),
+    "openrouter": ("OPENROUTER_API_KEY", "openai/gpt-4o"),
+    "openai": ("OPENAI_API_KEY", "gpt-4-turbo"),
+    "deepseek": ("DEEPSEEK_API_KEY", "deepseek-chat"),
+}
+
+
+class InvalidResponse(Exception):
+    """A provider answered with an error reply or nothing at all."""
+
+
+class LatencyWindow:
+    """Recent successful latencies (ms) for quantile estimates."""
+
+    def __init__(self, size: int = 200):
+        self.samples: deque = deque(maxlen=size)
+
+    def add(self, ms: float):
+        self.samples.append(ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+class ProviderStats:
+    """Latency windows (whole completion and first chunk) plus an error-rate EWMA."""
+
+    def __init__(self, window: int = 200, alpha: float = 0.2):
+        self.complete = LatencyWindow(window)
+        self.first_chunk = LatencyWindow(window)
+        self.alpha = alpha
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.hedges = 0  # Times this provider was hedged against
+        self.wins = 0
+
+    def record(self, ok: bool):
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.error_rate = (1 - self.alpha) * self.error_rate + self.alpha * (0.0 if ok else 1.0)
+
+    def summary(self) -> dict:
+        def pct(window, q):
+            value = window.quantile(q)
+            return round(value, 1) if value is not None else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": pct(self.complete, 0.5),
+            "p95_ms": pct(self.complete, 0.95),
+            "first_chunk_p95_ms": pct(self.first_chunk, 0.95),
+            "hedged": self.hedges,
+            "wins": self.wins
+        }
+
+
+class RoutingProvider:
+    """Routes each call across `providers` (name -> provider, in configured preference order)."""
+    supports_streaming = True
+
+    def __init__(
+        self,
+        providers: Dict[str, Any],
+        quantile: float = 0.95,
+        hedge_min_ms: float = 500.0,
+        hedge_default_ms: float = 8000.0,
+        min_samples: int = 10,
+        max_in_flight: int = 2
+    ):
+        if not providers:
+            raise ValueError("RoutingProvider needs at least one provider")
+        self.providers = dict(providers)
+        self.quantile = quantile
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_default_ms = hedge_default_ms
+        self.min_samples = min_samples
+        self.max_in_flight = max_in_flight
+        self.stats = {name: ProviderStats() for name in self.providers}
+        self._lock = threading.Lock()
+        first = next(iter(self.providers.values()))
+        self.model_name = getattr(first, "model_name", "")
+
+    def ranked(self) -> List[str]:
+        """Providers by expected latency, penalized by recent errors; config order breaks ties."""
+        order = list(self.providers)
+        with self._lock:
+            def score(name):
+                stats = self.stats[name]
+                p50 = stats.complete.quantile(0.5) if len(stats.complete) >= self.min_samples else None
+                return (p50 if p50 is not None else self.hedge_default_ms) * (1 + 4 * stats.error_rate)
+            return sorted(order, key=lambda name: (score(name), order.index(name)))
+
+    def hedge_delay(self, name: str, first_chunk: bool = False) -> float:
+        """Seconds to wait on `name` before hedging: its rolling p95, floored at hedge_min_ms."""
+        with self._lock:
+            stats = self.stats[name]
+            window = stats.first_chunk if first_chunk else stats.complete
+            value = window.quantile(self.quantile) if len(window) >= self.min_samples else None
+        return max(self.hedge_min_ms, value if value is not None else self.hedge_default_ms) / 1000
+
+    def cancellable(self, name: str, first_chunk: bool = False) -> bool:
+        """True if an in-flight call to `name` stops when its task is cancelled."""
+        provider = self.providers[name]
+        if first_chunk:
+            return inspect.isasyncgenfunction(getattr(provider, "agenerate_stream", None))
+        return inspect.iscoroutinefunction(getattr(provider, "agenerate", None))
+
+    async def _attempt(self, name: str, attempt, first_chunk: bool, hedge: bool):
+        """Runs one provider attempt, recording its latency and outcome."""
+        start = time.perf_counter()
+        try:
+            result = await attempt(self.providers[name])
+        except asyncio.CancelledError:
+            if not hedge:
+                # The request we hedged around: its elapsed time is a lower bound worth keeping
+                with self._lock:
+                    stats = self.stats[name]
+                    (stats.first_chunk if first_chunk else stats.complete).add((time.perf_counter() - start) * 1000)
+            raise
+        except Exception:
+            with self._lock:
+                self.stats[name].record(ok=False)
+            raise
+        with self._lock:
+            stats = self.stats[name]
+            stats.record(ok=True)
+            (stats.first_chunk if first_chunk else stats.complete).add((time.perf_counter() - start) * 1000)
+        return result
+
+    async def _race(self, attempt, first_chunk: bool = False, discard=None) -> Tuple[str, Any]:
+        """
+        Runs `attempt(provider)` on the preferred provider, hedging and failing over
+        as needed. Returns (winner name, result); raises the last error if all fail.
+        `discard` cleans up a valid result that lost the race.
+        """
+        order = self.ranked()
+        pending: Dict[asyncio.Task, str] = {}
+        launched = 0
+        last_error: Optional[Exception] = None
+
+        def launch(hedge: bool):
+            nonlocal launched
+            name = order[launched]
+            launched += 1
+            task = asyncio.create_task(self._attempt(name, attempt, first_chunk, hedge))
+            pending[task] = name
+
+        launch(hedge=False)
+        try:
+            while pending:
+                # Never hedge into (or around) a call that would outlive its cancellation
+                can_hedge = (
+                    launched < len(order) and len(pending) < self.max_in_flight
+                    and all(self.cancellable(n, first_chunk) for n in (*pending.values(), order[launched]))
+                )
+                newest = order[launched - 1]
+                timeout = self.hedge_delay(newest, first_chunk) if can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    with self._lock:
+                        self.stats[newest].hedges += 1
+                    logger.info(f"⏱️ {newest} is slow; hedging with {order[launched]}")
+                    launch(hedge=True)
+                    continue
+
+                winner = None
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"LLM provider {name} failed: {last_error}")
+                    elif winner is None:
+                        winner = (name, task.result())
+                    elif discard is not None:
+                        await discard(task.result())
+                if winner is not None:
+                    with self._lock:
+                        self.stats[winner[0]].wins += 1
+                    return winner
+
+                # Fail over right away instead of waiting out a hedge delay
+                if launched < len(order) and len(pending) < self.max_in_flight:
+                    launch(hedge=True)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise last_error or InvalidResponse("No provider answered")
+
+    # --- Async API ---
+
+    async def agenerate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        async def attempt(provider):
+            response = await call_async(provider, prompt, max_tokens=max_tokens, temperature=temperature)
+            if not response or isinstance(response, ErrorReply):
+                raise InvalidResponse(response or "empty response")
+            return response
+
+        try:
+            _, response = await self._race(attempt)
+            return response
+        except Exception as e:
+            return error_reply(f"All LLM providers failed: {e}")
+
+    async def agenerate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        async def attempt(provider):
+            stream = stream_async(provider, prompt, max_tokens=max_tokens, temperature=temperature)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            if not first or isinstance(first, ErrorReply):
+                await stream.aclose()
+                raise InvalidResponse(first or "empty response")
+            return first, stream
+
+        async def discard(result):
+            await result[1].aclose()
+
+        try:
+            _, (first, stream) = await self._race(attempt, first_chunk=True, discard=discard)
+        except Exception as e:
+            yield error_reply(f"All LLM providers failed: {e}")
+            return
+
+        try:
+            yield first
+            async for delta in stream:
+                yield delta
+        finally:
+            await stream.aclose()
+
+    # --- Sync API (runs on the shared runtime loop) ---
+
+    def generate(self, prompt, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        from squadron.services.runtime import run_sync
+        return run_sync(self.agenerate(prompt, max_tokens=max_tokens, temperature=temperature))
+
+    def generate_stream(self, prompt, max_tokens: int = 4096, temperature: float = 0.7):
+        from squadron.services.runtime import submit
+        deltas: queue.Queue = queue.Queue()
+        end = object()
+
+        async def pump():
+            # One task drives the whole stream; some SDK streams must stay on one task
+            try:
+                async for delta in self.agenerate_stream(prompt, max_tokens=max_tokens, temperature=temperature):
+                    deltas.put(delta)
+            finally:
+                deltas.put(end)
+
+        future = submit(pump())
+        try:
+            while True:
+                delta = deltas.get()
+                if delta is end:
+                    break
+                yield delta
+            future.result()
+        finally:
+            future.cancel()  # Caller stopped early (e.g. decision complete)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = {name: s.summary() for name, s in self.stats.items()}
+        return {"order": self.ranked(), "providers": stats}
+
+
+def router_providers() -> List[str]:
+    """Providers listed in SQUADRON_LLM_ROUTER (empty when routing is off)."""
+    raw = os.getenv("SQUADRON_LLM_ROUTER", "")
+    return [name.strip().lower() for name in raw.split(",") if name.strip().lower() in PROVIDERS]
+
+
+def router_models() -> Dict[str, str]:
+    """Per-provider model overrides from SQUADRON_LLM_ROUTER_MODELS."""
+    models = {}
+    for pair in os.getenv("SQUADRON_LLM_ROUTER_MODELS", "").split(","):
+        name, _, model = pair.partition("=")
+        if name.strip() and model.strip():
+            models[name.strip().lower()] = model.strip()
+    return models
+
+
+def hedge_settings() -> dict:
+    return {
+        "quantile": float(os.getenv("SQUADRON_LLM_HEDGE_QUANTILE", "0.95")),
+        "hedge_min_ms": float(os.getenv("SQUADRON_LLM_HEDGE_MIN_MS", "500")),
+        "hedge_default_ms": float(os.getenv("SQUADRON_LLM_HEDGE_DEFAULT_MS", "8000")),
+    }
@@ -0,0 +1,285 @@
+"""
+MCP Manager 🔌
+Discovers the servers in mcp_servers.yaml and registers their tools with the
+shared tool registry.
+
+Discovery runs as a background warm-up started with the first brain, so think()
+never waits on server spawns. All servers are discovered concurrently (each with
+its own timeout) and register their tools as they answer. Results are cached two ways:
+- Tool lists are persisted on disk keyed by a hash of each server's config, so a
+  restart reuses them without spawning every server.
+- Failures are cached with exponential backoff, so a broken server is retried
+  occasionally instead of on every think().
+
+Environment:
+    SQUADRON_MCP_TOOL_CACHE_PATH   JSON file (default .squadron/cache/mcp_tools.json)
+    SQUADRON_MCP_TOOL_CACHE_TTL    Seconds a cached tool list stays valid (default 604800)
+    SQUADRON_MCP_RETRY_BASE        First retry delay after a failure, seconds (default 30)
+    SQUADRON_MCP_RETRY_MAX         Longest retry delay, seconds (default 900)
+    SQUADRON_MCP_DISCOVERY_TIMEOUT Per-server discovery deadline, seconds (default 30)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from typing import Dict, List, Optional
+
+import yaml
+
+from squadron.services.timing import span
+
+logger = logging.getLogger('MCPManager')
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mcp_servers.yaml")
+
+
+def config_hash(name: str, config: dict) -> str:
+    """Stable hash of a server's config; any change invalidates its cached tools."""
+    raw = json.dumps({"name": name, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MCPToolCache:
+    """Discovered tool lists on disk: {config hash: {"server", "tools", "saved"}}."""
+
+    def __init__(self, path: str, ttl: float = 604800):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Optional[dict] = None
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and time.time() - entry.get("saved", 0) <= self.ttl:
+            return entry["tools"]
+        return None
+
+    def set(self, key: str, server: str, tools: List[dict]):
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"server": server, "tools": tools, "saved": time.time()}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp = f"{self.path}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(entries, f, indent=2)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logger.warning(f"Could not persist MCP tool cache: {e}")
+
+
+class MCPManager:
+    """
+    Owns MCP discovery for the process.
+    A server is "settled" once its tools are registered or it is waiting out a
+    failure backoff; the registry's "mcp" source is marked loaded when all are.
+    """
+
+    def __init__(
+        self,
+        registry,
+        config_path: str = None,
+        tool_cache: MCPToolCache = None,
+        retry_base: float = 30.0,
+        retry_max: float = 900.0
+    ):
+        self.registry = registry
+        self.config_path = config_path or DEFAULT_CONFIG_PATH
+        self.tool_cache = tool_cache
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._bridge = None
+        self._servers: Optional[Dict[str, dict]] = None
+        self._loaded: Dict[str, str] = {}      # server -> config hash
+        self._failures: Dict[str, tuple] = {}  # server -> (retry_at, attempts)
+        self._lock = threading.Lock()          # Serializes discovery
+        self._state_lock = threading.Lock()
+        self._warmup: Optional[threading.Thread] = None
+
+    @property
+    def bridge(self):
+        if self._bridge is None:
+            from squadron.clients.mcp_client import MCPBridge
+            self._bridge = MCPBridge()
+        return self._bridge
+
+    def servers(self) -> Dict[str, dict]:
+        """Configured servers (read once; entries without config are skipped)."""
+        if self._servers is None:
+            servers = {}
+            if os.path.exists(self.config_path):
+                try:
+                    with open(self.config_path, "r") as f:
+                        config = yaml.safe_load(f) or {}
+                    servers = {name: cfg for name, cfg in (config.get("servers") or {}).items() if cfg}
+                except Exception as e:
+                    logger.error(f"Failed to read MCP config: {e}")
+            self._servers = servers
+        return self._servers
+
+    def pending(self, now: float = None) -> List[str]:
+        """Servers that are neither loaded nor backing off after a failure."""
+        now = now or time.time()
+        with self._state_lock:
+            return [
+                name for name in self.servers()
+                if name not in self._loaded and self._failures.get(name, (0, 0))[0] <= now
+            ]
+
+    @property
+    def ready(self) -> bool:
+        return not self.pending()
+
+    def warm_up(self) -> Optional[threading.Thread]:
+        """Starts background discovery of pending servers (no-op if nothing is due)."""
+        if self.ready:
+            self.registry.mark_loaded("mcp")
+            return None
+        with self._state_lock:
+            if self._warmup is not None and self._warmup.is_alive():
+                return self._warmup
+            self._warmup = threading.Thread(target=self.load, name="squadron-mcp-warmup", daemon=True)
+            self._warmup.start()
+            return self._warmup
+
+    def load(self):
+        """
+        Discovers every pending server and registers its tools (blocking).
+        Servers are discovered concurrently and each one's tools are registered as
+        soon as it answers, so a slow server never holds back tools from fast ones.
+        """
+        with self._lock:
+            with span("mcp_init"):
+                due = {}
+                for name in self.pending():
+                    config = self.servers()[name]
+                    if not self._load_cached(name, config):
+                        due[name] = config
+
+                if due:
+                    futures = self._discover(due)
+                    for future in as_completed(futures):
+                        name = futures[future]
+                        try:
+                            tools = future.result()
+                        except Exception as e:
+                            self._record_failure(name, e)
+                            continue
+                        if self.tool_cache:
+                            self.tool_cache.set(config_hash(name, due[name]), name, tools)
+                        self._mark_loaded(name, due[name], tools)
+
+                if self.ready:
+                    self.registry.mark_loaded("mcp")
+                logger.info(f"✅ MCP Bridge Initialized. Total tools: {len(self.registry)}")
+
+            # Embed the new descriptions now rather than on the first think()
+            from squadron.services.tool_index import TOOL_SELECT_THRESHOLD, get_tool_index
+            if len(self.registry) > TOOL_SELECT_THRESHOLD:
+                get_tool_index().sync(self.registry, self.registry.version)
+
+    def _load_cached(self, name: str, config: dict) -> bool:
+        """Registers a server from the on-disk tool cache. False on a miss."""
+        tools = self.tool_cache.get(config_hash(name, config)) if self.tool_cache else None
+        if tools is None:
+            return False
+        logger.info(f"📦 Using cached tool list for MCP server '{name}' ({len(tools)} tools)")
+        self.bridge.register_server_tools(name, config, tools)
+        self._mark_loaded(name, config, tools)
+        return True
+
+    def _mark_loaded(self, name: str, config: dict, tools: List[dict]):
+        self._register(name, tools)
+        with self._state_lock:
+            self._loaded[name] = config_hash(name, config)
+            self._failures.pop(name, None)
+
+    def _discover(self, servers: Dict[str, dict]) -> Dict[Future, str]:
+        """Starts listing tools on all `servers` at once: {future: server name}."""
+        return {future: name for name, future in self.bridge.discover(servers).items()}
+
+    def _record_failure(self, name: str, error: Exception):
+        with self._state_lock:
+            attempts = self._failures.get(name, (0, 0))[1] + 1
+            delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+            self._failures[name] = (time.time() + delay, attempts)
+        logger.warning(f"MCP server '{name}' failed ({error}); retrying in {delay:.0f}s")
+
+    def _register(self, server: str, tools: List[dict]):
+        for tool in tools:
+            self.registry.register(
+                tool["tool_name"],
+                f"[{server}] {tool.get('description') or ''}",
+                self._make_tool_wrapper(tool["tool_name"])
+            )
+
+    def _make_tool_wrapper(self, tool_name):
+        """Creates a synchronous wrapper that calls the tool over its server's session."""
+        def wrapper(**kwargs):
+            return format_tool_result(self.bridge.call_tool_sync(tool_name, kwargs))
+        return wrapper
+
+    def get_status(self) -> dict:
+        now = time.time()
+        with self._state_lock:
+            return {
+                "loaded": sorted(self._loaded),
+                "backing_off": {
+                    name: {"attempts": attempts, "retry_in": max(0, round(retry_at - now))}
+                    for name, (retry_at, attempts) in self._failures.items()
+                }
+            }
+
+
+def format_tool_result(result) -> str:
+    """Flattens an MCP CallToolResult into text."""
+    text_content = []
+    if hasattr(result, 'content'):
+        for content in result.content:
+            if hasattr(content, 'text'):
+                text_content.append(content.text)
+            else:
+                text_content.append(str(content))
+    else:
+        text_content.append(str(result))
+
+    return "\n".join(text_content)
+
+
+# Global singleton
+_manager: Optional[MCPManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_mcp_manager() -> MCPManager:
+    """Get or create the process-wide MCP manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            from squadron.services.tool_registry import get_tool_registry
+            _manager = MCPManager(
+                get_tool_registry(),
+                tool_cache=MCPToolCache(
+                    os.getenv(
+                        "SQUADRON_MCP_TOOL_CACHE_PATH",
+                        os.path.join(os.getcwd(), ".squadron", "cache", "mcp_tools.json")
+                    ),
+                    ttl=float(os.getenv("SQUADRON_MCP_TOOL_CACHE_TTL", "604800"))
+                ),
+                retry_base=float(os.getenv("SQUADRON_MCP_RETRY_BASE", "30")),
+                retry_max=float(os.getenv("SQUADRON_MCP_RETRY_MAX", "900"))
+            )
+        return _manager
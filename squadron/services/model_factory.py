@@ -1,3 +1,12 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('ModelFactory')
+
+
 
 class MockModel:
     def generate(self, prompt, max_tokens, temperature):
@@ -23,15 +32,99 @@ class MockModel:
 
         return '{"action": "reply", "content": "I am a mocked brain. I cannot think yet."}'
 
+    supports_streaming = True
+
+    def generate_stream(self, prompt, max_tokens=4096, temperature=0.7):
+        # The mock has no real tokens; stream the canned response in one piece
+        yield self.generate(prompt, max_tokens, temperature)
+
+    async def agenerate(self, prompt, max_tokens=4096, temperature=0.7):
+        return self.generate(prompt, max_tokens, temperature)
+
+    async def agenerate_stream(self, prompt, max_tokens=4096, temperature=0.7):
+        yield self.generate(prompt, max_tokens, temperature)
+
+
+# Pooled providers, keyed by (provider, model, API key fingerprint). Reusing them
+# keeps each SDK client's HTTP connection pool (and TLS sessions) warm.
+_providers: Dict[Tuple[str, str, Optional[str]], Any] = {}
+_providers_lock = threading.Lock()
+_env_loaded = False
+
+
+def _load_env():
+    """Loads .env once per process (see ModelFactory.invalidate to reload)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _fingerprint(api_key: Optional[str]) -> Optional[str]:
+    """Short hash identifying a key without keeping it in the pool's keys."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12] if api_key else None
+
 
 class ModelFactory:
     @staticmethod
     def create(model_name: str = "auto"):
-        import os
-        from dotenv import load_dotenv
-        
-        # Ensure env vars are loaded
-        load_dotenv()
+        """
+        Returns the provider for `model_name`, wrapped in the shared response cache
+        (see squadron/services/llm/cache.py; low-temperature calls only).
+        Providers are pooled, so repeated calls reuse the same client.
+        With SQUADRON_LLM_ROUTER set, this is a hedging router across the listed
+        providers (see squadron/services/llm/router.py).
+        """
+        members = ModelFactory._router_members(model_name)
+        if len(members) > 1:
+            # The fingerprint covers every member, so changing any provider or key rebuilds
+            key = ("router", model_name, _fingerprint("|".join(f"{p}:{m}:{k}" for p, m, k in members)))
+            build = lambda: ModelFactory._build_router(members)
+        else:
+            provider, model, api_key = members[0] if members else ModelFactory._resolve(model_name)
+            key = (provider, model, _fingerprint(api_key))
+            build = lambda: ModelFactory._build(provider, model, api_key)
+        with _providers_lock:
+            pooled = _providers.get(key)
+        if pooled is not None:
+            return pooled
+
+        from squadron.services.llm.cache import with_cache
+        created = with_cache(build())
+        with _providers_lock:
+            return _providers.setdefault(key, created)
+
+    @staticmethod
+    def invalidate(provider: str = None, model: str = None, reload_env: bool = False) -> int:
+        """
+        Drops pooled providers (all, or those matching `provider`/`model`) so the next
+        create() builds fresh clients, e.g. after rotating an API key.
+        With reload_env=True, .env is read again on the next create().
+        Returns the number of providers dropped.
+        """
+        global _env_loaded
+        with _providers_lock:
+            stale = [
+                key for key in _providers
+                if (provider is None or key[0] == provider) and (model is None or key[1] == model)
+            ]
+            for key in stale:
+                del _providers[key]
+            if reload_env:
+                _env_loaded = False
+        return len(stale)
+
+    @staticmethod
+    def pooled() -> List[Tuple[str, str, Optional[str]]]:
+        """Keys of the pooled providers: (provider, model, key fingerprint)."""
+        with _providers_lock:
+            return list(_providers)
+
+    @staticmethod
+    def _resolve(model_name: str = "auto") -> Tuple[str, str, Optional[str]]:
+        """Picks (provider, model, api_key) for `model_name` from the environment."""
+        _load_env()
         
         openrouter_key = os.getenv("OPENROUTER_API_KEY")
         gemini_key = os.getenv("GEMINI_API_KEY")
@@ -41,21 +134,73 @@ class ModelFactory:
         is_openrouter_model = any(k in model_name.lower() for k in ['gpt', 'claude', 'openai', 'anthropic', 'mistral'])
         
         if openrouter_key and (is_openrouter_model or not gemini_key):
-            from squadron.services.llm.openrouter import OpenRouterProvider
-            return OpenRouterProvider(openrouter_key, model_name if model_name != "auto" else "openai/gpt-4o")
+            return "openrouter", model_name if model_name != "auto" else "openai/gpt-4o", openrouter_key
             
         # 2. Google Gemini
         if gemini_key:
-            from squadron.services.llm.gemini import GeminiProvider
             target_model = model_name if "gemini" in model_name.lower() else "gemini-2.0-flash-exp"
-            return GeminiProvider(gemini_key, target_model)
+            return "gemini", target_model, gemini_key
             
         # 3. Fallback to OpenRouter if key exists (catch-all)
         if openrouter_key:
+            return "openrouter", "openai/gpt-4o", openrouter_key
+
+        return "mock", "mock", None
+
+    @staticmethod
+    def _router_members(model_name: str = "auto") -> List[Tuple[str, str, Optional[str]]]:
+        """
+        (provider, model, api_key) for each provider in SQUADRON_LLM_ROUTER that has a
+        key. The provider `model_name` resolves to always comes first, with that model,
+        even when SQUADRON_LLM_ROUTER doesn't list it. When it resolves to nothing (no
+        Gemini/OpenRouter key), the router's own list decides, never the mock model.
+        """
+        from squadron.services.llm.router import PROVIDERS, router_models, router_providers
+        _load_env()
+        names = router_providers()
+        if not names:
+            return []
+
+        primary = ModelFactory._resolve(model_name)
+        members = [primary] if primary[0] != "mock" else []
+        overrides = router_models()
+        for name in names:
+            env_key, default_model = PROVIDERS[name]
+            api_key = os.getenv(env_key)
+            if name != primary[0] and api_key:
+                members.append((name, overrides.get(name, default_model), api_key))
+        return members
+
+    @staticmethod
+    def _build_router(members: List[Tuple[str, str, Optional[str]]]):
+        from squadron.services.llm.router import RoutingProvider, hedge_settings
+        providers = {name: ModelFactory._build(name, model, api_key) for name, model, api_key in members}
+        logger.info(f"🔀 LLM router across {', '.join(providers)}")
+        return RoutingProvider(providers, **hedge_settings())
+
+    @staticmethod
+    def _build(provider: str, model: str, api_key: Optional[str]):
+        if provider == "openrouter":
             from squadron.services.llm.openrouter import OpenRouterProvider
-            return OpenRouterProvider(openrouter_key, "openai/gpt-4o")
+            return OpenRouterProvider(api_key, model)
+
+        if provider == "openai":
+            from squadron.services.llm.openai import OpenAIProvider
+            return OpenAIProvider(api_key, model)
+
+        if provider == "deepseek":
+            from squadron.services.llm.deepseek import DeepSeekProvider
+            return DeepSeekProvider(api_key, model)
+
+        if provider == "gemini":
+            from squadron.services.llm.gemini import GeminiProvider
+            return GeminiProvider(api_key, model)
 
         # 🤡 Fallback to Mock
         print(f"⚠️  Warning: No API keys found (GEMINI_API_KEY or OPENROUTER_API_KEY). Using Mock Brain.")
         return MockModel()
 
+    @staticmethod
+    def _create_provider(model_name: str = "auto"):
+        """Builds a new, unpooled and uncached provider for `model_name`."""
+        return ModelFactory._build(*ModelFactory._resolve(model_name))
@@ -0,0 +1,117 @@
+"""
+Prompt Builder 🧱
+Assembles the brain's think() prompt from a cached static prefix plus per-turn context.
+
+The prefix (agent system prompt, tool list, instructions) only changes when the agent
+profile or the tool registry changes, so it is built once per (profile, tool-set version,
+prefix tool names) and always placed first. Keeping those leading bytes identical between calls is what lets
+providers with server-side prompt caching (Gemini, OpenAI, DeepSeek, OpenRouter) reuse it.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant. Use tools if needed."
+
+INSTRUCTIONS = """INSTRUCTIONS:
+- If the user asks for something that requires a tool, output JSON: {"action": "tool", "tool_name": "...", "args": {...}}
+- If several independent tools are needed, call them all at once: {"action": "tools", "calls": [{"tool_name": "...", "args": {...}}, ...]}
+- If the user just wants to chat, output JSON: {"action": "reply", "content": "..."}
+- If you learn a new important fact, use 'save_memory'.
+- If the user gives a complex goal, use 'create_plan'.
+- **SELF-EVOLUTION**: To build a NEW tool, write a Python file to `squadron/skills/dynamic/NAME.py` containing a function `def NAME(...)`. Then call `refresh_skills`.
+- Be concise."""
+
+
+class PromptParts(NamedTuple):
+    """A built prompt, split at the cache boundary."""
+    prefix: str      # Stable across turns for the same profile + tool set
+    suffix: str      # Memory, plan and user input for this turn
+    prefix_key: str  # Short hash of the prefix, for provider caches and logging
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+
+class PromptAssembler:
+    """
+    Caches the static prompt prefix per (system prompt, tool-set version, tool names).
+    Callers bump the version whenever the tool registry changes. The names are part of
+    the key because one version can be listed in full (tool index still warming up) or
+    as the pinned core set (tool selection active).
+    """
+
+    def __init__(self, max_prefixes: int = 32):
+        self.max_prefixes = max_prefixes
+        self._prefixes: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def prefix(self, system_prompt: str, tools: dict, tools_version: int) -> tuple:
+        """Returns (prefix, prefix_key), building and caching it on first use."""
+        cache_key = (system_prompt, tools_version, tuple(tools))
+        with self._lock:
+            cached = self._prefixes.get(cache_key)
+            if cached is not None:
+                self._prefixes.move_to_end(cache_key)
+                self.hits += 1
+                return cached
+
+        tool_desc = "\n".join(f"- {name}: {info['description']}" for name, info in list(tools.items()))
+        prefix = f"""
+{system_prompt}
+
+You have access to the following tools:
+{tool_desc}
+
+{INSTRUCTIONS}
+"""
+        entry = (prefix, hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16])
+
+        with self._lock:
+            self.misses += 1
+            self._prefixes[cache_key] = entry
+            while len(self._prefixes) > self.max_prefixes:
+                self._prefixes.popitem(last=False)
+        return entry
+
+    def build(
+        self,
+        user_input: str,
+        tools: dict,
+        tools_version: int,
+        system_prompt: str = None,
+        memory_context: str = "",
+        plan_context: str = "",
+        extra_tools: dict = None
+    ) -> PromptParts:
+        """
+        Builds the full prompt for one think() turn.
+        `extra_tools` (per-call tool selection, see tool_index.py) go in the suffix so
+        the cached prefix stays identical across calls.
+        """
+        prefix, prefix_key = self.prefix(system_prompt or DEFAULT_SYSTEM_PROMPT, tools, tools_version)
+        tool_context = ""
+        if extra_tools:
+            tool_context = "\nMore tools relevant to this request:\n" + "\n".join(
+                f"- {name}: {info['description']}" for name, info in extra_tools.items()
+            ) + "\n"
+        suffix = f"""{tool_context}
+{memory_context}
+
+{plan_context}
+USER: {user_input}
+RESPONSE (JSON):"""
+        return PromptParts(prefix, suffix, prefix_key)
+
+    def invalidate(self):
+        """Drops every cached prefix."""
+        with self._lock:
+            self._prefixes.clear()
+
+
+# Global singleton (the tool registry is process-wide, so its prompt prefixes are too)
+prompt_assembler = PromptAssembler()
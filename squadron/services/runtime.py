@@ -0,0 +1,113 @@
+"""
+Async Runtime 🔁
+One long-lived asyncio loop on a background thread, shared by all sync code that
+needs to run a coroutine.
+
+Sync callers (tool wrappers, MCP discovery, OpenCodeEngine.think_sync) used to grab
+or create event loops ad hoc, which fails inside an already-running loop and costs
+a new loop (sometimes a new executor) per call. Instead they `submit()` to this
+loop and get a concurrent.futures.Future back. Long-lived async resources such as
+MCP sessions also live here, so they survive between calls.
+
+    from squadron.services.runtime import run_sync, submit
+    future = submit(some_coroutine())   # from any thread
+    result = run_sync(some_coroutine(), timeout=30)
+"""
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional
+
+logger = logging.getLogger('Runtime')
+
+
+class AsyncRuntime:
+    """An event loop running forever on a daemon thread, started on first use."""
+
+    def __init__(self, name: str = "squadron-runtime"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, args=(self._loop,), name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def in_runtime(self) -> bool:
+        """True when called from code running on the runtime loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro) -> Future:
+        """Schedules `coro` on the runtime loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_sync(self, coro, timeout: float = None) -> Any:
+        """Runs `coro` on the runtime loop and blocks for its result."""
+        if self.in_runtime():
+            coro.close()
+            raise RuntimeError("run_sync() would deadlock on the runtime loop; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Cancels outstanding tasks (letting them clean up) and stops the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or not loop.is_running():
+            return
+
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Runtime tasks did not finish cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+# Global singleton
+_runtime: Optional[AsyncRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AsyncRuntime:
+    """Get or create the process-wide runtime (stopped at interpreter exit)."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = AsyncRuntime()
+            atexit.register(_runtime.stop)
+        return _runtime
+
+
+def submit(coro) -> Future:
+    """Schedules `coro` on the shared runtime loop."""
+    return get_runtime().submit(coro)
+
+
+def run_sync(coro, timeout: float = None) -> Any:
+    """Runs `coro` on the shared runtime loop and waits for the result."""
+    return get_runtime().run_sync(coro, timeout)
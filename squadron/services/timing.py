@@ -0,0 +1,145 @@
+"""
+Timing ⏱️
+Per-phase latency spans for the brain loop.
+
+Wrap a phase in `span("llm_call")` to time it. Each span is tagged with the current
+agent and mission (set with `timing_context()`, carried by contextvars so it follows
+asyncio tasks and `asyncio.to_thread`), published as a `timing` event on the event
+bus, and added to a per-phase histogram served by GET /metrics/timing.
+
+Phases recorded by the brain: memory_recall, read_plan, prompt_build, llm_call,
+json_parse, safety_check, tool_execution. MCP discovery (the background warm-up)
+is recorded as mcp_init.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger('Timing')
+
+_agent_var: contextvars.ContextVar = contextvars.ContextVar("squadron_timing_agent", default=None)
+_mission_var: contextvars.ContextVar = contextvars.ContextVar("squadron_timing_mission", default=None)
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+@contextmanager
+def timing_context(agent: str = None, mission: str = None):
+    """Tags every span inside the block with `agent` and/or `mission`."""
+    tokens = []
+    if agent is not None:
+        tokens.append((_agent_var, _agent_var.set(agent)))
+    if mission is not None:
+        tokens.append((_mission_var, _mission_var.set(mission)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_tags() -> dict:
+    return {"agent": _agent_var.get(), "mission": _mission_var.get()}
+
+
+class PhaseHistogram:
+    """Fixed-bucket latency histogram plus a window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 1000):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.recent.append(ms)
+
+    def merge(self, other: "PhaseHistogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.recent.extend(other.recent)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.recent)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2) if ordered else 0.0
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {
+                **{f"le_{bound}": n for bound, n in zip(BUCKETS_MS, self.counts)},
+                "le_inf": self.counts[-1]
+            }
+        }
+
+
+class TimingRecorder:
+    """Thread-safe store of histograms keyed by (phase, agent)."""
+
+    def __init__(self, publish: bool = True):
+        self.publish = publish
+        self._histograms: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, ms: float, **tags):
+        tags = {**current_tags(), **tags}
+        with self._lock:
+            key = (phase, tags.get("agent"))
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = PhaseHistogram()
+            hist.add(ms)
+
+        if self.publish:
+            from squadron.services.event_bus import emit_timing
+            emit_timing(phase, ms, tags)
+
+    @contextmanager
+    def span(self, phase: str, **tags):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, (time.perf_counter() - start) * 1000, **tags)
+
+    def get_stats(self, phase: Optional[str] = None, agent: Optional[str] = None) -> dict:
+        """Per-phase summaries, optionally filtered by phase and/or agent."""
+        merged: dict = {}
+        with self._lock:
+            for (p, a), hist in self._histograms.items():
+                if (phase and p != phase) or (agent and a != agent):
+                    continue
+                merged.setdefault(p, PhaseHistogram()).merge(hist)
+        return {p: hist.summary() for p, hist in sorted(merged.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+# Global singleton
+timing_recorder = TimingRecorder()
+
+
+def span(phase: str, **tags):
+    """Times the enclosed block as `phase` on the global recorder."""
+    return timing_recorder.span(phase, **tags)
@@ -0,0 +1,247 @@
+"""
+Token Accounting 🧮
+Token estimates per provider, prompt budgets, and a per-agent/mission usage ledger.
+
+- TokenEstimator counts prompt tokens the way each provider roughly does (tiktoken for
+  OpenAI-family models when it is installed, calibrated chars-per-token otherwise, and
+  a flat cost per image).
+- PromptBudget trims the lowest-priority prompt sections (old memories first, then plan
+  detail, then extra tool descriptions) until the prompt fits the input budget.
+- TokenLedger records input/output tokens per call, tagged with the agent and mission
+  from the current timing context. Served by GET /metrics/tokens.
+
+Environment:
+    SQUADRON_PROMPT_TOKEN_BUDGET    Max input tokens for a think() prompt (default 32000, 0 = no limit)
+"""
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from squadron.services.timing import current_tags
+
+logger = logging.getLogger('Tokens')
+
+# Optional: exact counts for OpenAI-family models
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+CHARS_PER_TOKEN = {"gemini": 4.0, "openai": 4.0, "openrouter": 4.0, "deepseek": 3.3, "default": 4.0}
+IMAGE_TOKENS = {"gemini": 258, "openai": 765, "openrouter": 765, "default": 258}
+
+_PROVIDER_CLASSES = {
+    "GeminiProvider": "gemini",
+    "OpenAIProvider": "openai",
+    "OpenRouterProvider": "openrouter",
+    "DeepSeekProvider": "deepseek",
+}
+
+
+def provider_of(model) -> str:
+    """Provider family of a model object (looks through the cache and router wrappers)."""
+    model = getattr(model, "provider", model)  # CachedProvider
+    routed = getattr(model, "providers", None)  # RoutingProvider: budget for its first choice
+    if isinstance(routed, dict) and routed:
+        return next(iter(routed))
+    return _PROVIDER_CLASSES.get(type(model).__name__, "default")
+
+
+class TokenEstimator:
+    """Approximate token counts for one provider family."""
+
+    def __init__(self, provider: str = "default"):
+        self.provider = provider
+        self.chars_per_token = CHARS_PER_TOKEN.get(provider, CHARS_PER_TOKEN["default"])
+        self.image_tokens = IMAGE_TOKENS.get(provider, IMAGE_TOKENS["default"])
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE and provider in ("openai", "openrouter"):
+            try:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.debug(f"tiktoken unavailable ({e}); estimating from characters")
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def count(self, prompt) -> int:
+        """Tokens in a prompt: a string, a parts list (text and images), or chat messages."""
+        if prompt is None:
+            return 0
+        if isinstance(prompt, str):
+            return self.count_text(prompt)
+        if isinstance(prompt, dict):
+            return self.count(prompt.get("content"))
+        if isinstance(prompt, (list, tuple)):
+            return sum(self.count(part) for part in prompt)
+        return self.image_tokens  # PIL images and other binary parts
+
+
+_estimators: Dict[str, TokenEstimator] = {}
+_estimators_lock = threading.Lock()
+
+
+def get_estimator(provider: str = "default") -> TokenEstimator:
+    """Shared estimator per provider family."""
+    with _estimators_lock:
+        if provider not in _estimators:
+            _estimators[provider] = TokenEstimator(provider)
+        return _estimators[provider]
+
+
+def shorten_line(text: str, max_chars: int = 160) -> str:
+    """Cuts a line after its first sentence (or max_chars), keeping the trailing newline."""
+    end = "\n" if text.endswith("\n") else ""
+    body = text.rstrip("\n")
+    cut = body.find(". ")
+    if 0 < cut < max_chars:
+        body = body[:cut + 1]
+    elif len(body) > max_chars:
+        body = body[:max_chars].rstrip() + "…"
+    return body + end
+
+
+@dataclass
+class Section:
+    """A trimmable part of the prompt, made of items that can be dropped one by one."""
+    name: str
+    items: List[str]
+    priority: int = 0                          # Lower priorities are trimmed first
+    header: str = ""
+    keys: Optional[List[str]] = None           # Optional id per item (e.g. tool name)
+    drop_order: Optional[List[int]] = None     # Item indices, dropped first to last (default: from the end)
+    shorten: Optional[Callable[[str], str]] = None  # Tried on every item before dropping any
+    truncated_note: str = ""                   # Appended when items were dropped
+    shortened: bool = False
+    dropped: Set[int] = field(default_factory=set)
+
+    def kept(self) -> List[int]:
+        return [i for i in range(len(self.items)) if i not in self.dropped]
+
+    def kept_keys(self) -> List[str]:
+        return [self.keys[i] for i in self.kept()] if self.keys else []
+
+    def render(self) -> str:
+        kept = self.kept()
+        if not kept:
+            return ""
+        note = self.truncated_note if self.dropped else ""
+        return self.header + "".join(self.items[i] for i in kept) + note
+
+
+class PromptBudget:
+    """Fits prompt sections into `max_tokens` by trimming the lowest-priority ones first."""
+
+    def __init__(self, max_tokens: int, estimator: TokenEstimator = None):
+        self.max_tokens = max_tokens
+        self.estimator = estimator or get_estimator()
+
+    def fit(self, fixed, sections: List[Section]) -> int:
+        """
+        Trims `sections` in place so `fixed` plus every section fits the budget
+        (the fixed part, e.g. system prompt and user input, is never trimmed).
+        Returns the estimated token total afterwards.
+
+        Each item is counted once (again after shortening) and dropping one just
+        subtracts its count, so trimming is linear in the number of items.
+        """
+        count = self.estimator.count
+        costs = {id(s): self._costs(s) for s in sections}
+        used = count(fixed) + sum(self._total(s, *costs[id(s)]) for s in sections)
+        if self.max_tokens <= 0 or used <= self.max_tokens:
+            return used
+
+        before = used
+        for section in sorted(sections, key=lambda s: s.priority):
+            if used <= self.max_tokens:
+                break
+            overhead, note, items = costs[id(section)]
+            if section.shorten is not None:
+                used -= self._total(section, overhead, note, items)
+                section.items = [section.shorten(item) for item in section.items]
+                section.shortened = True
+                overhead, note, items = self._costs(section)
+                used += self._total(section, overhead, note, items)
+            kept = len(section.items) - len(section.dropped)
+            order = section.drop_order or list(reversed(range(len(section.items))))
+            for index in order:
+                if used <= self.max_tokens:
+                    break
+                if index in section.dropped:
+                    continue
+                if not section.dropped:
+                    used += note
+                section.dropped.add(index)
+                kept -= 1
+                used -= items[index]
+                if kept == 0:
+                    used -= overhead + note  # An empty section renders as ""
+
+        logger.info(f"✂️ Prompt trimmed to budget: ~{before} -> ~{used} tokens (limit {self.max_tokens})")
+        return used
+
+    def _costs(self, section: Section) -> tuple:
+        """(header tokens, truncation note tokens, tokens per item)."""
+        count = self.estimator.count
+        return count(section.header), count(section.truncated_note), [count(item) for item in section.items]
+
+    @staticmethod
+    def _total(section: Section, overhead: int, note: int, items: List[int]) -> int:
+        kept = [items[i] for i in range(len(items)) if i not in section.dropped]
+        if not kept:
+            return 0
+        return overhead + sum(kept) + (note if section.dropped else 0)
+
+
+def prompt_token_budget() -> int:
+    return int(os.getenv("SQUADRON_PROMPT_TOKEN_BUDGET", "32000"))
+
+
+class TokenLedger:
+    """Thread-safe input/output token totals keyed by (agent, mission)."""
+
+    def __init__(self):
+        self._totals: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, input_tokens: int, output_tokens: int, provider: str = None, **tags):
+        tags = {**current_tags(), **tags}
+        key = (tags.get("agent"), tags.get("mission"))
+        with self._lock:
+            entry = self._totals.setdefault(key, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "providers": {}})
+            entry["calls"] += 1
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            if provider:
+                entry["providers"][provider] = entry["providers"].get(provider, 0) + input_tokens + output_tokens
+
+    def get_stats(self, agent: Optional[str] = None, mission: Optional[str] = None) -> dict:
+        """Totals overall and per agent and mission, optionally filtered."""
+        total = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        by_agent: Dict[str, dict] = {}
+        by_mission: Dict[str, dict] = {}
+        with self._lock:
+            for (a, m), entry in self._totals.items():
+                if (agent and a != agent) or (mission and m != mission):
+                    continue
+                for bucket in (total, by_agent.setdefault(a or "unknown", dict.fromkeys(total, 0)),
+                               by_mission.setdefault(m or "none", dict.fromkeys(total, 0))):
+                    for k in total:
+                        bucket[k] += entry[k]
+        return {"total": total, "by_agent": by_agent, "by_mission": by_mission}
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+
+# Global singleton
+token_ledger = TokenLedger()
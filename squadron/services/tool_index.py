@@ -0,0 +1,175 @@
+"""
+Tool Index 🧭
+Embedding index over tool descriptions, used to keep think() prompts small.
+
+With MCP servers configured the registry can hold hundreds of tools. Pasting all of
+them into every prompt costs tokens and latency, so once the registry grows past
+SQUADRON_TOOL_SELECT_THRESHOLD tools the brain lists only a pinned core set in the
+(cached) prompt prefix, plus the top-k tools most similar to the user input.
+
+Each description is embedded once; later syncs only embed tools that were added or
+whose description changed. Syncing happens ahead of time (MCP warm-up) or on a
+background thread: think() never waits on embedding tool descriptions (or on the
+embedding model loading). Until the first sync finishes, every tool is listed.
+
+Environment:
+    SQUADRON_TOOL_SELECT_THRESHOLD   Registry size that enables selection (default 40)
+    SQUADRON_TOOL_TOP_K              Extra tools selected per call (default 12)
+    SQUADRON_PINNED_TOOLS            Comma-separated override of the pinned core set
+"""
+import heapq
+import logging
+import os
+import threading
+from collections.abc import Mapping
+from typing import List, Optional
+
+from squadron.services.embeddings import cosine, get_embedder
+
+logger = logging.getLogger('ToolIndex')
+
+TOOL_SELECT_THRESHOLD = int(os.getenv("SQUADRON_TOOL_SELECT_THRESHOLD", "40"))
+TOOL_TOP_K = int(os.getenv("SQUADRON_TOOL_TOP_K", "12"))
+
+# Always offered: the tools every agent's instructions rely on
+DEFAULT_PINNED_TOOLS = (
+    "read_file", "write_file", "list_dir", "run_command",
+    "save_memory", "recall_memory",
+    "create_plan", "read_plan", "update_plan",
+    "assign_task", "handoff_task", "reply_to_ticket", "tag_agent",
+    "refresh_skills",
+)
+
+
+def pinned_tools() -> tuple:
+    override = os.getenv("SQUADRON_PINNED_TOOLS")
+    if override:
+        return tuple(name.strip() for name in override.split(",") if name.strip())
+    return DEFAULT_PINNED_TOOLS
+
+
+def _tool_text(name: str, description: str) -> str:
+    return f"{name.replace('_', ' ')}: {description}"
+
+
+class ToolIndex:
+    """Thread-safe map of tool name -> description embedding."""
+
+    def __init__(self, embedder=None):
+        self._embedder = embedder
+        self._vectors: dict = {}  # name -> (description, vector)
+        self._synced_version = None
+        self._lock = threading.Lock()
+        self._warmup: Optional[threading.Thread] = None
+        self._warmup_lock = threading.Lock()
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def sync(self, tools: Mapping, version=None):
+        """Embeds new or changed tools and forgets removed ones."""
+        with self._lock:
+            if version is not None and version == self._synced_version:
+                return
+            entries = tools.items()
+            current = {name for name, _ in entries}
+            for name in list(self._vectors):
+                if name not in current:
+                    del self._vectors[name]
+
+            stale = [
+                (name, info["description"]) for name, info in entries
+                if self._vectors.get(name, (None,))[0] != info["description"]
+            ]
+            if stale:
+                vectors = self.embedder.embed([_tool_text(name, desc) for name, desc in stale])
+                for (name, desc), vector in zip(stale, vectors):
+                    self._vectors[name] = (desc, vector)
+                logger.info(f"🧭 Indexed {len(stale)} tool(s) ({len(self._vectors)} total)")
+            self._synced_version = version
+
+    @property
+    def ready(self) -> bool:
+        """True once a sync has finished (and so the embedder is loaded)."""
+        return self._synced_version is not None or len(self._vectors) > 0
+
+    def warm_up(self, tools: Mapping, version=None) -> Optional[threading.Thread]:
+        """Syncs on a background thread (one at a time)."""
+        with self._warmup_lock:
+            if self._warmup is not None and self._warmup.is_alive():
+                return self._warmup
+            self._warmup = threading.Thread(
+                target=self._sync_quietly, args=(tools, version), name="squadron-tool-index", daemon=True
+            )
+            self._warmup.start()
+            return self._warmup
+
+    def _sync_quietly(self, tools: Mapping, version):
+        try:
+            self.sync(tools, version)
+        except Exception as e:
+            logger.warning(f"Tool index sync failed: {e}")
+
+    def select(self, query: str, tools: Mapping, k: int, exclude=(), version=None) -> Optional[List[str]]:
+        """
+        Names of the k tools most relevant to `query`, best first.
+        With a registry `version`, a stale index is refreshed in the background and
+        the current vectors are used meanwhile; None means nothing is indexed yet.
+        Without a version the index is synced inline.
+        """
+        if version is None:
+            self.sync(tools, version)
+        elif version != self._synced_version:
+            self.warm_up(tools, version)
+            if not self.ready:
+                return None
+        query_vector = self.embedder.embed([query])[0]
+        with self._lock:
+            scored = [
+                (cosine(query_vector, vector), name)
+                for name, (_, vector) in self._vectors.items()
+                if name not in exclude
+            ]
+        return [name for _, name in heapq.nlargest(k, scored)]
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+
+def split_tools(tools: Mapping, query: str, version=None, index: "ToolIndex" = None):
+    """
+    Splits the registry for one think() call.
+    Returns (prefix_tools, extra_tools): small registries go entirely into the prefix and
+    extra_tools is None; large ones get the pinned core set plus the top-k matches.
+    """
+    if len(tools) <= TOOL_SELECT_THRESHOLD:
+        return tools, None
+
+    if index is None:
+        index = get_tool_index()
+    core = {name: tools[name] for name in pinned_tools() if name in tools}
+    try:
+        names = index.select(query, tools, TOOL_TOP_K, exclude=core, version=version)
+    except Exception as e:
+        logger.warning(f"Tool selection failed ({e}), listing every tool")
+        return tools, None
+    if names is None:
+        return tools, None  # Index still warming up
+    return core, {name: tools[name] for name in names if name in tools}
+
+
+# Global singleton
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_tool_index() -> ToolIndex:
+    """Get or create the process-wide tool index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ToolIndex()
+        return _index
@@ -0,0 +1,148 @@
+"""
+Tool Registry 🧰
+Process-wide registry of the tools that every SquadronBrain can call.
+
+Brains hold a reference to the shared registry instead of building their own tool
+table, so spinning up another agent costs nothing extra. Heavy tool modules
+(Playwright, Paramiko, PyAutoGUI, ...) are registered by import path and only
+imported the first time the tool is actually invoked.
+"""
+import importlib
+import logging
+import threading
+from collections.abc import Mapping
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger('ToolRegistry')
+
+
+class LazyTool:
+    """
+    Callable stand-in for a tool function that lives in a heavy module.
+    The target ("package.module:function") is imported on first call.
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        self._func: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def resolve(self) -> Callable:
+        """Imports and returns the real tool function."""
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    module_name, _, attr = self.target.partition(":")
+                    module = importlib.import_module(module_name)
+                    self._func = getattr(module, attr)
+                    logger.info(f"📦 Loaded tool module {module_name}")
+        return self._func
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyTool({self.target!r})"
+
+
+class ToolRegistry(Mapping):
+    """
+    Thread-safe tool table shared by all brains.
+
+    Entries look like {"description": str, "func": callable, "hazardous": bool, "bind": bool,
+    "sequential": bool}. Tools registered with bind=True are brain methods and get the calling
+    brain as their first argument. sequential=True tools never run concurrently with other
+    tools (they touch process-wide state such as the cwd, the mouse or the keyboard). `version` increases on every change so caches built from the registry
+    (e.g. the prompt prefix) know when to rebuild.
+    """
+
+    def __init__(self):
+        self._tools: dict = {}
+        self._lock = threading.RLock()
+        self._loaded_sources: set = set()
+        self.version = 0
+
+    def register(
+        self,
+        name: str,
+        description: str,
+        func: Union[Callable, str],
+        hazardous: bool = False,
+        bind: bool = False,
+        sequential: bool = False
+    ):
+        """
+        Registers (or replaces) a tool.
+        `func` may be a callable or a "module:function" path that is imported lazily.
+        """
+        if isinstance(func, str):
+            func = LazyTool(func)
+        with self._lock:
+            self._tools[name] = {
+                "description": description,
+                "func": func,
+                "hazardous": hazardous,
+                "bind": bind,
+                "sequential": sequential
+            }
+            self.version += 1
+
+    def unregister(self, name: str):
+        """Removes a tool if present."""
+        with self._lock:
+            if self._tools.pop(name, None) is not None:
+                self.version += 1
+
+    def mark_loaded(self, source: str):
+        """Records that a tool source (e.g. "core", "mcp") has been registered."""
+        with self._lock:
+            self._loaded_sources.add(source)
+
+    def is_loaded(self, source: str) -> bool:
+        return source in self._loaded_sources
+
+    def snapshot(self) -> tuple:
+        """The current tools and loaded sources, for restore()."""
+        with self._lock:
+            return dict(self._tools), set(self._loaded_sources)
+
+    def restore(self, snapshot: tuple):
+        """Puts back a snapshot() (e.g. to undo the tools a test registered)."""
+        tools, sources = snapshot
+        with self._lock:
+            if tools != self._tools or sources != self._loaded_sources:
+                self._tools = dict(tools)
+                self._loaded_sources = set(sources)
+                self.version += 1
+
+    # --- Mapping interface (snapshots, so readers never see a dict mid-resize) ---
+
+    def __getitem__(self, name: str) -> dict:
+        return self._tools[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._tools
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._tools))
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def items(self):
+        with self._lock:
+            return list(self._tools.items())
+
+
+# Global singleton
+_registry = ToolRegistry()
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Get the process-wide tool registry."""
+    return _registry
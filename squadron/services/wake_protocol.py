@@ -14,6 +14,7 @@ from datetime import datetime
 from typing import Optional, Callable
 from squadron.swarm.overseer import overseer
 from squadron.services.event_bus import event_bus, emit_agent_start, emit_agent_complete, emit_error
+from squadron.services.timing import timing_context
 
 logger = logging.getLogger('WakeProtocol')
 
@@ -50,6 +51,11 @@ class WakeProtocol:
         """
         mission_id = f"mission-{datetime.now().strftime('%Y%m%d%H%M%S')}-{source.get('id', 'unknown')}"
         
+        # Every timing span recorded while the mission runs is tagged with its id
+        with timing_context(mission=mission_id):
+            return self._run_mission(mission_id, source)
+    
+    def _run_mission(self, mission_id: str, source: dict) -> dict:
         logger.info(f"⏰ WAKE PROTOCOL ACTIVATED")
         logger.info(f"   Mission: {mission_id}")
         logger.info(f"   Source: {source.get('type')} - {source.get('summary', 'No summary')[:50]}")
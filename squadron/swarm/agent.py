@@ -1,15 +1,28 @@
 
+import asyncio
+import contextvars
 import logging
 import os
+import threading
 from typing import Optional
 from squadron.brain import SquadronBrain
 from squadron.services.model_factory import ModelFactory
 from squadron.services.event_bus import emit_agent_start, emit_agent_thought, emit_agent_complete
+from squadron.services.timing import timing_context
 from squadron.services.worktree import create_worktree, get_worktree_path
 
 
 logger = logging.getLogger('SwarmAgent')
 
+# A worktree task chdirs the whole process, so only one runs at a time (sync or async).
+# Tasks delegated from inside it already hold the slot and don't wait for it again.
+_worktree_lock = threading.Lock()
+_in_worktree: contextvars.ContextVar = contextvars.ContextVar("squadron_in_worktree", default=False)
+
+
+def _needs_worktree_slot(context: dict = None) -> bool:
+    return bool((context or {}).get("task_id")) and not _in_worktree.get()
+
 class AgentNode:
     def __init__(self, name: str, role: str, system_prompt: str, tools: list = None):
         self.name = name
@@ -21,8 +34,10 @@ class AgentNode:
         self._current_tool = None
 
         
-        # Each Agent gets its own Brain
+        # Each Agent gets its own Brain (per-agent state only; tools, memory and
+        # MCP bridge are shared process-wide, so this is cheap)
         self.brain = SquadronBrain()
+        self.brain.current_agent = name
         
         # Customizing the Brain for this specialist
         # (In a real implementation, we would filter self.brain.tools based on 'tools' list)
@@ -41,6 +56,67 @@ class AgentNode:
                 - notes: Any additional context
                 - task_id: If provided, creates an isolated worktree
         """
+        # Tags every timing span of this task with the agent (and mission, if any)
+        with timing_context(agent=self.name, mission=(context or {}).get("mission_id")):
+            exclusive = _needs_worktree_slot(context)
+            if exclusive:
+                _worktree_lock.acquire()
+                token = _in_worktree.set(True)
+            cwd = os.getcwd()
+            try:
+                profile, worktree_path, original_cwd = self._start_task(task, context)
+                
+                # 1. Think
+                decision = self.brain.think(task, profile)
+                self._note_decision(decision)
+                
+                # 2. Execute
+                result = self.brain.execute(decision)
+                
+                return self._finish_task(task, context, result, worktree_path, original_cwd)
+            finally:
+                if exclusive:
+                    self._release_worktree_slot(cwd, token)
+
+    async def aprocess_task(self, task: str, context: dict = None) -> dict:
+        """
+        Async process_task() for the API server: the LLM call is awaited on the
+        provider's async client and blocking work (worktrees, tools) runs in threads.
+        Worktree tasks still take the process-wide worktree slot, since they chdir
+        while other tasks keep running on the same loop.
+        """
+        with timing_context(agent=self.name, mission=(context or {}).get("mission_id")):
+            exclusive = _needs_worktree_slot(context)
+            if exclusive:
+                # Polled rather than acquired in a thread, so cancelling the wait can't leak the lock
+                while not _worktree_lock.acquire(blocking=False):
+                    await asyncio.sleep(0.05)
+                token = _in_worktree.set(True)
+            cwd = os.getcwd()
+            try:
+                profile, worktree_path, original_cwd = await asyncio.to_thread(self._start_task, task, context)
+                
+                decision = await self.brain.athink(task, profile)
+                self._note_decision(decision)
+                
+                result = await self.brain.aexecute(decision)
+                
+                return self._finish_task(task, context, result, worktree_path, original_cwd)
+            finally:
+                if exclusive:
+                    self._release_worktree_slot(cwd, token)
+
+    def _release_worktree_slot(self, cwd: str, token):
+        """Returns to `cwd` (even if the task failed inside its worktree) and frees the slot."""
+        try:
+            if os.getcwd() != cwd:
+                os.chdir(cwd)
+        finally:
+            _in_worktree.reset(token)
+            _worktree_lock.release()
+
+    def _start_task(self, task: str, context: dict = None):
+        """Sets up the worktree and profile. Returns (profile, worktree_path, original_cwd)."""
         self._current_task = task
         
         # Setup worktree isolation if task_id is provided
@@ -91,28 +167,29 @@ class AgentNode:
         
         emit_agent_start(self.name, task)
         
-        # 1. Think
         # We might want to capture thoughts more granularly in the future
         self._current_thought = f"Analyzing task: {task[:50]}..."
         emit_agent_thought(self.name, self._current_thought)
         
-        decision = self.brain.think(task, profile)
-        
-        # Update thought based on decision
+        return profile, worktree_path, original_cwd
+
+    def _note_decision(self, decision: dict):
+        """Updates the current thought/tool from the brain's decision."""
         if decision.get("action") == "tool":
             self._current_thought = f"Decided to use {decision.get('tool_name')}"
             self._current_tool = decision.get("tool_name")
+        elif decision.get("action") == "tools":
+            tool_names = [c.get("tool_name", c.get("tool")) for c in decision.get("calls", []) if isinstance(c, dict)]
+            self._current_thought = f"Decided to use {', '.join(map(str, tool_names))}"
+            self._current_tool = tool_names[0] if tool_names else None
         else:
             self._current_thought = "Formulating response..."
             self._current_tool = None
             
         emit_agent_thought(self.name, self._current_thought)
-        
-        # 2. Execute
-        # Note: brain.execute will now handle tool_call/result emission if we update it
-        result = self.brain.execute(decision)
-        
-        # 3. Log to history
+
+    def _finish_task(self, task: str, context: dict, result: dict, worktree_path, original_cwd) -> dict:
+        """Records history, emits completion and leaves the worktree."""
         self.task_history.append({
             "task": task,
             "context": context,
@@ -89,9 +89,8 @@ Approve or reject changes. Report findings clearly."""
         from squadron.services.model_factory import ModelFactory
         return ModelFactory.create("gemini-2.0-flash")
 
-    def route_with_llm(self, user_input: str) -> str:
-        """Use LLM to intelligently route tasks to the right agent."""
-        router_prompt = f"""You are a task router. Given a user request, decide which agent should handle it.
+    def _router_prompt(self, user_input: str) -> str:
+        return f"""You are a task router. Given a user request, decide which agent should handle it.
 
 AGENTS:
 - Marcus: Product Manager. Handles planning, strategy, requirements, delegation, project management.
@@ -102,24 +101,41 @@ USER REQUEST: {user_input}
 
 Respond with ONLY the agent name (Marcus, Caleb, or Sentinel). Nothing else."""
 
+    def route_with_llm(self, user_input: str) -> str:
+        """Use LLM to intelligently route tasks to the right agent."""
         try:
             model = self.get_router_model()
-            response = model.generate(prompt=router_prompt, max_tokens=10, temperature=0.1)
-            agent_name = str(response).strip()
-            
-            # Validate response
-            if agent_name in self.agents:
-                return agent_name
-            else:
-                # Fallback: extract agent name from response
-                for name in self.agents.keys():
-                    if name.lower() in agent_name.lower():
-                        return name
-                return "Marcus"  # Default fallback
+            response = model.generate(prompt=self._router_prompt(user_input), max_tokens=10, temperature=0.1)
+            return self._match_agent(response)
         except Exception as e:
             logger.warning(f"LLM Router failed: {e}, falling back to heuristic")
             return self.route_heuristic(user_input)
 
+    async def aroute_with_llm(self, user_input: str) -> str:
+        """Async route_with_llm() on the provider's async client."""
+        from squadron.services.llm.base import call_async
+        try:
+            model = self.get_router_model()
+            response = await call_async(model, self._router_prompt(user_input), max_tokens=10, temperature=0.1)
+            return self._match_agent(response)
+        except Exception as e:
+            logger.warning(f"LLM Router failed: {e}, falling back to heuristic")
+            return self.route_heuristic(user_input)
+
+    def _match_agent(self, response) -> str:
+        """Maps the router's reply to a known agent name."""
+        agent_name = str(response).strip()
+        
+        # Validate response
+        if agent_name in self.agents:
+            return agent_name
+        else:
+            # Fallback: extract agent name from response
+            for name in self.agents.keys():
+                if name.lower() in agent_name.lower():
+                    return name
+            return "Marcus"  # Default fallback
+
     def route_heuristic(self, user_input: str) -> str:
         """Fallback heuristic-based routing."""
         user_input_lower = user_input.lower()
@@ -156,6 +172,25 @@ Respond with ONLY the agent name (Marcus, Caleb, or Sentinel). Nothing else."""
         
         return f"[{target_agent}]: {result['text']}"
 
+    async def aroute(self, user_input: str, use_llm: bool = True) -> str:
+        """Async route(), used by the API server so routing never blocks its event loop."""
+        if use_llm:
+            target_agent = await self.aroute_with_llm(user_input)
+        else:
+            target_agent = self.route_heuristic(user_input)
+            
+        logger.info(f"🔀 Routing to: {target_agent}")
+        
+        self._log_activity("route", {
+            "input": user_input[:100],
+            "target": target_agent
+        })
+        
+        agent = self.agents[target_agent]
+        result = await agent.aprocess_task(user_input)
+        
+        return f"[{target_agent}]: {result['text']}"
+
     def handoff(self, from_agent: str, to_agent: str, task: str, context: dict = None) -> dict:
         """
         Transfer a task from one agent to another with context.
@@ -77,6 +77,24 @@ def mock_llm_tool_response():
     return mock
 
 
+# =============================================================================
+# Tool Registry Fixtures
+# =============================================================================
+
+@pytest.fixture(autouse=True)
+def restore_tool_registry():
+    """
+    Undo tool registrations made by a test.
+    The registry is process-wide: leftover test tools leak into later tests and can
+    push it past SQUADRON_TOOL_SELECT_THRESHOLD (starting tool-index warm-up).
+    """
+    from squadron.services.tool_registry import get_tool_registry
+    registry = get_tool_registry()
+    snapshot = registry.snapshot()
+    yield
+    registry.restore(snapshot)
+
+
 # =============================================================================
 # Memory Fixtures
 # =============================================================================
@@ -120,6 +120,139 @@ class TestBrainThink:
                     # Should fallback to reply with raw content
                     assert result["action"] == "reply"
 
+    def test_think_streams_tokens_to_event_bus(self, mock_env):
+        """Verify streaming providers forward each delta as an agent_token event."""
+        mock_llm = Mock()
+        mock_llm.supports_streaming = True
+        mock_llm.generate_stream.return_value = iter(['{"action": "reply", ', '"content": "Hi"}'])
+        
+        with patch('squadron.services.model_factory.ModelFactory.create', return_value=mock_llm):
+            with patch('squadron.memory.hippocampus.Hippocampus'):
+                with patch('squadron.clients.mcp_client.MCPBridge'):
+                    from squadron.brain import SquadronBrain
+                    brain = SquadronBrain()
+                    brain.planner_model = mock_llm
+                    
+                    with patch('squadron.brain.emit_agent_token') as emit_token:
+                        result = brain.think("Hello", agent_profile=None)
+                    
+                    assert result == {"action": "reply", "content": "Hi"}
+                    assert [c.args[1] for c in emit_token.call_args_list] == ['{"action": "reply", ', '"content": "Hi"}']
+                    mock_llm.generate.assert_not_called()
+
+    def test_think_stops_reading_once_decision_closes(self, mock_env):
+        """Verify trailing text after the decision object is never awaited."""
+        def stream(*args, **kwargs):
+            yield '{"action": "tool", "tool_name": "list_dir", "args": {"path": "."}}'
+            raise AssertionError("read past the decision")
+        
+        mock_llm = Mock()
+        mock_llm.supports_streaming = True
+        mock_llm.generate_stream.side_effect = stream
+        
+        with patch('squadron.services.model_factory.ModelFactory.create', return_value=mock_llm):
+            with patch('squadron.memory.hippocampus.Hippocampus'):
+                with patch('squadron.clients.mcp_client.MCPBridge'):
+                    from squadron.brain import SquadronBrain
+                    brain = SquadronBrain()
+                    brain.planner_model = mock_llm
+                    
+                    result = brain.think("List files", agent_profile=None)
+                    
+                    assert result == {"action": "tool", "tool_name": "list_dir", "args": {"path": "."}}
+
+
+@pytest.mark.unit
+class TestBrainContextGathering:
+    """Tests for concurrent context gathering before the LLM call."""
+
+    def test_providers_run_concurrently(self):
+        """Pre-LLM latency is bounded by the slowest provider, not the sum."""
+        import time
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+            
+            def slow(value):
+                time.sleep(0.3)
+                return value
+            
+            start = time.monotonic()
+            context = brain._gather_context({
+                "memory": lambda: slow("memories"),
+                "plan": lambda: slow("plan"),
+                "mcp": lambda: slow(""),
+            })
+            elapsed = time.monotonic() - start
+            
+            assert context == {"memory": "memories", "plan": "plan", "mcp": ""}
+            assert elapsed < 0.8
+
+    def test_slow_provider_degrades_to_empty(self):
+        """A provider that misses its deadline is skipped instead of blocking the turn."""
+        import threading
+        import time
+        release = threading.Event()
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+            
+            with patch.dict('squadron.brain.CONTEXT_TIMEOUTS', {"memory": 0.1, "plan": 1.0}):
+                start = time.monotonic()
+                context = brain._gather_context({
+                    "memory": lambda: release.wait(5) and "late",
+                    "plan": lambda: "plan",
+                })
+                elapsed = time.monotonic() - start
+            release.set()
+            
+            assert context == {"memory": "", "plan": "plan"}
+            assert elapsed < 1.0
+
+
+@pytest.mark.unit
+class TestBrainAsync:
+    """Tests for the async athink()/aexecute() API."""
+
+    def test_athink_awaits_async_client(self, mock_env):
+        """Verify athink() uses the provider's agenerate() instead of blocking generate()."""
+        import asyncio
+        from unittest.mock import AsyncMock
+        mock_llm = Mock(spec=["generate", "agenerate"])
+        mock_llm.agenerate = AsyncMock(return_value=json.dumps({"action": "reply", "content": "Async hi"}))
+        
+        with patch('squadron.services.model_factory.ModelFactory.create', return_value=mock_llm):
+            with patch('squadron.memory.hippocampus.Hippocampus'):
+                with patch('squadron.clients.mcp_client.MCPBridge'):
+                    from squadron.brain import SquadronBrain
+                    brain = SquadronBrain()
+                    brain.planner_model = mock_llm
+                    
+                    result = asyncio.run(brain.athink("Hello", agent_profile=None))
+                    
+                    assert result == {"action": "reply", "content": "Async hi"}
+                    mock_llm.agenerate.assert_awaited_once()
+                    mock_llm.generate.assert_not_called()
+
+    def test_aexecute_runs_tools_off_the_event_loop(self):
+        """Verify sync tools run in a worker thread so the loop stays responsive."""
+        import asyncio
+        import threading
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            with patch('squadron.memory.hippocampus.Hippocampus'):
+                with patch('squadron.clients.mcp_client.MCPBridge'):
+                    from squadron.brain import SquadronBrain
+                    brain = SquadronBrain()
+                    brain.register_tool("where_am_i", "Reports its thread", lambda: threading.get_ident())
+                    
+                    async def run():
+                        result = await brain.aexecute({"action": "tool", "tool_name": "where_am_i", "args": {}})
+                        return result, threading.get_ident()
+                    
+                    result, loop_thread = asyncio.run(run())
+                    
+                    assert result["text"] != str(loop_thread)
+
 
 @pytest.mark.unit
 class TestBrainSafety:
@@ -225,3 +358,158 @@ class TestBrainExecute:
                     result = brain.execute(decision)
                     
                     assert "Echo: hello" in result["text"]
+
+
+@pytest.mark.unit
+class TestBrainParallelExecute:
+    """Tests for multi-tool decisions."""
+
+    def test_execute_many_runs_concurrently_in_order(self):
+        """Independent non-hazardous calls run in parallel and keep call order."""
+        import time
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            with patch('squadron.memory.hippocampus.Hippocampus'):
+                with patch('squadron.clients.mcp_client.MCPBridge'):
+                    from squadron.brain import SquadronBrain
+                    brain = SquadronBrain()
+                    
+                    def slow_echo(msg):
+                        time.sleep(0.2)
+                        return f"Echo: {msg}"
+                    
+                    brain.register_tool("slow_echo", "Echoes slowly", slow_echo, hazardous=False)
+                    
+                    decision = {
+                        "action": "tools",
+                        "calls": [
+                            {"tool_name": "slow_echo", "args": {"msg": "one"}},
+                            {"tool_name": "slow_echo", "args": {"msg": "two"}},
+                            {"tool_name": "slow_echo", "args": {"msg": "three"}},
+                        ]
+                    }
+                    start = time.monotonic()
+                    result = brain.execute(decision)
+                    elapsed = time.monotonic() - start
+                    
+                    assert elapsed < 0.5
+                    assert [r["text"] for r in result["results"]] == [
+                        "Tool Output: Echo: one",
+                        "Tool Output: Echo: two",
+                        "Tool Output: Echo: three",
+                    ]
+                    assert result["text"].index("one") < result["text"].index("three")
+
+    def test_execute_many_hazardous_is_barrier(self):
+        """Hazardous calls run after earlier calls finish and before later ones start."""
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            with patch('squadron.memory.hippocampus.Hippocampus'):
+                with patch('squadron.clients.mcp_client.MCPBridge'):
+                    from squadron.brain import SquadronBrain
+                    brain = SquadronBrain()
+                    brain.safety_mode = False
+                    
+                    state = {"value": "old"}
+                    brain.register_tool("read_state", "Reads", lambda: state["value"], hazardous=False)
+                    brain.register_tool("write_state", "Writes", lambda value: state.update(value=value), hazardous=True)
+                    
+                    result = brain.execute({
+                        "action": "tools",
+                        "calls": [
+                            {"tool_name": "read_state", "args": {}},
+                            {"tool_name": "write_state", "args": {"value": "new"}},
+                            {"tool_name": "read_state", "args": {}},
+                            {"tool_name": "missing_tool", "args": {}},
+                        ]
+                    })
+                    
+                    texts = [r["text"] for r in result["results"]]
+                    assert texts[0] == "Tool Output: old"
+                    assert texts[2] == "Tool Output: new"
+                    assert "not found" in texts[3]
+
+    def test_nested_batches_do_not_deadlock(self):
+        """Tools that run their own multi-tool decision on every pool worker still finish."""
+        import threading
+        import time
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import MAX_PARALLEL_TOOLS, SquadronBrain
+            brain = SquadronBrain()
+            
+            def leaf(n):
+                time.sleep(0.01)
+                return n
+            
+            workers = max(2, MAX_PARALLEL_TOOLS)
+            all_busy = threading.Barrier(workers, timeout=5)
+            
+            def delegate(n):
+                all_busy.wait()  # Every pool worker is now inside a delegate
+                inner = brain.execute({"action": "tools", "calls": [
+                    {"tool_name": "nested_leaf", "args": {"n": n}},
+                    {"tool_name": "nested_leaf", "args": {"n": n + 100}},
+                ]})
+                return inner["text"]
+            
+            brain.register_tool("nested_leaf", "Leaf", leaf)
+            brain.register_tool("nested_delegate", "Runs a nested decision", delegate)
+            
+            outcome = {}
+            decision = {"action": "tools", "calls": [
+                {"tool_name": "nested_delegate", "args": {"n": n}} for n in range(workers)
+            ]}
+            worker = threading.Thread(target=lambda: outcome.update(result=brain.execute(decision)), daemon=True)
+            worker.start()
+            worker.join(10)
+            
+            assert not worker.is_alive(), "nested tool batches deadlocked the tool pool"
+            assert "100" in outcome["result"]["results"][0]["text"]
+
+    def test_plan_write_then_read_keeps_order(self, temp_memory_dir, monkeypatch):
+        """A read_plan batched after update_plan always sees the update."""
+        monkeypatch.chdir(temp_memory_dir)
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+            assert all(brain.tools[name]["sequential"] for name in ("save_memory", "create_plan", "update_plan"))
+            
+            for i in range(20):
+                result = brain.execute({"action": "tools", "calls": [
+                    {"tool_name": "update_plan", "args": {"content": f"# Plan v{i}"}},
+                    {"tool_name": "read_plan", "args": {}},
+                ]})
+                assert f"# Plan v{i}" in result["results"][1]["text"]
+
+    def test_sequential_tools_are_barriers(self):
+        """Delegation and GUI input never overlap with other calls."""
+        import threading
+        import time
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+            assert brain.tools["assign_task"]["sequential"] and brain.tools["click_at"]["sequential"]
+            
+            running = []
+            overlaps = []
+            lock = threading.Lock()
+            
+            def track(name):
+                with lock:
+                    if running:
+                        overlaps.append((name, list(running)))
+                    running.append(name)
+                time.sleep(0.05)
+                with lock:
+                    running.remove(name)
+                return name
+            
+            brain.register_tool("seq_plain", "Plain", track)
+            brain.register_tool("seq_barrier", "Sequential", track, sequential=True)
+            
+            brain.execute({"action": "tools", "calls": [
+                {"tool_name": "seq_plain", "args": {"name": "a"}},
+                {"tool_name": "seq_plain", "args": {"name": "b"}},
+                {"tool_name": "seq_barrier", "args": {"name": "barrier"}},
+                {"tool_name": "seq_plain", "args": {"name": "c"}},
+            ]})
+            
+            assert all(name != "barrier" and "barrier" not in others for name, others in overlaps)
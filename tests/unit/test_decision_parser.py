@@ -0,0 +1,65 @@
+"""
+Unit Tests for Decision Parser
+==============================
+
+Tests parsing of the brain's JSON decision including:
+- Early completion while streaming
+- Local repair of common JSON defects
+- Plain reply fallback
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestStreamingDecisionParser:
+    """Tests for incremental decision detection."""
+
+    def test_decision_completes_before_trailing_text(self):
+        """The decision is returned on the chunk that closes the object."""
+        from squadron.services.decision_parser import StreamingDecisionParser
+        parser = StreamingDecisionParser()
+        chunks = ['```json\n{"action": "tool", "tool_name": "read_file", ', '"args": {"path": "a{b}.txt"}', '}\n```', '\nI will now read the file...']
+        
+        results = [parser.feed(chunk) for chunk in chunks[:2]]
+        decision = parser.feed(chunks[2])
+        
+        assert results == [None, None]
+        assert decision == {"action": "tool", "tool_name": "read_file", "args": {"path": "a{b}.txt"}}
+
+    def test_objects_without_action_are_skipped(self):
+        """Leading JSON that isn't a decision doesn't end the stream."""
+        from squadron.services.decision_parser import StreamingDecisionParser
+        parser = StreamingDecisionParser()
+        
+        assert parser.feed('Scratch: {"note": 1} then ') is None
+        assert parser.feed('{"action": "reply", "content": "ok"}') == {"action": "reply", "content": "ok"}
+
+
+@pytest.mark.unit
+class TestParseDecision:
+    """Tests for full-response parsing and repair."""
+
+    @pytest.mark.parametrize("raw", [
+        "{'action': 'tool', 'tool_name': 'list_dir', 'args': {'path': '.'},}",
+        '{action: "tool", tool_name: "list_dir", args: {"path": "."}}',
+        'Sure! {"action": "tool", "tool_name": "list_dir", "args": {"path": "."',
+        '{“action”: “tool”, “tool_name”: “list_dir”, “args”: {“path”: “.”}}',
+    ])
+    def test_common_defects_are_repaired(self, raw):
+        """Single/smart quotes, unquoted keys, trailing commas and truncation are fixed."""
+        from squadron.services.decision_parser import parse_decision
+        
+        assert parse_decision(raw) == {"action": "tool", "tool_name": "list_dir", "args": {"path": "."}}
+
+    def test_python_literals_are_repaired(self):
+        from squadron.services.decision_parser import parse_decision
+        
+        decision = parse_decision('{"action": "tools", "parallel": False, "calls": [], "note": None}')
+        
+        assert decision == {"action": "tools", "parallel": False, "calls": [], "note": None}
+
+    def test_plain_text_falls_back_to_reply(self):
+        from squadron.services.decision_parser import parse_decision
+        
+        assert parse_decision("I can't use {braces} properly") == {"action": "reply", "content": "I can't use {braces} properly"}
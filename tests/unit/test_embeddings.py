@@ -0,0 +1,68 @@
+"""
+Unit Tests for Embeddings
+=========================
+
+Tests the embedding cache including:
+- Hits for repeated texts, batched misses
+- Keys separated by model id
+- Byte-bounded LRU eviction and hit-rate stats
+"""
+
+import pytest
+
+
+class CountingEmbedder:
+    """HashingEmbedder that records what it was asked to embed."""
+
+    def __init__(self, model_id="counting"):
+        from squadron.services.embeddings import HashingEmbedder
+        self._inner = HashingEmbedder(dim=64)
+        self.model_id = model_id
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return self._inner.embed(texts)
+
+
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache."""
+
+    def test_repeated_texts_are_embedded_once(self):
+        from squadron.services.embeddings import EmbeddingCache
+        cache = EmbeddingCache(max_bytes=1024 * 1024)
+        embedder = CountingEmbedder()
+
+        first = cache.embed(embedder, ["deploy", "rollback", "deploy"])
+        second = cache.embed(embedder, ["rollback", "status"])
+
+        assert embedder.calls == [["deploy", "rollback"], ["status"]]
+        assert first[0] == first[2] and second[0] == first[1]
+        assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 4
+
+    def test_model_id_separates_entries(self):
+        from squadron.services.embeddings import EmbeddingCache
+        cache = EmbeddingCache(max_bytes=1024 * 1024)
+        a, b = CountingEmbedder("model-a"), CountingEmbedder("model-b")
+
+        cache.embed(a, ["same text"])
+        cache.embed(b, ["same text"])
+
+        assert len(a.calls) == 1 and len(b.calls) == 1
+
+    def test_evicts_least_recently_used_within_byte_budget(self):
+        from squadron.services.embeddings import EmbeddingCache
+        entry = 64 * 4 + 2 + EmbeddingCache.ENTRY_OVERHEAD
+        cache = EmbeddingCache(max_bytes=entry * 2)
+        embedder = CountingEmbedder()
+
+        cache.embed(embedder, ["t1", "t2"])
+        cache.embed(embedder, ["t1"])        # t1 is now most recent
+        cache.embed(embedder, ["t3"])        # Evicts t2
+        cache.embed(embedder, ["t1", "t2"])
+
+        assert embedder.calls[-1] == ["t2"]
+        stats = cache.get_stats()
+        assert stats["bytes"] <= stats["max_bytes"] and stats["entries"] == 2
+        assert stats["hit_rate"] == pytest.approx(2 / 6, abs=0.001)
@@ -7,6 +7,11 @@ Tests the agent memory functionality including:
 - Agent-specific namespaces
 - Memory types and filtering
 - JSON fallback mode
+- Batched writes
+- JSONL log replay, tombstones and compaction
+- BM25 keyword recall
+- Single-embedding concurrent ChromaDB recall
+- Query embeddings served from the shared cache
 """
 
 import pytest
@@ -218,6 +223,291 @@ class TestHippocampusJsonFallback:
             
             memory.remember("Persistent memory", agent="shared")
             
-            # Check JSON file exists
-            json_path = os.path.join(temp_memory_dir, "memories.json")
-            assert os.path.exists(json_path)
+            # Check the JSONL log exists
+            log_path = os.path.join(temp_memory_dir, "memories.jsonl")
+            assert os.path.exists(log_path)
+
+
+@pytest.mark.unit
+class TestHippocampusBatchWrites:
+    """Tests for remember_many and the bulk helpers."""
+
+    def test_remember_many_flushes_once(self, temp_memory_dir):
+        """A JSON-mode batch is written to disk once, not once per memory."""
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            
+            with patch.object(memory._log, "append") as save:
+                ids = memory.remember_many([
+                    {"text": f"Ticket {i} was fixed", "agent": "Marcus" if i % 2 else "Caleb"}
+                    for i in range(100)
+                ])
+            
+            assert save.call_count == 1
+            assert len(ids) == 100 and len(set(ids)) == 100
+            assert memory.get_agent_summary("Marcus")["memory_count"] == 50
+
+    def test_remember_many_adds_once_per_collection(self, temp_memory_dir):
+        """ChromaDB gets one add() per agent collection, with IDs in input order."""
+        from unittest.mock import MagicMock
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+        memory._chromadb_available = True
+        memory.client = MagicMock()
+        memory.client.get_max_batch_size.return_value = 1000
+        memory.collections = {name: MagicMock() for name in ["Marcus", "Caleb", "Sentinel", "shared"]}
+        
+        ids = memory.remember_tasks([
+            {"agent": "Marcus", "task": "A", "result": "done"},
+            {"agent": "Caleb", "task": "B", "result": "done"},
+            {"agent": "Marcus", "task": "C", "result": "done", "ticket_id": "PROJ-1"},
+            {"agent": "Nobody", "task": "D", "result": "done"},
+        ])
+        
+        marcus = memory.collections["Marcus"].add
+        assert marcus.call_count == 1
+        assert marcus.call_args.kwargs["ids"] == [ids[0], ids[2]]
+        assert marcus.call_args.kwargs["metadatas"][1]["ticket_id"] == "PROJ-1"
+        assert memory.collections["Caleb"].add.call_count == 1
+        assert memory.collections["shared"].add.call_args.kwargs["ids"] == [ids[3]]
+
+    def test_failed_add_returns_none_for_its_group(self, temp_memory_dir):
+        from unittest.mock import MagicMock
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+        memory._chromadb_available = True
+        memory.client = MagicMock()
+        memory.client.get_max_batch_size.return_value = 1000
+        memory.collections = {name: MagicMock() for name in ["Marcus", "Caleb", "Sentinel", "shared"]}
+        memory.collections["Caleb"].add.side_effect = ValueError("boom")
+        
+        ids = memory.remember_conversations([
+            {"agent": "Marcus", "user_message": "hi", "agent_response": "hello"},
+            {"agent": "Caleb", "user_message": "hi", "agent_response": "hey"},
+        ])
+        
+        assert ids[0] is not None and ids[1] is None
+
+
+@pytest.mark.unit
+class TestHippocampusMemoryLog:
+    """Tests for the append-only JSONL log behind the JSON fallback."""
+
+    def test_writes_append_and_reload(self, temp_memory_dir):
+        """Each write appends a line; a new instance replays adds and tombstones."""
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            keep = memory.remember("Keep this", agent="Marcus")
+            drop = memory.remember("Drop this", agent="Marcus")
+            memory.forget(drop, agent="Marcus")
+            
+            with open(os.path.join(temp_memory_dir, "memories.jsonl")) as f:
+                assert len(f.readlines()) == 3
+            
+            reloaded = Hippocampus(persist_dir=temp_memory_dir)
+            assert list(reloaded._memories["Marcus"]) == [keep]
+
+    def test_torn_last_line_is_dropped(self, temp_memory_dir):
+        """A crash mid-append loses only the partial line, and later writes still load."""
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            memory.remember("Survives the crash", agent="shared")
+            memory._log.close()
+            with open(os.path.join(temp_memory_dir, "memories.jsonl"), "a") as f:
+                f.write('{"op": "add", "agent": "shared", "id": "x", "te')
+            
+            recovered = Hippocampus(persist_dir=temp_memory_dir)
+            recovered.remember("Written after recovery", agent="shared")
+            
+            texts = [m["text"] for m in Hippocampus(persist_dir=temp_memory_dir)._memories["shared"].values()]
+            assert texts == ["Survives the crash", "Written after recovery"]
+
+    def test_legacy_json_is_migrated(self, temp_memory_dir):
+        import json
+        with open(os.path.join(temp_memory_dir, "memories.json"), "w") as f:
+            json.dump({"Caleb": [{"id": "old-1", "text": "Legacy memory", "metadata": {}}]}, f)
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            
+            assert memory._memories["Caleb"]["old-1"]["text"] == "Legacy memory"
+            assert os.path.exists(os.path.join(temp_memory_dir, "memories.jsonl"))
+            assert not os.path.exists(os.path.join(temp_memory_dir, "memories.json"))
+
+    def test_compaction_keeps_live_memories_and_new_appends(self, temp_memory_dir):
+        """Compaction drops dead lines without losing writes made while it runs."""
+        import time
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            memory._log.compact_min = 10
+            ids = memory.remember_many([{"text": f"note {i}"} for i in range(20)])
+            for mem_id in ids[:15]:
+                memory.forget(mem_id)
+            memory.remember("after compaction", agent="shared")
+            
+            deadline = time.monotonic() + 5
+            while memory._log._compacting and time.monotonic() < deadline:
+                time.sleep(0.01)
+            
+            assert memory._log.compactions >= 1
+            with open(os.path.join(temp_memory_dir, "memories.jsonl")) as f:
+                assert len(f.readlines()) == memory._log.lines < 36
+            reloaded = Hippocampus(persist_dir=temp_memory_dir)
+            assert len(reloaded._memories["shared"]) == 6
+
+
+@pytest.mark.unit
+class TestHippocampusKeywordRecall:
+    """Tests for BM25 ranking in JSON fallback recall."""
+
+    def test_results_are_ranked(self, temp_memory_dir):
+        """The memory matching more (and rarer) query terms ranks first."""
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            memory.remember("Deploy the frontend with npm run build", agent="shared")
+            memory.remember("Kubernetes deploy uses kubectl apply on the cluster", agent="shared")
+            memory.remember("Lunch is at noon", agent="shared")
+            
+            results = memory.recall("how do we deploy to kubernetes with kubectl", agent="shared")
+            
+            assert "kubectl" in results[0]["content"]
+            assert len(results) == 2  # Lunch shares no terms
+            assert results[0]["relevance"] > results[1]["relevance"]
+
+    def test_stopwords_alone_do_not_match(self, temp_memory_dir):
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            memory.remember("The build is green", agent="shared")
+            
+            assert memory.recall("what is the plan", agent="shared") == []
+
+    def test_filters_by_agent_and_type(self, temp_memory_dir):
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            memory.remember("Login bug fixed", agent="Marcus", memory_type="task")
+            memory.remember("Login bug discussed", agent="Marcus", memory_type="conversation")
+            memory.remember("Login bug reproduced", agent="Caleb", memory_type="task")
+            
+            results = memory.recall("login bug", agent="Marcus", memory_type="task", include_shared=False)
+            
+            assert [r["content"] for r in results] == ["Login bug fixed"]
+
+    def test_index_follows_forget_and_reload(self, temp_memory_dir):
+        with patch.dict('sys.modules', {'chromadb': None}):
+            from squadron.memory.hippocampus import Hippocampus
+            memory = Hippocampus(persist_dir=temp_memory_dir)
+            gone = memory.remember("Redis cache settings", agent="shared")
+            memory.remember("Redis cluster endpoints", agent="shared")
+            memory.forget(gone, agent="shared")
+            
+            reloaded = Hippocampus(persist_dir=temp_memory_dir)
+            
+            assert [r["content"] for r in reloaded.recall("redis", agent="shared")] == ["Redis cluster endpoints"]
+
+
+def _chroma_memory(temp_memory_dir, collections):
+    """Hippocampus in ChromaDB mode over mocked collections."""
+    from unittest.mock import MagicMock
+    import squadron.memory.hippocampus  # Keep the module imported outside patch.dict so patches hit it
+    with patch.dict('sys.modules', {'chromadb': None}):
+        from squadron.memory.hippocampus import Hippocampus
+        memory = Hippocampus(persist_dir=temp_memory_dir)
+    memory._chromadb_available = True
+    memory.client = MagicMock()
+    memory.collections = collections
+    return memory
+
+
+def _query_result(*hits):
+    return {
+        "documents": [[doc for doc, _ in hits]],
+        "metadatas": [[{"agent": doc} for doc, _ in hits]],
+        "distances": [[distance for _, distance in hits]],
+    }
+
+
+@pytest.mark.unit
+class TestHippocampusChromaRecall:
+    """Tests for ChromaDB recall across collections."""
+
+    def test_query_is_embedded_once_for_all_collections(self, temp_memory_dir):
+        from unittest.mock import MagicMock
+        collections = {name: MagicMock() for name in ["Marcus", "Caleb", "Sentinel", "shared"]}
+        collections["Marcus"].query.return_value = _query_result(("m1", 0.1), ("m2", 0.5))
+        collections["Caleb"].query.return_value = _query_result(("c1", 0.2))
+        collections["Sentinel"].query.return_value = _query_result()
+        collections["shared"].query.return_value = _query_result(("s1", 0.3), ("s2", 0.9))
+        memory = _chroma_memory(temp_memory_dir, collections)
+        embedder = MagicMock()
+        embedder.embed.return_value = [[0.5, 0.75]]
+        
+        with patch("squadron.memory.hippocampus.get_chroma_embedder", return_value=embedder):
+            results = memory.recall("deploy", n_results=3)
+        
+        assert embedder.embed.call_count == 1
+        for collection in collections.values():
+            assert collection.query.call_args.kwargs["query_embeddings"] == [[0.5, 0.75]]
+            assert "query_texts" not in collection.query.call_args.kwargs
+        assert [r["content"] for r in results] == ["m1", "c1", "s1"]
+
+    def test_collections_are_queried_concurrently(self, temp_memory_dir):
+        import time
+        from unittest.mock import MagicMock
+        
+        def slow_query(**kwargs):
+            time.sleep(0.2)
+            return _query_result(("hit", 0.1))
+        
+        collections = {name: MagicMock() for name in ["Marcus", "Caleb", "Sentinel", "shared"]}
+        for collection in collections.values():
+            collection.query.side_effect = slow_query
+        memory = _chroma_memory(temp_memory_dir, collections)
+        embedder = MagicMock()
+        embedder.embed.return_value = [[1.0]]
+        
+        with patch("squadron.memory.hippocampus.get_chroma_embedder", return_value=embedder):
+            start = time.monotonic()
+            memory.recall("anything")
+            elapsed = time.monotonic() - start
+        
+        assert elapsed < 0.6
+
+    def test_shared_agent_is_searched_once_and_embedding_failure_falls_back(self, temp_memory_dir):
+        from unittest.mock import MagicMock
+        collections = {name: MagicMock() for name in ["Marcus", "Caleb", "Sentinel", "shared"]}
+        collections["shared"].query.return_value = _query_result(("s1", 0.3))
+        memory = _chroma_memory(temp_memory_dir, collections)
+        
+        with patch("squadron.memory.hippocampus.get_chroma_embedder", side_effect=RuntimeError("offline")):
+            results = memory.recall("anything", agent="shared")
+        
+        assert collections["shared"].query.call_count == 1
+        assert collections["shared"].query.call_args.kwargs["query_texts"] == ["anything"]
+        assert [r["content"] for r in results] == ["s1"]
+
+    def test_repeated_query_hits_embedding_cache(self, temp_memory_dir):
+        """Recalling the same text again (across instances) doesn't re-embed it."""
+        from unittest.mock import MagicMock
+        collections = {name: MagicMock() for name in ["Marcus", "Caleb", "Sentinel", "shared"]}
+        for collection in collections.values():
+            collection.query.return_value = _query_result()
+        first = _chroma_memory(temp_memory_dir, collections)
+        second = _chroma_memory(temp_memory_dir, collections)
+        embedder = MagicMock(model_id="test-model-cache")
+        embedder.embed.return_value = [[1.0, 0.0]]
+        
+        with patch("squadron.memory.hippocampus.get_chroma_embedder", return_value=embedder):
+            first.recall("fix the login bug")
+            second.recall("fix the login bug")
+            first.recall("fix the login bug", agent="Marcus")
+        
+        assert embedder.embed.call_count == 1
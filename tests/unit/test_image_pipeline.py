@@ -0,0 +1,65 @@
+"""
+Unit Tests for Image Pipeline
+=============================
+
+Tests screenshot preprocessing including:
+- Downsampling to the configured max edge
+- Re-encoding to a compact format
+- Content-hash caching
+"""
+
+import io
+import os
+import pytest
+
+
+def _screenshot(width=2880, height=1800):
+    from PIL import Image
+    img = Image.new("RGBA", (width, height), (30, 60, 90, 255))
+    for x in range(0, width, 40):
+        for y in range(0, height, 40):
+            img.putpixel((x, y), (255, 255, 255, 255))
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.mark.unit
+class TestImagePipeline:
+    """Tests for ImagePipeline."""
+
+    def test_downsamples_and_reencodes(self):
+        """Large screenshots shrink to max_edge and get smaller on the wire."""
+        from PIL import Image
+        from squadron.services.image_pipeline import ImagePipeline
+        pipeline = ImagePipeline(max_edge=1024)
+        data = _screenshot()
+        
+        encoded = pipeline.process_bytes(data)
+        img = Image.open(io.BytesIO(encoded))
+        
+        assert max(img.size) == 1024
+        assert img.size == (1024, 640)  # Aspect ratio kept
+        assert img.format == "JPEG"
+        assert len(encoded) < len(data)
+
+    def test_same_content_is_processed_once(self, temp_memory_dir):
+        """Identical bytes (even under another filename) hit the cache."""
+        from unittest.mock import patch
+        from squadron.services.image_pipeline import ImagePipeline
+        pipeline = ImagePipeline(max_edge=512)
+        data = _screenshot(800, 600)
+        paths = []
+        for name in ("a.png", "b.png"):
+            path = os.path.join(temp_memory_dir, name)
+            with open(path, "wb") as f:
+                f.write(data)
+            paths.append(path)
+        
+        with patch.object(pipeline, "_encode", wraps=pipeline._encode) as encode:
+            first = pipeline.load(paths[0])
+            second = pipeline.load(paths[1])
+        
+        assert encode.call_count == 1
+        assert first.size == second.size == (512, 384)
+        assert pipeline.stats["hits"] == 1
@@ -0,0 +1,152 @@
+"""
+Unit Tests for the LLM Response Cache
+=====================================
+
+Tests the provider response cache including:
+- Exact and normalized-prompt hits (ids are never normalized)
+- Temperature gating and error bypass
+- SQLite persistence and TTL expiry
+"""
+
+import os
+import pytest
+from unittest.mock import Mock
+
+
+def _provider(response="Caleb"):
+    provider = Mock()
+    provider.model_name = "test-model"
+    provider.generate.return_value = response
+    return provider
+
+
+@pytest.mark.unit
+class TestCachedProvider:
+    """Tests for the caching provider wrapper."""
+
+    def test_exact_repeat_hits_cache(self, temp_memory_dir):
+        """A repeated low-temperature call should not reach the provider."""
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"))
+        provider = _provider()
+        cached = CachedProvider(provider, cache)
+        
+        first = cached.generate("Route: fix the login bug", max_tokens=10, temperature=0.1)
+        second = cached.generate("Route: fix the login bug", max_tokens=10, temperature=0.1)
+        
+        assert first == second == "Caleb"
+        assert provider.generate.call_count == 1
+        assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    def test_normalized_prompt_hits_cache(self, temp_memory_dir):
+        """Prompts differing only in whitespace, case and timestamps should share an entry."""
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"))
+        provider = _provider()
+        cached = CachedProvider(provider, cache)
+        
+        cached.generate("Memory (Time: 2025-12-20T10:00:00)\nRoute:  Fix login", max_tokens=10, temperature=0.1)
+        cached.generate("memory (Time: 2025-12-21T11:30:05) Route: fix login", max_tokens=10, temperature=0.1)
+        
+        assert provider.generate.call_count == 1
+
+    def test_prompts_with_different_ids_do_not_share_answers(self, temp_memory_dir):
+        """Ids are not normalized away: each ticket gets its own answer."""
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"))
+        provider = _provider()
+        cached = CachedProvider(provider, cache)
+        
+        cached.generate("Route ticket 3f2b8c1e-0d4a-4b7e-9c1a-2e5f6a7b8c9d", max_tokens=10, temperature=0.1)
+        cached.generate("Route ticket 9a8b7c6d-5e4f-4a3b-8c2d-1e0f9a8b7c6d", max_tokens=10, temperature=0.1)
+        
+        assert provider.generate.call_count == 2
+
+    def test_stats_events_stay_out_of_replay_history(self, temp_memory_dir):
+        """Per-lookup llm_cache events must not push real events out of the replay history."""
+        from squadron.services.event_bus import event_bus
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cached = CachedProvider(_provider(), ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3")))
+        
+        for _ in range(3):
+            cached.generate("Route: fix the login bug", max_tokens=10, temperature=0.1)
+        
+        assert not any(e["type"] == "llm_cache" for e in event_bus._history)
+
+    def test_high_temperature_bypasses_cache(self, temp_memory_dir):
+        """Creative calls must always reach the provider."""
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"))
+        provider = _provider()
+        cached = CachedProvider(provider, cache)
+        
+        cached.generate("Tell me a story", temperature=0.9)
+        cached.generate("Tell me a story", temperature=0.9)
+        
+        assert provider.generate.call_count == 2
+        assert cache.stats["misses"] == 0
+
+    def test_error_replies_not_cached(self, temp_memory_dir):
+        """Provider failures should be retried, not replayed from cache."""
+        from squadron.services.llm.base import error_reply
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"))
+        provider = _provider(error_reply("Gemini Error: 429"))
+        cached = CachedProvider(provider, cache)
+        
+        cached.generate("Route this", temperature=0.1)
+        cached.generate("Route this", temperature=0.1)
+        
+        assert provider.generate.call_count == 2
+
+    def test_stream_is_cached_once_complete(self, temp_memory_dir):
+        """A fully consumed stream is stored; the repeat is served as one chunk."""
+        from squadron.services.llm.cache import ResponseCache, CachedProvider
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"))
+        provider = _provider()
+        provider.supports_streaming = True
+        provider.generate_stream.side_effect = lambda *a, **kw: iter(["Ca", "leb"])
+        cached = CachedProvider(provider, cache)
+        
+        first = list(cached.generate_stream("Route this", max_tokens=10, temperature=0.1))
+        second = list(cached.generate_stream("Route this", max_tokens=10, temperature=0.1))
+        
+        assert first == ["Ca", "leb"]
+        assert second == ["Caleb"]
+        assert provider.generate_stream.call_count == 1
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Tests for the two-tier store."""
+
+    def test_disk_tier_survives_restart(self, temp_memory_dir):
+        """Entries should be served from SQLite by a fresh cache instance."""
+        from squadron.services.llm.cache import ResponseCache
+        path = os.path.join(temp_memory_dir, "cache.sqlite3")
+        ResponseCache(path=path).set("key", "value")
+        
+        fresh = ResponseCache(path=path)
+        
+        assert fresh.get("key") == "value"
+        assert fresh.stats["disk_hits"] == 1
+
+    def test_expired_entries_miss(self, temp_memory_dir):
+        """Entries older than the TTL should not be returned."""
+        from squadron.services.llm.cache import ResponseCache
+        cache = ResponseCache(path=os.path.join(temp_memory_dir, "cache.sqlite3"), ttl=-1)
+        cache.set("key", "value")
+        
+        assert cache.get("key") is None
+
+    def test_memory_tier_is_bounded(self):
+        """The LRU should evict the least recently used entry."""
+        from squadron.services.llm.cache import ResponseCache
+        cache = ResponseCache(path=None, max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
@@ -0,0 +1,163 @@
+"""
+Unit Tests for LLM Rate Limiting
+================================
+
+Tests the shared provider rate-limit layer including:
+- Retries on 429 honoring Retry-After (and Gemini's retryDelay)
+- No retries for non-transient errors
+- Request/token buckets and the bounded wait queue (backoffs included)
+- Provider integration: a 429 is retried instead of becoming a reply
+"""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def _limiter(**kwargs):
+    from squadron.services.llm.ratelimit import RateLimiter
+    return RateLimiter("test", **kwargs)
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Tests for RateLimiter retry and throttling."""
+
+    def test_retries_429_honoring_retry_after(self):
+        """A 429 is retried after the server's Retry-After, then succeeds."""
+        limiter = _limiter()
+        fn = MagicMock(side_effect=[FakeHTTPError(429, {"retry-after": "3"}), "ok"])
+
+        with patch("squadron.services.llm.ratelimit.time.sleep") as sleep:
+            assert limiter.call(fn) == "ok"
+
+        assert fn.call_count == 2
+        assert 3 in [c.args[0] for c in sleep.call_args_list]
+        assert limiter.get_stats()["retries"] == 1
+
+    def test_gemini_retry_delay_is_parsed(self):
+        from google.genai import errors
+        from squadron.services.llm.ratelimit import is_retryable, retry_after
+        error = errors.ClientError(429, {"error": {
+            "code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded",
+            "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"}]
+        }})
+
+        assert is_retryable(error)
+        assert retry_after(error) == 17.0
+
+    def test_client_errors_are_not_retried(self):
+        limiter = _limiter()
+        fn = MagicMock(side_effect=FakeHTTPError(400))
+
+        with patch("squadron.services.llm.ratelimit.time.sleep"), pytest.raises(FakeHTTPError):
+            limiter.call(fn)
+
+        assert fn.call_count == 1
+
+    def test_gives_up_after_max_retries(self):
+        limiter = _limiter(max_retries=2, backoff_base=0.01)
+        fn = MagicMock(side_effect=FakeHTTPError(503))
+
+        with patch("squadron.services.llm.ratelimit.time.sleep"), pytest.raises(FakeHTTPError):
+            limiter.call(fn)
+
+        assert fn.call_count == 3
+
+    def test_bucket_spaces_out_requests(self):
+        """Past a minute's burst, each request waits for its share of the rate."""
+        from squadron.services.llm.ratelimit import TokenBucket
+        bucket = TokenBucket(per_minute=60)
+
+        waits = [bucket.reserve(1) for _ in range(62)]
+
+        assert waits[:60] == [0.0] * 60
+        assert waits[60] == pytest.approx(1.0, abs=0.05)
+        assert waits[61] == pytest.approx(2.0, abs=0.05)
+
+    def test_queue_is_bounded(self):
+        from squadron.services.llm.ratelimit import RateLimitQueueFull
+        limiter = _limiter(max_queue=1)
+        limiter._waiting = 1  # Another caller is already waiting
+
+        with pytest.raises(RateLimitQueueFull):
+            limiter.call(lambda: "ok")
+
+    def test_backoff_counts_toward_queue(self):
+        """A caller sleeping on a retry backoff holds its queue slot."""
+        limiter = _limiter(max_queue=1, backoff_base=0.01)
+        fn = MagicMock(side_effect=[FakeHTTPError(503), "ok"])
+        waiting = []
+
+        with patch("squadron.services.llm.ratelimit.time.sleep",
+                   side_effect=lambda s: waiting.append(limiter.get_stats()["waiting"])):
+            assert limiter.call(fn) == "ok"
+
+        assert waiting and set(waiting) == {1}
+        assert limiter.get_stats()["waiting"] == 0
+
+    def test_conflict_is_not_retried(self):
+        """409 means the request itself conflicts; retrying can't help."""
+        from squadron.services.llm.ratelimit import is_retryable
+
+        assert not is_retryable(FakeHTTPError(409))
+
+    def test_stream_retries_only_before_first_chunk(self):
+        """A stream that fails on its first read is reopened; later failures propagate."""
+        limiter = _limiter(backoff_base=0.01)
+        opened = []
+
+        def open_stream():
+            opened.append(1)
+            if len(opened) == 1:
+                raise FakeHTTPError(429)
+            yield "a"
+            raise FakeHTTPError(503)
+
+        chunks = []
+        with patch("squadron.services.llm.ratelimit.time.sleep"), pytest.raises(FakeHTTPError):
+            for chunk in limiter.stream(open_stream):
+                chunks.append(chunk)
+
+        assert chunks == ["a"] and len(opened) == 2
+
+    def test_async_call_retries(self):
+        limiter = _limiter(backoff_base=0.01)
+        attempts = []
+
+        async def fn():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise FakeHTTPError(429, {"retry-after-ms": "10"})
+            return "ok"
+
+        assert asyncio.run(limiter.acall(fn)) == "ok"
+        assert len(attempts) == 3
+
+
+@pytest.mark.unit
+class TestProviderRateLimiting:
+    """Tests for providers going through their limiter."""
+
+    def test_gemini_429_is_retried_not_replied(self, mock_env):
+        from google.genai import errors
+        from squadron.services.llm.gemini import GeminiProvider
+        from squadron.services.llm.ratelimit import RateLimiter
+        provider = GeminiProvider("test-gemini-key", "gemini-2.0-flash")
+        provider.limiter = RateLimiter("gemini", backoff_base=0.01)
+        provider.client = MagicMock()
+        provider.client.models.generate_content.side_effect = [
+            errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "slow down"}}),
+            SimpleNamespace(text='{"action": "reply", "content": "hi"}')
+        ]
+
+        with patch("squadron.services.llm.ratelimit.time.sleep"):
+            assert provider.generate("hello") == '{"action": "reply", "content": "hi"}'
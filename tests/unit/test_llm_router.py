@@ -0,0 +1,199 @@
+"""
+Unit Tests for LLM Router
+=========================
+
+Tests hedged routing across providers including:
+- Hedge request after the primary's latency threshold, loser cancelled
+- Immediate failover on error replies
+- Preference reordering from latency and error stats
+- Streaming hedged on the first chunk
+- No hedging for providers that can't be cancelled
+- The requested provider always leads the router
+- One SDK async client per event loop
+"""
+
+import asyncio
+import time
+import pytest
+
+
+class FakeProvider:
+    """Async provider with a fixed delay and reply."""
+    supports_streaming = True
+
+    def __init__(self, name, delay=0.0, reply=None):
+        self.model_name = name
+        self.delay = delay
+        self.reply = reply if reply is not None else f"answer from {name}"
+        self.calls = 0
+        self.cancelled = 0
+
+    def generate(self, prompt, max_tokens=4096, temperature=0.7):
+        time.sleep(self.delay)
+        return self.reply
+
+    async def agenerate(self, prompt, max_tokens=4096, temperature=0.7):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.reply
+
+    async def agenerate_stream(self, prompt, max_tokens=4096, temperature=0.7):
+        reply = await self.agenerate(prompt, max_tokens, temperature)
+        for word in reply.split(" "):
+            yield word + " "
+
+
+def _router(**providers):
+    from squadron.services.llm.router import RoutingProvider
+    return RoutingProvider(providers, hedge_min_ms=50, hedge_default_ms=100, min_samples=3)
+
+
+@pytest.mark.unit
+class TestRoutingProvider:
+    """Tests for RoutingProvider hedging and failover."""
+
+    def test_fast_primary_is_not_hedged(self):
+        """A primary that answers in time is the only provider called."""
+        primary, secondary = FakeProvider("gemini"), FakeProvider("openrouter")
+        router = _router(gemini=primary, openrouter=secondary)
+
+        assert asyncio.run(router.agenerate("hi")) == "answer from gemini"
+        assert secondary.calls == 0
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        """Past the hedge delay the secondary is tried; its answer wins and the primary is cancelled."""
+        primary, secondary = FakeProvider("gemini", delay=2), FakeProvider("openrouter")
+        router = _router(gemini=primary, openrouter=secondary)
+
+        start = time.perf_counter()
+        response = asyncio.run(router.agenerate("hi"))
+
+        assert response == "answer from openrouter"
+        assert time.perf_counter() - start < 1
+        assert primary.cancelled == 1
+        assert router.get_stats()["providers"]["gemini"]["hedged"] == 1
+
+    def test_error_reply_fails_over_immediately(self):
+        """An error reply doesn't wait out the hedge delay."""
+        from squadron.services.llm.base import error_reply
+        primary = FakeProvider("gemini", reply=error_reply("Gemini Error: 503"))
+        secondary = FakeProvider("openrouter")
+        router = _router(gemini=primary, openrouter=secondary)
+        router.hedge_default_ms = 5000
+
+        start = time.perf_counter()
+        assert asyncio.run(router.agenerate("hi")) == "answer from openrouter"
+        assert time.perf_counter() - start < 1
+
+    def test_all_failing_returns_error_reply(self):
+        from squadron.services.llm.base import ErrorReply, error_reply
+        router = _router(gemini=FakeProvider("gemini", reply=error_reply("down")))
+
+        assert isinstance(asyncio.run(router.agenerate("hi")), ErrorReply)
+
+    def test_stats_reorder_preference(self):
+        """A provider that keeps failing drops behind a healthy one."""
+        from squadron.services.llm.base import error_reply
+        flaky = FakeProvider("gemini", reply=error_reply("down"))
+        healthy = FakeProvider("openrouter", delay=0.01)
+        router = _router(gemini=flaky, openrouter=healthy)
+
+        for _ in range(5):
+            asyncio.run(router.agenerate("hi"))
+
+        assert router.ranked() == ["openrouter", "gemini"]
+        calls = flaky.calls
+        asyncio.run(router.agenerate("hi"))
+        assert flaky.calls == calls
+
+    def test_blocking_providers_are_not_hedged(self):
+        """A provider without an async client can't be cancelled, so it is never raced."""
+        class BlockingProvider(FakeProvider):
+            agenerate = None
+            agenerate_stream = None
+
+        primary, secondary = BlockingProvider("gemini", delay=0.3), FakeProvider("openrouter")
+        router = _router(gemini=primary, openrouter=secondary)
+
+        assert asyncio.run(router.agenerate("hi")) == "answer from gemini"
+        assert secondary.calls == 0 and router.get_stats()["providers"]["gemini"]["hedged"] == 0
+
+    def test_sync_stream_hedges_on_first_chunk(self):
+        """generate_stream() races on time-to-first-chunk and streams the winner."""
+        primary, secondary = FakeProvider("gemini", delay=2), FakeProvider("openrouter")
+        router = _router(gemini=primary, openrouter=secondary)
+
+        assert "".join(router.generate_stream("hi")).strip() == "answer from openrouter"
+
+
+@pytest.mark.unit
+class TestRouterFactory:
+    """Tests for building the router from the environment."""
+
+    def test_factory_builds_router_from_env(self, mock_env, monkeypatch):
+        from unittest.mock import patch
+        from squadron.services.llm.router import RoutingProvider
+        from squadron.services.model_factory import ModelFactory
+        monkeypatch.setenv("SQUADRON_LLM_ROUTER", "gemini,openrouter,deepseek")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-openrouter-key")
+        ModelFactory.invalidate()
+
+        try:
+            with patch('squadron.services.llm.gemini.GeminiProvider'), \
+                 patch('squadron.services.llm.openrouter.OpenRouterProvider'):
+                model = ModelFactory.create("gemini-2.0-flash")
+        finally:
+            ModelFactory.invalidate()
+
+        router = getattr(model, "provider", model)
+        assert isinstance(router, RoutingProvider)
+        assert list(router.providers) == ["gemini", "openrouter"]  # No DeepSeek key
+
+    def test_requested_provider_leads_even_when_unlisted(self, mock_env, monkeypatch):
+        """Asking for a provider the router list omits still routes to it first."""
+        from squadron.services.model_factory import ModelFactory
+        monkeypatch.setenv("SQUADRON_LLM_ROUTER", "openrouter")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-openrouter-key")
+
+        members = ModelFactory._router_members("gemini-2.0-flash")
+
+        assert [(p, m) for p, m, _ in members] == [("gemini", "gemini-2.0-flash"), ("openrouter", "openai/gpt-4o")]
+
+    def test_router_only_keys_never_route_to_mock(self, monkeypatch):
+        """With only keys _resolve doesn't know about, the listed providers are the members."""
+        from squadron.services.model_factory import ModelFactory
+        for key in ("GEMINI_API_KEY", "OPENROUTER_API_KEY"):
+            monkeypatch.delenv(key, raising=False)
+        monkeypatch.setattr("squadron.services.model_factory._load_env", lambda: None)
+        monkeypatch.setenv("SQUADRON_LLM_ROUTER", "openai,deepseek")
+        monkeypatch.setenv("OPENAI_API_KEY", "test-openai-key")
+        monkeypatch.setenv("DEEPSEEK_API_KEY", "test-deepseek-key")
+
+        members = ModelFactory._router_members("auto")
+
+        assert [p for p, _, _ in members] == ["openai", "deepseek"]
+
+
+@pytest.mark.unit
+class TestPerLoopClients:
+    """Tests for providers shared between the server loop and the runtime loop."""
+
+    def test_each_loop_gets_its_own_async_client(self):
+        """The runtime loop (sync router calls) never reuses the server loop's client."""
+        from squadron.services.llm.openai import OpenAIProvider
+        from squadron.services.runtime import run_sync
+        provider = OpenAIProvider(api_key="test-openai-key")
+
+        async def clients():
+            return provider.async_client, provider.async_client
+
+        here = asyncio.run(clients())
+        runtime = run_sync(clients())
+
+        assert here[0] is here[1] and runtime[0] is runtime[1]
+        assert here[0] is not runtime[0]
+
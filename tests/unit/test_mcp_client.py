@@ -0,0 +1,124 @@
+"""
+Unit Tests for MCP Bridge
+=========================
+
+Tests the persistent MCP session pool including:
+- One long-lived session per server shared by concurrent calls
+- Restart of a server that exited between calls
+- Idle shutdown
+- Concurrent discovery with a per-server timeout
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+CONFIG = {"command": "python"}
+TOOLS = [{"tool_name": "files_read", "original_name": "read", "description": "Reads a file.", "inputSchema": {}}]
+
+
+class FakeSession:
+    """Stands in for ServerSession without spawning a process."""
+    started = []
+    startup = {}  # Server name -> seconds to start
+
+    def __init__(self, name, config):
+        self.name = name
+        self.alive = False
+        self.last_used = 0.0
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        FakeSession.started.append(self)
+
+    async def start(self, timeout):
+        await asyncio.sleep(self.startup.get(self.name, 0))
+        self.alive = True
+
+    async def list_tools(self):
+        from types import SimpleNamespace
+        tool = SimpleNamespace(name="read", description="Reads a file.", input_schema={})
+        return SimpleNamespace(tools=[tool])
+
+    async def call_tool(self, tool_name, arguments):
+        import anyio
+        if not self.alive:
+            raise anyio.ClosedResourceError()
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return f"{tool_name}:{arguments['path']}"
+
+    async def ping(self, timeout):
+        return self.alive
+
+    async def close(self):
+        self.alive = False
+
+
+@pytest.fixture
+def bridge():
+    from squadron.clients.mcp_client import MCPBridge
+    FakeSession.started = []
+    FakeSession.startup = {}
+    bridge = MCPBridge(health_interval=0.05, idle_timeout=60)
+    bridge.register_server_tools("files", CONFIG, TOOLS)
+    with patch("squadron.clients.mcp_client.ServerSession", FakeSession), \
+         patch("squadron.clients.mcp_client.shutil.which", return_value="/usr/bin/python"):
+        yield bridge
+    bridge.shutdown()
+
+
+@pytest.mark.unit
+class TestMCPBridge:
+    """Tests for MCPBridge session reuse."""
+
+    def test_concurrent_calls_share_one_session(self, bridge):
+        """Calls from many threads reuse one session and overlap on it."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda i: bridge.call_tool_sync("files_read", {"path": str(i)}), range(4)))
+
+        assert results == [f"read:{i}" for i in range(4)]
+        assert len(FakeSession.started) == 1
+        assert FakeSession.started[0].max_in_flight > 1
+
+    def test_dead_session_is_restarted(self, bridge):
+        """A server that exited between calls is respawned and the call retried."""
+        bridge.call_tool_sync("files_read", {"path": "a"})
+        FakeSession.started[0].alive = False
+
+        assert bridge.call_tool_sync("files_read", {"path": "b"}) == "read:b"
+        assert len(FakeSession.started) == 2
+
+    def test_idle_session_is_closed(self, bridge):
+        """The janitor closes sessions unused for longer than idle_timeout."""
+        import time
+        bridge.call_tool_sync("files_read", {"path": "a"})
+        bridge.idle_timeout = 0.01
+
+        deadline = time.time() + 2
+        while bridge.sessions and time.time() < deadline:
+            time.sleep(0.02)
+
+        assert bridge.sessions == {}
+        assert not FakeSession.started[0].alive
+
+    def test_discovery_runs_servers_concurrently(self, bridge):
+        """Servers start in parallel; one slower than the timeout fails on its own."""
+        import time
+        FakeSession.startup = {"a": 0.3, "b": 0.3, "stuck": 5}
+        servers = {name: CONFIG for name in FakeSession.startup}
+
+        start = time.time()
+        futures = bridge.discover(servers, timeout=1)
+        assert len(futures["a"].result(2)) == 1
+        assert len(futures["b"].result(2)) == 1
+        assert time.time() - start < 0.6
+
+        with pytest.raises(TimeoutError):
+            futures["stuck"].result(3)
+        assert "a_read" in bridge.tools_registry and "stuck" not in bridge.sessions
@@ -0,0 +1,161 @@
+"""
+Unit Tests for MCP Manager
+==========================
+
+Tests MCP discovery caching including:
+- Tool lists reused from the on-disk cache (keyed by config hash)
+- Failure backoff instead of retrying on every think()
+- Background warm-up
+- Concurrent discovery with partial registration
+- Discovery timed as the mcp_init phase
+"""
+
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+
+SERVERS_YAML = """
+servers:
+  files:
+    command: "npx"
+    args: ["-y", "server-filesystem", "/tmp"]
+  broken:
+    command: "does-not-exist"
+"""
+
+TOOLS = [{"tool_name": "files_read", "original_name": "read", "description": "Reads a file.", "inputSchema": {}}]
+
+
+def _manager(tmpdir, **kwargs):
+    from squadron.services.mcp_manager import MCPManager, MCPToolCache
+    from squadron.services.tool_registry import ToolRegistry
+    config_path = os.path.join(tmpdir, "mcp_servers.yaml")
+    with open(config_path, "w") as f:
+        f.write(SERVERS_YAML)
+    manager = MCPManager(
+        ToolRegistry(),
+        config_path=config_path,
+        tool_cache=MCPToolCache(os.path.join(tmpdir, "mcp_tools.json")),
+        **kwargs
+    )
+    manager._bridge = Mock()
+    return manager
+
+
+def _discover(name, config):
+    if name == "broken":
+        raise FileNotFoundError("Command not found: does-not-exist")
+    return list(TOOLS)
+
+
+def _futures(discover, calls=None):
+    """Wraps a per-server discover function into MCPManager._discover's {future: name} form."""
+    from concurrent.futures import Future
+
+    def discover_all(servers):
+        futures = {}
+        for name, config in servers.items():
+            if calls is not None:
+                calls.append(name)
+            future = Future()
+            try:
+                future.set_result(discover(name, config))
+            except Exception as e:
+                future.set_exception(e)
+            futures[future] = name
+        return futures
+    return discover_all
+
+
+@pytest.mark.unit
+class TestMCPManager:
+    """Tests for MCPManager discovery and caching."""
+
+    def test_failed_server_backs_off(self, temp_memory_dir):
+        """A failing server is not retried until its backoff window passes."""
+        manager = _manager(temp_memory_dir, retry_base=60)
+        
+        calls = []
+        with patch.object(manager, "_discover", side_effect=_futures(_discover, calls)):
+            manager.load()
+            manager.load()
+        
+        assert sorted(calls) == ["broken", "files"]  # Once each
+        assert "files_read" in manager.registry
+        assert manager.ready and manager.registry.is_loaded("mcp")
+        assert manager.get_status()["backing_off"]["broken"]["attempts"] == 1
+        
+        # Once the window has passed the server is due again
+        assert manager.pending(now=manager._failures["broken"][0] + 1) == ["broken"]
+
+    def test_restart_reuses_cached_tool_lists(self, temp_memory_dir):
+        """A new process with the same config registers tools without spawning the server."""
+        first = _manager(temp_memory_dir)
+        with patch.object(first, "_discover", side_effect=_futures(_discover)):
+            first.load()
+        
+        second = _manager(temp_memory_dir)
+        calls = []
+        with patch.object(second, "_discover", side_effect=_futures(_discover, calls)):
+            second.load()
+        
+        assert calls == ["broken"]
+        assert "files_read" in second.registry
+        second.bridge.register_server_tools.assert_called_once()
+
+    def test_config_change_invalidates_cache(self, temp_memory_dir):
+        from squadron.services.mcp_manager import config_hash
+        
+        assert config_hash("files", {"command": "npx", "args": ["/tmp"]}) != config_hash("files", {"command": "npx", "args": ["/home"]})
+
+    def test_warm_up_runs_in_background(self, temp_memory_dir):
+        """warm_up() returns immediately; discovery happens on a daemon thread."""
+        import threading
+        manager = _manager(temp_memory_dir)
+        release = threading.Event()
+        
+        def slow(name, config):
+            release.wait(5)
+            return _discover(name, config)
+        
+        with patch.object(manager, "_discover", side_effect=_futures(slow)):
+            thread = manager.warm_up()
+            assert thread.is_alive() and not manager.ready
+            assert manager.warm_up() is thread  # No second warm-up while one is running
+            release.set()
+            thread.join(5)
+        
+        assert "files_read" in manager.registry
+
+    def test_load_is_timed_as_mcp_init(self, temp_memory_dir):
+        """Background discovery shows up under the mcp_init phase of /metrics/timing."""
+        from squadron.services.timing import timing_recorder
+        manager = _manager(temp_memory_dir)
+        before = timing_recorder.get_stats(phase="mcp_init").get("mcp_init", {}).get("count", 0)
+        
+        with patch.object(manager, "_discover", side_effect=_futures(_discover)):
+            manager.load()
+        
+        assert timing_recorder.get_stats(phase="mcp_init")["mcp_init"]["count"] == before + 1
+
+    def test_fast_servers_register_before_slow_ones(self, temp_memory_dir):
+        """Tools from a server that answers first are usable while others are still starting."""
+        import threading
+        from concurrent.futures import Future
+        manager = _manager(temp_memory_dir)
+        slow = Future()
+        fast = Future()
+        fast.set_result(list(TOOLS))
+        
+        with patch.object(manager, "_discover", return_value={slow: "broken", fast: "files"}):
+            thread = threading.Thread(target=manager.load)
+            thread.start()
+            thread.join(0.5)
+            assert thread.is_alive()
+            assert "files_read" in manager.registry and not manager.ready
+            slow.set_exception(TimeoutError("MCP server 'broken' did not list its tools within 30s"))
+            thread.join(5)
+        
+        assert manager.ready
+        assert manager.get_status()["backing_off"]["broken"]["attempts"] == 1
@@ -69,3 +69,64 @@ class TestModelGeneration:
             if hasattr(model, 'generate'):
                 result = model.generate("Hello")
                 assert isinstance(result, str)
+
+
+@pytest.mark.unit
+class TestProviderPool:
+    """Tests for provider pooling in ModelFactory."""
+
+    @pytest.fixture(autouse=True)
+    def empty_pool(self):
+        from squadron.services.model_factory import ModelFactory
+        ModelFactory.invalidate()
+        yield
+        ModelFactory.invalidate()
+
+    def test_create_reuses_pooled_provider(self, mock_env):
+        """Repeated creates for the same model share one client."""
+        from squadron.services.model_factory import ModelFactory
+
+        with patch('squadron.services.llm.gemini.GeminiProvider') as provider_cls:
+            first = ModelFactory.create("gemini-2.0-flash")
+            second = ModelFactory.create("gemini-2.0-flash")
+            other = ModelFactory.create("gemini-3-pro")
+
+        assert first is second and first is not other
+        assert provider_cls.call_count == 2
+
+    def test_new_api_key_gets_new_provider(self, mock_env, monkeypatch):
+        """The pool key includes a key fingerprint, so a rotated key builds a new client."""
+        from squadron.services.model_factory import ModelFactory
+
+        with patch('squadron.services.llm.gemini.GeminiProvider'):
+            first = ModelFactory.create("gemini-2.0-flash")
+            monkeypatch.setenv("GEMINI_API_KEY", "rotated-key")
+            second = ModelFactory.create("gemini-2.0-flash")
+
+        assert first is not second
+        assert all("rotated-key" not in str(key) for key in ModelFactory.pooled())
+
+    def test_invalidate_drops_matching_providers(self, mock_env):
+        """invalidate() forces the next create() to build a fresh provider."""
+        from squadron.services.model_factory import ModelFactory
+
+        with patch('squadron.services.llm.gemini.GeminiProvider'):
+            first = ModelFactory.create("gemini-2.0-flash")
+            ModelFactory.create("gemini-3-pro")
+            assert ModelFactory.invalidate(model="gemini-2.0-flash") == 1
+            second = ModelFactory.create("gemini-2.0-flash")
+
+        assert first is not second
+        assert len(ModelFactory.pooled()) == 2
+
+    def test_dotenv_loaded_once(self, mock_env):
+        """.env is read on the first create, not on every call."""
+        from squadron.services.model_factory import ModelFactory
+        ModelFactory.invalidate(reload_env=True)
+
+        with patch('dotenv.load_dotenv') as load_dotenv, \
+             patch('squadron.services.llm.gemini.GeminiProvider'):
+            for _ in range(3):
+                ModelFactory.create("gemini-2.0-flash")
+
+        assert load_dotenv.call_count == 1
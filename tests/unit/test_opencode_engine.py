@@ -0,0 +1,116 @@
+"""
+Unit Tests for OpenCode Engine
+==============================
+
+Tests the per-agent session pool including:
+- Separate sessions per agent and mission
+- System prompt sent once per session
+- Idle expiry and the session cap
+- One session per key under concurrent first calls
+- Evicted and expired sessions closed on the server
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+
+def _engine():
+    from squadron.engines.opencode_engine import OpenCodeEngine
+    engine = OpenCodeEngine()
+    engine.client = AsyncMock()
+    counter = iter(range(1000))
+    engine.client.create_session.side_effect = lambda: {"id": f"s{next(counter)}"}
+    engine.client.send_message.return_value = {"content": "ok"}
+    return engine
+
+
+def _sent(engine):
+    return [(c.kwargs["session_id"], c.kwargs["message"]) for c in engine.client.send_message.call_args_list]
+
+
+@pytest.mark.unit
+class TestOpenCodeSessionPool:
+    """Tests for OpenCodeEngine session reuse."""
+
+    def test_agents_get_separate_sessions(self):
+        """Marcus and Caleb no longer share one conversation."""
+        engine = _engine()
+
+        asyncio.run(engine.think("plan it", "Marcus"))
+        asyncio.run(engine.think("build it", "Caleb"))
+        asyncio.run(engine.think("review it", "Marcus"))
+        asyncio.run(engine.think("ship it", "Marcus", mission_id="m1"))
+
+        assert [session for session, _ in _sent(engine)] == ["s0", "s1", "s0", "s2"]
+
+    def test_system_prompt_sent_once_per_session(self):
+        """Only the first message of a session carries the agent's system prompt."""
+        engine = _engine()
+        prompt = engine.agent_profiles["Caleb"].system_prompt
+
+        asyncio.run(engine.think("first", "Caleb"))
+        asyncio.run(engine.think("second", "Caleb"))
+
+        first, second = [message for _, message in _sent(engine)]
+        assert prompt in first
+        assert second == "Task: second"
+
+    def test_expired_and_excess_sessions_are_dropped(self):
+        """Idle sessions expire after the TTL; the least recently used is evicted at the cap."""
+        import time
+        from squadron.engines.opencode_engine import PooledSession, SessionPool
+        pool = SessionPool(ttl=60, max_sessions=2)
+
+        pool.put(PooledSession("a", "Marcus"))
+        pool.put(PooledSession("b", "Caleb"))
+        assert pool.get("Marcus").session_id == "a"  # Marcus is now most recent
+        evicted = pool.put(PooledSession("c", "Caleb", mission="m1"))
+
+        assert [s.session_id for s in evicted] == ["b"]
+        pool.get("Marcus").last_used = time.time() - 61
+        assert pool.get("Marcus") is None and len(pool) == 1
+
+    def test_failed_send_discards_session(self):
+        """A session that errors is replaced on the next call."""
+        engine = _engine()
+        engine.client.send_message.side_effect = [RuntimeError("session not found"), {"content": "ok"}]
+
+        assert asyncio.run(engine.think("first", "Caleb"))["action"] == "error"
+        assert asyncio.run(engine.think("retry", "Caleb"))["content"] == "ok"
+
+        assert [session for session, _ in _sent(engine)] == ["s0", "s1"]
+
+    def test_concurrent_first_calls_share_one_session(self):
+        """Parallel first calls for one agent don't each create (and leak) a session."""
+        engine = _engine()
+        created = engine.client.create_session.side_effect
+
+        async def slow_create():
+            await asyncio.sleep(0.05)
+            return created()
+
+        engine.client.create_session.side_effect = slow_create
+
+        async def burst():
+            return await asyncio.gather(*(engine.acquire_session("Caleb") for _ in range(5)))
+
+        sessions = asyncio.run(burst())
+
+        assert engine.client.create_session.call_count == 1
+        assert {s.session_id for s in sessions} == {"s0"}
+
+    def test_evicted_and_expired_sessions_are_closed(self):
+        """Sessions dropped from the pool are deleted on the server."""
+        from squadron.engines.opencode_engine import SessionPool
+        engine = _engine()
+        engine.sessions = SessionPool(ttl=60, max_sessions=1)
+
+        asyncio.run(engine.think("plan it", "Marcus"))
+        asyncio.run(engine.think("build it", "Caleb"))        # Evicts Marcus's s0
+        engine.sessions.get("Caleb").last_used -= 61          # Caleb's s1 goes idle
+        asyncio.run(engine.think("build more", "Caleb"))
+
+        closed = [c.kwargs["session_id"] for c in engine.client.delete_session.call_args_list]
+        assert closed == ["s0", "s1"]
+
@@ -0,0 +1,81 @@
+"""
+Unit Tests for Prompt Builder
+=============================
+
+Tests the cached think() prompt assembly including:
+- Static prefix reuse per profile, tool-set version and prefix tool names
+- Invalidation when the tool registry changes
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestPromptAssembler:
+    """Tests for PromptAssembler caching."""
+
+    def test_prefix_is_reused_for_same_version(self):
+        """Same profile + tool version should hit the cache and keep the prefix identical."""
+        from squadron.services.prompt_builder import PromptAssembler
+        assembler = PromptAssembler()
+        tools = {"read_file": {"description": "read_file(path: str): Reads a file."}}
+        
+        first = assembler.build("hello", tools, 1, system_prompt="You are Caleb.")
+        second = assembler.build("bye", tools, 1, system_prompt="You are Caleb.", memory_context="- a memory")
+        
+        assert first.prefix == second.prefix
+        assert first.prefix_key == second.prefix_key
+        assert assembler.misses == 1 and assembler.hits == 1
+        assert "read_file" in first.prefix
+        assert second.text.endswith("USER: bye\nRESPONSE (JSON):")
+        assert "- a memory" in second.suffix
+
+    def test_new_version_rebuilds_prefix(self):
+        """Bumping the tool-set version should pick up re-registered tools."""
+        from squadron.services.prompt_builder import PromptAssembler
+        assembler = PromptAssembler()
+        tools = {"read_file": {"description": "Reads a file."}}
+        
+        before = assembler.build("hi", tools, 1)
+        tools["read_file"] = {"description": "Reads a file, now with line ranges."}
+        stale = assembler.build("hi", tools, 1)
+        fresh = assembler.build("hi", tools, 2)
+        
+        assert "line ranges" not in stale.prefix
+        assert "line ranges" in fresh.prefix
+        assert before.prefix_key != fresh.prefix_key
+
+    def test_different_tool_sets_get_their_own_prefix(self):
+        """The same version listed in full or as a subset never shares a cached prefix."""
+        from squadron.services.prompt_builder import PromptAssembler
+        assembler = PromptAssembler()
+        tools = {"read_file": {"description": "Reads a file."}, "jira_comment": {"description": "Comments."}}
+        
+        full = assembler.build("hi", tools, 1)
+        core = assembler.build("hi", {"read_file": tools["read_file"]}, 1)
+        
+        assert "jira_comment" in full.prefix and "jira_comment" not in core.prefix
+
+    def test_brain_register_tool_bumps_version(self):
+        """Registering a tool on the brain should invalidate its cached prefix."""
+        from unittest.mock import patch
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+            version = brain._tools_version
+            
+            brain.register_tool("echo", "echo(msg: str): Echoes.", lambda msg: msg)
+            
+            assert brain._tools_version == version + 1
+
+    def test_extra_tools_go_in_suffix(self):
+        """Per-call selected tools must not change the cached prefix."""
+        from squadron.services.prompt_builder import PromptAssembler
+        assembler = PromptAssembler()
+        tools = {"read_file": {"description": "Reads a file."}}
+        
+        plain = assembler.build("hi", tools, 1)
+        selected = assembler.build("hi", tools, 1, extra_tools={"jira_comment": {"description": "Comments on Jira."}})
+        
+        assert plain.prefix == selected.prefix
+        assert "- jira_comment: Comments on Jira." in selected.suffix
@@ -0,0 +1,82 @@
+"""
+Unit Tests for Async Runtime
+============================
+
+Tests the shared background event loop including:
+- Running coroutines from plain threads and from inside a running loop
+- Reuse of a single loop thread
+- Deadlock guard and clean shutdown
+"""
+
+import asyncio
+import pytest
+
+
+@pytest.mark.unit
+class TestAsyncRuntime:
+    """Tests for AsyncRuntime."""
+
+    def test_run_sync_from_threads_uses_one_loop(self):
+        """Every caller runs on the same long-lived loop."""
+        from concurrent.futures import ThreadPoolExecutor
+        from squadron.services.runtime import AsyncRuntime
+        runtime = AsyncRuntime()
+
+        async def loop_id():
+            await asyncio.sleep(0)
+            return id(asyncio.get_running_loop())
+
+        try:
+            with ThreadPoolExecutor(4) as pool:
+                ids = set(pool.map(lambda _: runtime.run_sync(loop_id()), range(8)))
+            assert ids == {id(runtime.loop)}
+        finally:
+            runtime.stop()
+
+    def test_run_sync_inside_running_loop(self):
+        """Sync code called from async code no longer needs its own loop."""
+        from squadron.services.runtime import AsyncRuntime
+        runtime = AsyncRuntime()
+
+        async def double(x):
+            return x * 2
+
+        async def caller():
+            return runtime.run_sync(double(21))
+
+        try:
+            assert asyncio.run(caller()) == 42
+        finally:
+            runtime.stop()
+
+    def test_run_sync_on_runtime_loop_raises(self):
+        """Blocking on the runtime from its own loop would deadlock, so it refuses."""
+        from squadron.services.runtime import AsyncRuntime
+        runtime = AsyncRuntime()
+
+        async def nested():
+            return runtime.run_sync(asyncio.sleep(0))
+
+        try:
+            with pytest.raises(RuntimeError):
+                runtime.submit(nested()).result(2)
+        finally:
+            runtime.stop()
+
+    def test_stop_cancels_pending_tasks(self):
+        """stop() lets long-running tasks clean up before the thread exits."""
+        from squadron.services.runtime import AsyncRuntime
+        runtime = AsyncRuntime()
+        cleaned = []
+
+        async def forever():
+            try:
+                await asyncio.sleep(3600)
+            finally:
+                cleaned.append(True)
+
+        future = runtime.submit(forever())
+        runtime.run_sync(asyncio.sleep(0.01))
+        runtime.stop()
+
+        assert cleaned == [True] and future.cancelled()
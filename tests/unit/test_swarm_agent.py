@@ -0,0 +1,71 @@
+"""
+Unit Tests for Swarm Agents
+===========================
+
+Tests AgentNode task processing including:
+- Concurrent async worktree tasks never share the process cwd
+- The cwd is restored when a worktree task fails
+"""
+
+import asyncio
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+def _agent(name="Caleb"):
+    with patch('squadron.services.model_factory.ModelFactory.create'):
+        from squadron.swarm.agent import AgentNode
+        return AgentNode(name, "Dev", "You are a developer.")
+
+
+@pytest.mark.unit
+class TestAgentWorktrees:
+    """Tests for worktree isolation in AgentNode."""
+
+    def test_async_worktree_tasks_do_not_interleave(self, temp_memory_dir):
+        """Each task thinks and acts inside its own worktree, even on a shared loop."""
+        worktrees = {}
+        for task_id in ("t1", "t2"):
+            worktrees[task_id] = os.path.realpath(os.path.join(temp_memory_dir, task_id))
+            os.makedirs(worktrees[task_id])
+        seen = {}
+
+        def make_agent(task_id):
+            agent = _agent()
+
+            async def athink(task, profile):
+                await asyncio.sleep(0.05)  # Lets the other task run
+                seen.setdefault(task_id, []).append(os.getcwd())
+                return {"action": "reply", "content": "done"}
+
+            async def aexecute(decision):
+                seen[task_id].append(os.getcwd())
+                return {"text": "done", "files": []}
+
+            agent.brain = SimpleNamespace(athink=athink, aexecute=aexecute)
+            return agent
+
+        async def run_both():
+            return await asyncio.gather(*(
+                make_agent(task_id).aprocess_task("work", {"task_id": task_id}) for task_id in worktrees
+            ))
+
+        cwd = os.getcwd()
+        with patch('squadron.swarm.agent.get_worktree_path', side_effect=lambda task_id: worktrees[task_id]):
+            asyncio.run(run_both())
+
+        assert seen == {task_id: [path, path] for task_id, path in worktrees.items()}
+        assert os.getcwd() == cwd
+
+    def test_failed_worktree_task_restores_cwd(self, temp_memory_dir):
+        agent = _agent()
+        agent.brain = SimpleNamespace(think=lambda task, profile: (_ for _ in ()).throw(RuntimeError("boom")))
+        cwd = os.getcwd()
+
+        with patch('squadron.swarm.agent.get_worktree_path', return_value=temp_memory_dir), \
+                pytest.raises(RuntimeError):
+            agent.process_task("work", {"task_id": "t1"})
+
+        assert os.getcwd() == cwd
@@ -0,0 +1,152 @@
+"""
+Unit Tests for Token Accounting
+===============================
+
+Tests token estimates, prompt budgets and the usage ledger including:
+- Per-provider estimates for text, message lists and images
+- Trimming order: oldest memories, then plan detail, then tool descriptions
+- The brain keeping its prompt within SQUADRON_PROMPT_TOKEN_BUDGET
+- Per-agent/mission token totals
+"""
+
+import pytest
+from unittest.mock import patch
+
+
+@pytest.mark.unit
+class TestTokenEstimator:
+    """Tests for TokenEstimator."""
+
+    def test_counts_text_parts_and_images(self):
+        from squadron.services.tokens import TokenEstimator
+        estimator = TokenEstimator("gemini")
+        estimator._encoding = None
+
+        assert estimator.count("x" * 400) == 100
+        assert estimator.count([{"role": "user", "content": "x" * 40}]) == 10
+        assert estimator.count(["x" * 40, object()]) == 10 + estimator.image_tokens
+
+    def test_provider_of_unwraps_cache(self):
+        from types import SimpleNamespace
+        from squadron.services.tokens import provider_of
+
+        class DeepSeekProvider:
+            pass
+
+        assert provider_of(SimpleNamespace(provider=DeepSeekProvider())) == "deepseek"
+        assert provider_of(SimpleNamespace(providers={"openrouter": None, "gemini": None})) == "openrouter"
+
+
+@pytest.mark.unit
+class TestPromptBudget:
+    """Tests for PromptBudget trimming order."""
+
+    def _sections(self):
+        from squadron.services.tokens import Section, shorten_line
+        memories = Section("memory", ["old memory " * 10 + "\n", "new memory " * 10 + "\n"],
+                           priority=0, drop_order=[0, 1])
+        plan = Section("plan", [f"step {i} " * 10 + "\n" for i in range(5)], priority=1)
+        tools = Section("tools", ["- tool: Does a thing. " + "More detail. " * 20 + "\n"],
+                        priority=2, keys=["tool"], shorten=shorten_line)
+        return memories, plan, tools
+
+    def test_under_budget_is_untouched(self):
+        from squadron.services.tokens import PromptBudget, TokenEstimator
+        memories, plan, tools = self._sections()
+
+        PromptBudget(100000, TokenEstimator()).fit("hello", [memories, plan, tools])
+
+        assert not memories.dropped and not plan.dropped and not tools.shortened
+
+    def test_oldest_memory_is_dropped_first(self):
+        from squadron.services.tokens import PromptBudget, TokenEstimator
+        memories, plan, tools = self._sections()
+        estimator = TokenEstimator()
+        total = sum(estimator.count(s.render()) for s in (memories, plan, tools))
+
+        PromptBudget(total - 5, estimator).fit("", [memories, plan, tools])
+
+        assert memories.dropped == {0}
+        assert "new memory" in memories.render()
+        assert not plan.dropped and not tools.shortened
+
+    def test_plan_detail_then_tools_are_trimmed(self):
+        from squadron.services.tokens import PromptBudget, TokenEstimator
+        memories, plan, tools = self._sections()
+
+        used = PromptBudget(60, TokenEstimator()).fit("", [memories, plan, tools])
+
+        assert memories.render() == "" and plan.render() == ""
+        assert tools.shortened and "More detail" not in tools.render()
+        assert used <= 60
+
+    def test_plan_detail_is_trimmed_from_the_end(self):
+        from squadron.services.tokens import PromptBudget, TokenEstimator
+        memories, plan, tools = self._sections()
+        estimator = TokenEstimator()
+        total = sum(estimator.count(s.render()) for s in (plan, tools))
+
+        PromptBudget(total - 20, estimator).fit("", [memories, plan, tools])
+
+        assert memories.render() == ""
+        assert plan.dropped == {3, 4}
+        assert not tools.shortened
+
+    def test_large_plan_trims_quickly(self):
+        """Trimming thousands of plan lines stays cheap enough for the think() hot path."""
+        import time
+        from squadron.services.tokens import PromptBudget, Section, TokenEstimator
+        plan = Section("plan", [f"- step {i}: do the thing carefully\n" for i in range(20000)],
+                       priority=1, header="PLAN:\n", truncated_note="[truncated]\n")
+
+        start = time.perf_counter()
+        used = PromptBudget(2000, TokenEstimator()).fit("user input", [plan])
+        elapsed = time.perf_counter() - start
+
+        assert used <= 2000
+        assert 0 < len(plan.kept()) < 20000
+        assert elapsed < 1.0
+
+
+@pytest.mark.unit
+class TestBrainPromptBudget:
+    """Tests for the brain's prompt staying within budget."""
+
+    def test_build_prompt_drops_old_memories(self, monkeypatch):
+        from squadron.services.tokens import get_estimator
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+
+        memories = [
+            {"content": "ancient fact " * 50, "metadata": {"timestamp": "2024-01-01T00:00:00"}},
+            {"content": "recent fact", "metadata": {"timestamp": "2025-06-01T00:00:00"}},
+        ]
+        untrimmed = brain._build_prompt("hi", None, memories, "")
+        monkeypatch.setenv("SQUADRON_PROMPT_TOKEN_BUDGET", str(get_estimator().count(untrimmed) - 50))
+
+        prompt = brain._build_prompt("hi", None, memories, "")
+
+        assert "recent fact" in prompt and "ancient fact" not in prompt
+        assert prompt.endswith("USER: hi\nRESPONSE (JSON):")
+
+
+@pytest.mark.unit
+class TestTokenLedger:
+    """Tests for TokenLedger totals."""
+
+    def test_records_per_agent_and_mission(self):
+        from squadron.services.tokens import TokenLedger
+        from squadron.services.timing import timing_context
+        ledger = TokenLedger()
+
+        with timing_context(agent="Marcus", mission="m1"):
+            ledger.record(100, 20, provider="gemini")
+            ledger.record(50, 10, provider="gemini")
+        ledger.record(10, 5, agent="Caleb")
+
+        stats = ledger.get_stats()
+        assert stats["total"] == {"calls": 3, "input_tokens": 160, "output_tokens": 35}
+        assert stats["by_agent"]["Marcus"]["input_tokens"] == 150
+        assert stats["by_mission"]["m1"]["output_tokens"] == 30
+        assert ledger.get_stats(agent="Caleb")["total"]["calls"] == 1
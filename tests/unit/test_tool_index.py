@@ -0,0 +1,128 @@
+"""
+Unit Tests for Tool Index
+=========================
+
+Tests embedding-based tool selection including:
+- Relevance ranking of tool descriptions
+- Incremental re-embedding on registry changes
+- Pinned core tools for large registries
+"""
+
+import pytest
+from unittest.mock import patch
+
+
+def _tools(**descriptions):
+    return {name: {"description": desc} for name, desc in descriptions.items()}
+
+
+@pytest.mark.unit
+class TestToolIndex:
+    """Tests for ToolIndex ranking and syncing."""
+
+    def test_select_ranks_relevant_tools_first(self):
+        """The best-matching description should come back first."""
+        from squadron.services.embeddings import HashingEmbedder
+        from squadron.services.tool_index import ToolIndex
+        index = ToolIndex(embedder=HashingEmbedder())
+        tools = _tools(
+            github_create_issue="Creates a GitHub issue in a repository.",
+            slack_post_message="Posts a message to a Slack channel.",
+            postgres_query="Runs a SQL query against the Postgres database.",
+        )
+
+        assert index.select("post a message to the team slack channel", tools, k=1) == ["slack_post_message"]
+        assert index.select("run a sql query on the database", tools, k=1) == ["postgres_query"]
+
+    def test_sync_only_embeds_changed_tools(self):
+        """Descriptions are embedded once; only new or edited tools are re-embedded."""
+        from squadron.services.embeddings import HashingEmbedder
+        from squadron.services.tool_index import ToolIndex
+        embedder = HashingEmbedder()
+        index = ToolIndex(embedder=embedder)
+        tools = _tools(a="Alpha tool.", b="Beta tool.")
+
+        with patch.object(embedder, "embed", wraps=embedder.embed) as embed:
+            index.sync(tools, version=1)
+            index.sync(tools, version=1)
+            tools["b"] = {"description": "Beta tool, improved."}
+            tools["c"] = {"description": "Gamma tool."}
+            del tools["a"]
+            index.sync(tools, version=2)
+
+        assert [len(call.args[0]) for call in embed.call_args_list] == [2, 2]
+        assert len(index) == 2
+
+    def test_split_tools_pins_core_set_for_large_registries(self):
+        """Large registries keep pinned tools in the prefix and add only top-k extras."""
+        from squadron.services.embeddings import HashingEmbedder
+        from squadron.services import tool_index
+        tools = _tools(read_file="Reads a file.", write_file="Writes a file.")
+        for i in range(60):
+            tools[f"mcp_tool_{i}"] = {"description": f"Remote tool number {i}."}
+        tools["jira_comment"] = {"description": "Adds a comment to a Jira ticket."}
+        index = tool_index.ToolIndex(embedder=HashingEmbedder())
+
+        with patch.object(tool_index, "TOOL_TOP_K", 3):
+            prefix_tools, extra = tool_index.split_tools(tools, "comment on the jira ticket", index=index)
+
+        assert set(prefix_tools) == {"read_file", "write_file"}
+        assert len(extra) == 3
+        assert next(iter(extra)) == "jira_comment"
+
+    def test_select_never_waits_on_first_sync(self):
+        """Before the first sync finishes, split_tools lists every tool instead of embedding inline."""
+        import threading
+        from squadron.services.embeddings import HashingEmbedder
+        from squadron.services import tool_index
+        release = threading.Event()
+        embedder = HashingEmbedder()
+        real_embed = embedder.embed
+        embedder.embed = lambda texts: release.wait(5) and real_embed(texts)
+        index = tool_index.ToolIndex(embedder=embedder)
+        tools = {f"mcp_tool_{i}": {"description": f"Remote tool number {i}."} for i in range(60)}
+
+        prefix_tools, extra = tool_index.split_tools(tools, "anything", version=1, index=index)
+        release.set()
+        index._warmup.join(5)
+        _, extra_after = tool_index.split_tools(tools, "remote tool", version=1, index=index)
+
+        assert prefix_tools is tools and extra is None
+        assert extra_after
+
+    def test_prefix_shrinks_once_the_index_is_ready(self):
+        """The all-tools prefix built during warm-up isn't reused once selection kicks in."""
+        import threading
+        from squadron.services.embeddings import HashingEmbedder
+        from squadron.services import tool_index
+        from squadron.services.prompt_builder import PromptAssembler
+        release = threading.Event()
+        embedder = HashingEmbedder()
+        real_embed = embedder.embed
+        embedder.embed = lambda texts: release.wait(5) and real_embed(texts)
+        index = tool_index.ToolIndex(embedder=embedder)
+        tools = _tools(read_file="Reads a file.")
+        for i in range(60):
+            tools[f"mcp_tool_{i}"] = {"description": f"Remote tool number {i}."}
+        assembler = PromptAssembler()
+
+        def build():
+            prefix_tools, extra = tool_index.split_tools(tools, "remote tool", version=1, index=index)
+            return assembler.build("remote tool", prefix_tools, 1, extra_tools=extra)
+
+        before = build()
+        release.set()
+        index._warmup.join(5)
+        after = build()
+
+        assert "mcp_tool_59" in before.prefix
+        assert "mcp_tool_" not in after.prefix and len(after.text) < len(before.text)
+
+    def test_small_registry_is_not_split(self):
+        """Below the threshold every tool is listed, as before."""
+        from squadron.services.tool_index import split_tools
+        tools = _tools(read_file="Reads a file.")
+
+        prefix_tools, extra = split_tools(tools, "anything")
+
+        assert prefix_tools is tools and extra is None
@@ -0,0 +1,89 @@
+"""
+Unit Tests for the Shared Tool Registry
+=======================================
+
+Tests the process-wide tool registry including:
+- Lazy import of tool modules
+- Sharing between brain instances
+- Version bumps on registration
+- Snapshot/restore (used to isolate tests)
+"""
+
+import sys
+import pytest
+from unittest.mock import patch
+
+
+@pytest.mark.unit
+class TestLazyTool:
+    """Tests for lazily imported tools."""
+
+    def test_module_imported_on_first_call(self):
+        """The target module should only be imported when the tool runs."""
+        from squadron.services.tool_registry import ToolRegistry, LazyTool
+        registry = ToolRegistry()
+        sys.modules.pop("colorsys", None)
+        
+        registry.register("to_hsv", "to_hsv(r, g, b): Converts a color.", "colorsys:rgb_to_hsv")
+        
+        assert isinstance(registry["to_hsv"]["func"], LazyTool)
+        assert "colorsys" not in sys.modules
+        assert registry["to_hsv"]["func"](1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules
+
+    def test_register_bumps_version(self):
+        """Every change should bump the registry version."""
+        from squadron.services.tool_registry import ToolRegistry
+        registry = ToolRegistry()
+        
+        registry.register("a", "a()", lambda: None)
+        registry.register("b", "b()", lambda: None)
+        registry.unregister("a")
+        
+        assert registry.version == 3
+        assert list(registry) == ["b"]
+
+    def test_restore_undoes_registrations(self):
+        """restore() puts back the tools and loaded sources of a snapshot, bumping the version."""
+        from squadron.services.tool_registry import ToolRegistry
+        registry = ToolRegistry()
+        registry.register("a", "a()", lambda: None)
+        snapshot = registry.snapshot()
+        
+        registry.register("b", "b()", lambda: None)
+        registry.mark_loaded("core")
+        version = registry.version
+        registry.restore(snapshot)
+        
+        assert list(registry) == ["a"] and not registry.is_loaded("core")
+        assert registry.version == version + 1
+
+
+@pytest.mark.unit
+class TestSharedRegistry:
+    """Tests for registry sharing across brains."""
+
+    def test_brains_share_tools(self):
+        """A tool registered on one brain should be visible to another."""
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            first = SquadronBrain()
+            second = SquadronBrain()
+            
+            first.register_tool("shared_echo", "shared_echo(msg: str)", lambda msg: msg)
+            
+            assert first.tools is second.tools
+            assert "shared_echo" in second.tools
+            assert "read_file" in second.tools
+
+    def test_bound_tool_receives_calling_brain(self):
+        """bind=True tools should act on the brain that executes them."""
+        with patch('squadron.services.model_factory.ModelFactory.create'):
+            from squadron.brain import SquadronBrain
+            brain = SquadronBrain()
+            brain.current_agent = "Caleb"
+            brain.tools.register("whoami", "whoami()", lambda b: b.current_agent, bind=True)
+            
+            result = brain.execute({"action": "tool", "tool_name": "whoami", "args": {}})
+            
+            assert result["text"] == "Tool Output: Caleb"